@@ -0,0 +1,30 @@
+"""add merchant keyset pagination indexes
+
+Revision ID: 0f4b6d8e2a17
+Revises: e2c7a9b4d315
+Create Date: 2026-10-18 16:10:42.118503
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f4b6d8e2a17'
+down_revision: Union[str, Sequence[str], None] = 'e2c7a9b4d315'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_merchants_created_at_id', 'merchants', ['created_at', 'id'])
+    op.create_index('ix_merchants_user_id_created_at_id', 'merchants', ['user_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_merchants_user_id_created_at_id', table_name='merchants')
+    op.drop_index('ix_merchants_created_at_id', table_name='merchants')
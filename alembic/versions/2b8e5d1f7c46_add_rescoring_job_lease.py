@@ -0,0 +1,30 @@
+"""add rescoring job lease
+
+Revision ID: 2b8e5d1f7c46
+Revises: f1a6c3e8d027
+Create Date: 2026-10-18 21:14:32.508216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b8e5d1f7c46'
+down_revision: Union[str, Sequence[str], None] = 'f1a6c3e8d027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('rescoring_jobs', sa.Column('lease_id', sa.String(), nullable=True))
+    op.add_column('rescoring_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('rescoring_jobs', 'heartbeat_at')
+    op.drop_column('rescoring_jobs', 'lease_id')
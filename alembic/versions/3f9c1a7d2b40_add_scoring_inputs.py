@@ -0,0 +1,55 @@
+"""add scoring inputs
+
+Revision ID: 3f9c1a7d2b40
+Revises: 15b66322ba31
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1a7d2b40'
+down_revision: Union[str, Sequence[str], None] = '15b66322ba31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scoring_inputs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('merchant_id', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('self_employed', sa.Boolean(), nullable=False),
+    sa.Column('annual_income', sa.Float(), nullable=False),
+    sa.Column('verified_income', sa.Float(), nullable=True),
+    sa.Column('fico_score', sa.Integer(), nullable=True),
+    sa.Column('overdrafts_6mo', sa.Integer(), nullable=False),
+    sa.Column('avg_balance', sa.Float(), nullable=False),
+    sa.Column('nsf_fees', sa.Integer(), nullable=False),
+    sa.Column('device_risk_score', sa.Float(), nullable=False),
+    sa.Column('fraud_score', sa.Float(), nullable=False),
+    sa.Column('industry', sa.String(), nullable=True),
+    sa.Column('keywords', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['merchant_id'], ['merchants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('merchant_id', 'version', name='uq_scoring_inputs_merchant_version')
+    )
+    op.create_index(op.f('ix_scoring_inputs_id'), 'scoring_inputs', ['id'], unique=False)
+    op.create_index(op.f('ix_scoring_inputs_merchant_id'), 'scoring_inputs', ['merchant_id'], unique=False)
+    op.add_column('scores', sa.Column('scoring_input_id', sa.String(), nullable=True))
+    op.create_foreign_key('fk_scores_scoring_input_id', 'scores', 'scoring_inputs', ['scoring_input_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_scores_scoring_input_id', 'scores', type_='foreignkey')
+    op.drop_column('scores', 'scoring_input_id')
+    op.drop_index(op.f('ix_scoring_inputs_merchant_id'), table_name='scoring_inputs')
+    op.drop_index(op.f('ix_scoring_inputs_id'), table_name='scoring_inputs')
+    op.drop_table('scoring_inputs')
@@ -0,0 +1,50 @@
+"""merchant soft delete and ON DELETE CASCADE children
+
+Revision ID: 4d9a0c7e1b58
+Revises: 7b2f94c0e5a8
+Create Date: 2026-10-18 19:14:36.851027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d9a0c7e1b58'
+down_revision: Union[str, Sequence[str], None] = '7b2f94c0e5a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHILD_TABLES = (
+    'scores', 'scoring_inputs', 'webhook_logs', 'chargebacks', 'merchant_profiles', 'processor_info',
+    'pricing_plans', 'ach_authorizations', 'signatures',
+)
+
+
+def _recreate_merchant_fks(ondelete) -> None:
+    for table in CHILD_TABLES:
+        name = f'{table}_merchant_id_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, 'merchants', ['merchant_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('merchants', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_merchants_deleted_at', 'merchants', ['deleted_at'],
+                    postgresql_where=sa.text('deleted_at IS NOT NULL'))
+    op.drop_constraint('uq_merchants_business_name_industry', 'merchants', type_='unique')
+    op.create_index('uq_merchants_business_name_industry', 'merchants', ['business_name', 'industry'], unique=True,
+                    postgresql_where=sa.text('deleted_at IS NULL'))
+    _recreate_merchant_fks('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_merchant_fks(None)
+    op.drop_index('uq_merchants_business_name_industry', table_name='merchants')
+    op.create_unique_constraint('uq_merchants_business_name_industry', 'merchants', ['business_name', 'industry'])
+    op.drop_index('ix_merchants_deleted_at', table_name='merchants')
+    op.drop_column('merchants', 'deleted_at')
@@ -0,0 +1,32 @@
+"""add screening text to scoring inputs
+
+Revision ID: 5e0b93c7a1d4
+Revises: c4a8e21d7f56
+Create Date: 2026-10-18 13:55:42.081337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b93c7a1d4'
+down_revision: Union[str, Sequence[str], None] = 'c4a8e21d7f56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scoring_inputs', sa.Column('business_name', sa.String(), nullable=True))
+    op.add_column('scoring_inputs', sa.Column('dba', sa.String(), nullable=True))
+    op.add_column('scoring_inputs', sa.Column('website', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scoring_inputs', 'website')
+    op.drop_column('scoring_inputs', 'dba')
+    op.drop_column('scoring_inputs', 'business_name')
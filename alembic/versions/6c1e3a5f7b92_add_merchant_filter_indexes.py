@@ -0,0 +1,43 @@
+"""add merchant portfolio filter and search indexes
+
+Revision ID: 6c1e3a5f7b92
+Revises: 0f4b6d8e2a17
+Create Date: 2026-10-18 16:37:05.552981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1e3a5f7b92'
+down_revision: Union[str, Sequence[str], None] = '0f4b6d8e2a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_merchants_industry_created_at', 'merchants', ['industry', 'created_at'])
+    op.create_index('ix_merchants_type_of_merchant_created_at', 'merchants', ['type_of_merchant', 'created_at'])
+    op.create_index('ix_merchants_latest_score_id', 'merchants', ['latest_score_id'])
+    op.create_index('ix_merchants_business_name_trgm', 'merchants', ['business_name'], postgresql_using='gin',
+                    postgresql_ops={'business_name': 'gin_trgm_ops'})
+    op.create_index('ix_merchants_legal_entity_trgm', 'merchants', ['legal_entity'], postgresql_using='gin',
+                    postgresql_ops={'legal_entity': 'gin_trgm_ops'})
+    op.create_index('ix_scores_tier_score', 'scores', ['tier', 'score'])
+    op.create_index('ix_scores_score', 'scores', ['score'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scores_score', table_name='scores')
+    op.drop_index('ix_scores_tier_score', table_name='scores')
+    op.drop_index('ix_merchants_legal_entity_trgm', table_name='merchants')
+    op.drop_index('ix_merchants_business_name_trgm', table_name='merchants')
+    op.drop_index('ix_merchants_latest_score_id', table_name='merchants')
+    op.drop_index('ix_merchants_type_of_merchant_created_at', table_name='merchants')
+    op.drop_index('ix_merchants_industry_created_at', table_name='merchants')
@@ -0,0 +1,28 @@
+"""add gate outputs to scoring inputs
+
+Revision ID: 9a6d2f14e8b7
+Revises: 5e0b93c7a1d4
+Create Date: 2026-10-18 15:03:11.640925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a6d2f14e8b7'
+down_revision: Union[str, Sequence[str], None] = '5e0b93c7a1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scoring_inputs', sa.Column('gate_outputs', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scoring_inputs', 'gate_outputs')
@@ -0,0 +1,37 @@
+"""add used refresh tokens
+
+Revision ID: 9e4f2a7c1b35
+Revises: 2b8e5d1f7c46
+Create Date: 2026-10-18 22:03:51.267140
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4f2a7c1b35'
+down_revision: Union[str, Sequence[str], None] = '2b8e5d1f7c46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('used_refresh_tokens',
+    sa.Column('jti', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('used_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_index(op.f('ix_used_refresh_tokens_expires_at'), 'used_refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_used_refresh_tokens_expires_at'), table_name='used_refresh_tokens')
+    op.drop_table('used_refresh_tokens')
@@ -0,0 +1,28 @@
+"""unique merchant business name per industry
+
+Revision ID: a3d85f2c61e0
+Revises: 6c1e3a5f7b92
+Create Date: 2026-10-18 17:22:48.907316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d85f2c61e0'
+down_revision: Union[str, Sequence[str], None] = '6c1e3a5f7b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_unique_constraint('uq_merchants_business_name_industry', 'merchants', ['business_name', 'industry'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_merchants_business_name_industry', 'merchants', type_='unique')
@@ -0,0 +1,43 @@
+"""add scoring rulesets
+
+Revision ID: b71f0e5a9c28
+Revises: 8d2e4b6f1c93
+Create Date: 2026-10-18 11:20:05.774213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71f0e5a9c28'
+down_revision: Union[str, Sequence[str], None] = '8d2e4b6f1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scoring_rulesets',
+    sa.Column('version', sa.String(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_by', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('activated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('version')
+    )
+    op.create_index(op.f('ix_scoring_rulesets_is_active'), 'scoring_rulesets', ['is_active'], unique=False)
+    op.add_column('scores', sa.Column('ruleset_version', sa.String(), nullable=True))
+    op.add_column('rescoring_jobs', sa.Column('ruleset_version', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('rescoring_jobs', 'ruleset_version')
+    op.drop_column('scores', 'ruleset_version')
+    op.drop_index(op.f('ix_scoring_rulesets_is_active'), table_name='scoring_rulesets')
+    op.drop_table('scoring_rulesets')
@@ -0,0 +1,28 @@
+"""add score input hash
+
+Revision ID: c4a8e21d7f56
+Revises: b71f0e5a9c28
+Create Date: 2026-10-18 12:41:19.530662
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e21d7f56'
+down_revision: Union[str, Sequence[str], None] = 'b71f0e5a9c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scores', sa.Column('input_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('scores', 'input_hash')
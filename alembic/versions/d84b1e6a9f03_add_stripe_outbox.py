@@ -0,0 +1,49 @@
+"""add stripe outbox
+
+Revision ID: d84b1e6a9f03
+Revises: a3d85f2c61e0
+Create Date: 2026-10-18 17:58:13.472690
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84b1e6a9f03'
+down_revision: Union[str, Sequence[str], None] = 'a3d85f2c61e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stripe_outbox',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('merchant_id', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('stripe_customer_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['merchant_id'], ['merchants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stripe_outbox_id'), 'stripe_outbox', ['id'], unique=False)
+    op.create_index(op.f('ix_stripe_outbox_merchant_id'), 'stripe_outbox', ['merchant_id'], unique=False)
+    op.create_index('ix_stripe_outbox_status_next_attempt_at', 'stripe_outbox', ['status', 'next_attempt_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stripe_outbox_status_next_attempt_at', table_name='stripe_outbox')
+    op.drop_index(op.f('ix_stripe_outbox_merchant_id'), table_name='stripe_outbox')
+    op.drop_index(op.f('ix_stripe_outbox_id'), table_name='stripe_outbox')
+    op.drop_table('stripe_outbox')
@@ -0,0 +1,44 @@
+"""add merchant latest score pointer
+
+Revision ID: e2c7a9b4d315
+Revises: 9a6d2f14e8b7
+Create Date: 2026-10-18 15:48:26.203114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c7a9b4d315'
+down_revision: Union[str, Sequence[str], None] = '9a6d2f14e8b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_scores_merchant_id_created_at', 'scores', ['merchant_id', sa.text('created_at DESC')])
+    op.add_column('merchants', sa.Column('latest_score_id', sa.String(), nullable=True))
+    op.create_foreign_key('fk_merchants_latest_score_id', 'merchants', 'scores', ['latest_score_id'], ['id'],
+                          ondelete='SET NULL')
+    # backfill from the newest score of every merchant
+    op.execute("""
+        UPDATE merchants AS m
+        SET latest_score_id = s.id
+        FROM (
+            SELECT DISTINCT ON (merchant_id) id, merchant_id
+            FROM scores
+            ORDER BY merchant_id, created_at DESC
+        ) AS s
+        WHERE s.merchant_id = m.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_merchants_latest_score_id', 'merchants', type_='foreignkey')
+    op.drop_column('merchants', 'latest_score_id')
+    op.drop_index('ix_scores_merchant_id_created_at', table_name='scores')
@@ -0,0 +1,28 @@
+"""add user token version
+
+Revision ID: f1a6c3e8d027
+Revises: 4d9a0c7e1b58
+Create Date: 2026-10-18 19:52:09.614382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6c3e8d027'
+down_revision: Union[str, Sequence[str], None] = '4d9a0c7e1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -1,7 +1,16 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+from uuid import uuid4
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+
+from connections import instrumentation
+from connections.pool import engine_options, instrument, statement_timeout_connect_args, uses_pgbouncer
+from connections.replicas import replica_router
 
 # Load from env or hardcoded fallback
 DB_USER = os.getenv("POSTGRES_USER", "neondb_owner")
@@ -11,10 +20,44 @@ DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 DB_NAME = os.getenv("POSTGRES_DB", "neondb")
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL", f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+PGBOUNCER = uses_pgbouncer(DB_HOST)
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(
+    DATABASE_URL,
+    connect_args=statement_timeout_connect_args(pgbouncer=PGBOUNCER),
+    **engine_options(),
+)
+instrument(engine, "primary", pgbouncer=PGBOUNCER)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Neon's pooler runs pgbouncer in transaction mode, which cannot keep named prepared
+# statements across transactions: disable both caches and give each statement a unique name
+_ASYNCPG_CONNECT_ARGS = {
+    "statement_cache_size": 0,
+    "prepared_statement_cache_size": 0,
+    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+}
+
+# request path: asyncpg, so a slow round trip only suspends its own request
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={
+        **(_ASYNCPG_CONNECT_ARGS if ASYNC_DATABASE_URL.startswith("postgresql+asyncpg") else {}),
+        **statement_timeout_connect_args(is_async=True, pgbouncer=PGBOUNCER),
+    },
+    **engine_options(is_async=True),
+)
+instrument(async_engine.sync_engine, "primary-async", pgbouncer=PGBOUNCER)
+# expire_on_commit=False: attributes read after commit must not trigger I/O outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# per-request statement counts, DB time and rows (see connections/instrumentation.py)
+instrumentation.install()
+
 Base = declarative_base()
 
 # Dependency for FastAPI routes
@@ -24,3 +67,31 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_async_db(request: Request):
+    """Session for read-only endpoints: a healthy replica, or the primary (see ``ReplicaRouter``)."""
+    replica = replica_router.pick(request)
+    if replica is not None:
+        db = replica.session()
+        try:
+            # connect now, so an unreachable (or exhausted) replica fails over instead of failing the request
+            await db.connection()
+        except (DBAPIError, OSError, TimeoutError, PoolTimeoutError):
+            await db.close()
+            replica_router.mark_down(replica)
+        else:
+            replica_router.count("replica")
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+    replica_router.count("primary")
+    async with AsyncSessionLocal() as db:
+        yield db
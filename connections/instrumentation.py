@@ -0,0 +1,222 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, Session
+
+# statements one request may issue before it is reported; a route can set its own with query_budget()
+SQL_QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", "25"))
+# the same statement shape this many times in one request is reported as an N+1
+SQL_MAX_REPEATS = int(os.getenv("SQL_MAX_REPEATS", "5"))
+# test mode: a request over budget raises QueryBudgetExceeded instead of logging a warning
+SQL_ASSERT_BUDGETS = os.getenv("SQL_ASSERT_BUDGETS", "false").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+_PARAM_LIST = re.compile(r"\((?:\s*(?:\?|\$\d+|%\([^)]+\)s|%s)\s*,?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+# per-transaction setup issued by the engine (statement_timeout behind PgBouncer), not by the route
+_SESSION_SETUP = re.compile(r"\s*SET\s+LOCAL\b", re.IGNORECASE)
+
+
+def shape(statement: str) -> str:
+    """``statement`` with whitespace collapsed and expanded IN lists folded, so repeats compare equal."""
+    return _PARAM_LIST.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class SqlStats:
+    """Statements, database time and rows of one unit of work (usually a request).
+
+    Rows are those written by DML and those fetched by Session selects; asyncpg
+    and SQLite report no rowcount for a SELECT, so reads are counted as the
+    ORM result is fetched.
+    """
+
+    def __init__(self, budget: Optional[int] = None, max_repeats: Optional[int] = None):
+        self.budget = budget
+        self.max_repeats = max_repeats
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, rows: int) -> None:
+        with self._lock:
+            self.seconds += seconds
+            if _SESSION_SETUP.match(statement):
+                # counts toward database time, but not toward the budget or the N+1 shapes
+                return
+            self.statements += 1
+            self.rows += max(rows, 0)
+            self.shapes[shape(statement)] += 1
+
+    def add_rows(self, rows: int) -> None:
+        with self._lock:
+            self.rows += rows
+
+    def violations(self) -> List[str]:
+        budget = self.budget if self.budget is not None else SQL_QUERY_BUDGET
+        max_repeats = self.max_repeats if self.max_repeats is not None else SQL_MAX_REPEATS
+        problems = []
+        if self.statements > budget:
+            problems.append(f"{self.statements} statements, budget is {budget}")
+        for stmt, count in self.shapes.most_common():
+            if count < max_repeats:
+                break
+            problems.append(f"{count}x {stmt[:200]}")
+        return problems
+
+
+_current: ContextVar[Optional[SqlStats]] = ContextVar("sql_stats", default=None)
+
+
+def current_stats() -> Optional[SqlStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_sql_started", None)
+    if stats is not None and started is not None:
+        # rowcount of a SELECT is -1 or driver-specific; fetched rows are counted by _count_fetched_rows
+        rows = getattr(cursor, "rowcount", -1) if context.isinsert or context.isupdate or context.isdelete else 0
+        stats.record(statement, time.perf_counter() - started, rows)
+
+
+def _count_fetched_rows(orm_execute_state: ORMExecuteState):
+    stats = _current.get()
+    if stats is None or not orm_execute_state.is_select:
+        return None
+    options = orm_execute_state.execution_options
+    if options.get("yield_per") or options.get("stream_results"):
+        # streamed in partitions; buffering it here would defeat the point
+        return None
+    frozen = orm_execute_state.invoke_statement().freeze()
+    stats.add_rows(len(frozen.data))
+    return frozen()
+
+
+_installed = False
+
+
+def install() -> None:
+    """Listen on every Engine (primary, asyncpg, replicas) and Session; work outside ``track`` costs one lookup."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Session, "do_orm_execute", _count_fetched_rows)
+    _installed = True
+
+
+@contextmanager
+def track(budget: Optional[int] = None, max_repeats: Optional[int] = None):
+    """Collect SqlStats for everything executed inside the block, including threadpool and run_sync work."""
+    stats = SqlStats(budget, max_repeats)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def assert_queries(max_statements: Optional[int] = None, max_repeats: Optional[int] = None):
+    """Raise QueryBudgetExceeded if the block issues more statements, or repeats one shape more, than allowed."""
+    with track(max_statements, max_repeats) as stats:
+        yield stats
+    problems = stats.violations()
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems))
+
+
+def query_budget(statements: int, max_repeats: Optional[int] = None):
+    """Route dependency setting that endpoint's budget: ``dependencies=[Depends(query_budget(3))]``."""
+    def set_budget():
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = statements
+            if max_repeats is not None:
+                stats.max_repeats = max_repeats
+    return set_budget
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class SqlMetrics:
+    """Per-route SQL totals plus the middleware that measures each request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes: dict = {}
+
+    def observe(self, route: str, stats: SqlStats) -> None:
+        ms = stats.seconds * 1000
+        with self._lock:
+            agg = self.routes.setdefault(route, {"requests": 0, "statements": 0, "max_statements": 0,
+                                                 "db_ms": 0.0, "max_db_ms": 0.0, "rows": 0, "over_budget": 0})
+            agg["requests"] += 1
+            agg["statements"] += stats.statements
+            agg["max_statements"] = max(agg["max_statements"], stats.statements)
+            agg["db_ms"] = round(agg["db_ms"] + ms, 3)
+            agg["max_db_ms"] = round(max(agg["max_db_ms"], ms), 3)
+            agg["rows"] += stats.rows
+
+    def flag(self, route: str) -> None:
+        with self._lock:
+            self.routes[route]["over_budget"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = {k: dict(v) for k, v in self.routes.items()}
+        for agg in routes.values():
+            agg["avg_statements"] = round(agg["statements"] / agg["requests"], 2)
+            agg["avg_db_ms"] = round(agg["db_ms"] / agg["requests"], 3)
+        return dict(sorted(routes.items(), key=lambda kv: -kv[1]["db_ms"]))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.routes.clear()
+
+    async def middleware(self, request: Request, call_next):
+        with track() as stats:
+            response = await call_next(request)
+        route = request.scope.get("route")
+        # raw paths of unmatched requests (scanners, typos) would grow ``routes`` without bound
+        key = f"{request.method} {getattr(route, 'path', None) or UNMATCHED_ROUTE}"
+        self.observe(key, stats)
+        response.headers["X-DB-Statements"] = str(stats.statements)
+        response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+        response.headers["X-DB-Rows"] = str(stats.rows)
+
+        problems = stats.violations()
+        if problems:
+            self.flag(key)
+            if SQL_ASSERT_BUDGETS:
+                raise QueryBudgetExceeded(f"{key}: " + "; ".join(problems))
+            logger.warning("%s over its query budget: %s", key, "; ".join(problems))
+        return response
+
+
+sql_metrics = SqlMetrics()
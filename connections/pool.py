@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+# queue: a per-process pool (long-running servers)
+# single: one persistent connection per process (a Lambda container serves one request at a time),
+#         plus DB_SINGLE_MAX_OVERFLOW short-lived ones for work that needs two sessions at once
+# null: no client-side pooling, every checkout connects (PgBouncer / Neon's pooler does the pooling)
+DB_POOL = os.getenv("DB_POOL", "queue").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# RescoringService.run streams on one connection while writing on another; overflow connections
+# are closed on checkin, so an idle container still holds a single connection
+DB_SINGLE_MAX_OVERFLOW = int(os.getenv("DB_SINGLE_MAX_OVERFLOW", "1"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# recycle before Neon's / the NAT's idle timeout closes the socket under a frozen Lambda
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# PgBouncer in transaction mode drops startup options and session SETs; auto-detected from Neon's "-pooler" host
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER")
+
+POOL_MODES = ("queue", "single", "null")
+
+
+class PoolStats:
+    """Checkout counters for one engine's pool, fed by pool events and ``_TimedPool``."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidated = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidated": self.invalidated,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class _TimedPool:
+    """Pool mixin timing how long a checkout waits for a free connection."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.incr("timeouts")
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedPool, NullPool):
+    pass
+
+
+def uses_pgbouncer(host: str) -> bool:
+    if DB_PGBOUNCER is not None:
+        return DB_PGBOUNCER.lower() == "true"
+    return "-pooler" in (host or "")
+
+
+def engine_options(is_async: bool = False) -> dict:
+    """``create_engine`` keyword arguments for the configured ``DB_POOL`` mode."""
+    if DB_POOL not in POOL_MODES:
+        raise ValueError(f"DB_POOL must be one of {POOL_MODES}, got {DB_POOL!r}")
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if DB_POOL == "null":
+        options["poolclass"] = TimedNullPool
+        return options
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=1 if DB_POOL == "single" else DB_POOL_SIZE,
+        max_overflow=DB_SINGLE_MAX_OVERFLOW if DB_POOL == "single" else DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def statement_timeout_connect_args(is_async: bool = False, pgbouncer: bool = False) -> dict:
+    """Startup parameters setting ``statement_timeout``; empty when it must be set per transaction."""
+    if not DB_STATEMENT_TIMEOUT_MS or pgbouncer:
+        return {}
+    if is_async:
+        return {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    return {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+
+def instrument(engine, name: str, pgbouncer: bool = False) -> PoolStats:
+    """Attach pool counters to ``engine`` (sync, or an AsyncEngine's ``sync_engine``) and,
+    behind PgBouncer, a ``SET LOCAL statement_timeout`` at the start of every transaction."""
+    stats = PoolStats(name)
+    engine.pool.stats = stats
+    event.listen(engine.pool, "connect", lambda *a: stats.incr("connects"))
+    event.listen(engine.pool, "invalidate", lambda *a: stats.incr("invalidated"))
+
+    if DB_STATEMENT_TIMEOUT_MS and pgbouncer:
+        @event.listens_for(engine, "begin")
+        def _statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(DB_STATEMENT_TIMEOUT_MS)}")
+
+    return stats
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"name": pool.stats.name, "mode": DB_POOL, "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(size=pool.size(), checked_in=pool.checkedin(), checked_out=pool.checkedout(),
+                      overflow=max(0, pool.overflow()), max_overflow=pool._max_overflow)
+    return {**status, **pool.stats.snapshot()}
@@ -0,0 +1,142 @@
+import itertools
+import os
+import threading
+import time
+from typing import List, Optional
+from uuid import uuid4
+
+import jwt
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from connections.pool import engine_options, instrument, pool_status, statement_timeout_connect_args, uses_pgbouncer
+
+# comma-separated postgresql:// URLs of read replicas; empty means every read goes to the primary
+DB_REPLICA_URLS = [u.strip() for u in os.getenv("DB_REPLICA_URLS", "").split(",") if u.strip()]
+# how long a replica that failed to connect is skipped before it is tried again
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+DB_REPLICA_CONNECT_TIMEOUT = float(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", "3"))
+# after a write, the same user (and client) reads from the primary for this long
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+READ_PRIMARY_COOKIE = "db_read_primary_until"
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def _writer_key(request: Request) -> Optional[str]:
+    """Who is asking, from the bearer token. Unverified: it only picks a database, auth runs separately."""
+    header = request.headers.get("authorization") or ""
+    if not header.lower().startswith("bearer "):
+        return None
+    try:
+        claims = jwt.decode(header.split()[-1], options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return None
+    return claims.get("user_id") or claims.get("email")
+
+
+class Replica:
+
+    def __init__(self, index: int, url: str):
+        self.name = f"replica-{index}"
+        self.url = make_url(url)
+        self.host = self.url.host
+        pgbouncer = uses_pgbouncer(self.host)
+        connect_args = {**statement_timeout_connect_args(is_async=True, pgbouncer=pgbouncer),
+                        "timeout": DB_REPLICA_CONNECT_TIMEOUT}
+        if pgbouncer:
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0,
+                                prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__")
+        self.engine = create_async_engine(self.url.set(drivername="postgresql+asyncpg"),
+                                          connect_args=connect_args, **engine_options(is_async=True))
+        instrument(self.engine.sync_engine, self.name, pgbouncer=pgbouncer)
+        self.session = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        self.down_until = 0.0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+class ReplicaRouter:
+    """Sends read-only requests to healthy replicas, round robin.
+
+    A request stays on the primary when no replica is healthy, or when the
+    same user wrote within ``DB_READ_YOUR_WRITES_SECONDS``. Recent writers are
+    remembered in-process by user and, for other instances, by a short-lived
+    cookie set on the write response. A replica that fails to hand out a
+    connection is skipped for ``DB_REPLICA_RETRY_SECONDS``.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(i, url) for i, url in enumerate(urls)]
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+        self._writes: dict[str, float] = {}
+        self.reads = {"replica": 0, "primary": 0, "failover": 0, "read_your_writes": 0}
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            self.reads[counter] += 1
+
+    def note_write(self, key: Optional[str]) -> float:
+        until = time.time() + DB_READ_YOUR_WRITES_SECONDS
+        if key:
+            with self._lock:
+                self._writes[key] = until
+                if len(self._writes) > 10000:
+                    now = time.time()
+                    self._writes = {k: v for k, v in self._writes.items() if v > now}
+        return until
+
+    def wrote_recently(self, request: Request) -> bool:
+        now = time.time()
+        try:
+            if float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > now:
+                return True
+        except ValueError:
+            pass
+        key = _writer_key(request)
+        return bool(key) and self._writes.get(key, 0) > now
+
+    def pick(self, request: Request) -> Optional[Replica]:
+        if not self.replicas:
+            return None
+        if self.wrote_recently(request):
+            self.count("read_your_writes")
+            return None
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = next(self._cycle)
+                if replica.healthy:
+                    return replica
+        self.count("failover")
+        return None
+
+    def mark_down(self, replica: Replica) -> None:
+        with self._lock:
+            replica.failures += 1
+            replica.down_until = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+            self.reads["failover"] += 1
+
+    async def middleware(self, request: Request, call_next):
+        response = await call_next(request)
+        if self.replicas and request.method in MUTATING_METHODS and response.status_code < 400:
+            until = self.note_write(_writer_key(request))
+            response.set_cookie(READ_PRIMARY_COOKIE, f"{until:.3f}", max_age=int(DB_READ_YOUR_WRITES_SECONDS) + 1,
+                                httponly=True, secure=True, samesite="none")
+        return response
+
+    def status(self) -> dict:
+        with self._lock:
+            reads = dict(self.reads)
+        return {
+            "reads": reads,
+            "replicas": [{**pool_status(r.engine.sync_engine), "host": r.host, "healthy": r.healthy,
+                          "failures": r.failures} for r in self.replicas],
+        }
+
+
+replica_router = ReplicaRouter(DB_REPLICA_URLS)
@@ -1,30 +1,35 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from starlette.middleware.cors import CORSMiddleware
 from routers import api_router
+from connections.instrumentation import sql_metrics
+from connections.replicas import replica_router
+from services.idempotency.services import IdempotencyService
+from services.scheduled.services import ScheduledJobService
+from utils.watchdog import LOOP_WATCHDOG_ENABLED, loop_watchdog
 import time
 import logging
 from mangum import Mangum
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # reports anything that blocks the event loop longer than LOOP_STALL_THRESHOLD_MS
+    if LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+    yield
+    loop_watchdog.stop()
+
+
 app = FastAPI(
     title="RiskCore API",
     version="1.0.0",
     docs_url="/api/v1/docs",  # <-- move docs here
-    redoc_url=None
-)
-
-# CORS Middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["https://risk-score-fe.vercel.app",
-                   "http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    redoc_url=None,
+    lifespan=lifespan,
 )
 
-
 # Custom Logging Middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -49,7 +54,35 @@ def root():
             "POSTGRES_HOST": os.getenv('POSTGRES_HOST')}
 
 
+# Replays stored responses for retried requests carrying an Idempotency-Key
+app.middleware("http")(IdempotencyService.middleware)
+
+# Remembers recent writers so their next reads see their own writes on the primary
+app.middleware("http")(replica_router.middleware)
+
+# Counts every statement of the request, idempotency bookkeeping included
+app.middleware("http")(sql_metrics.middleware)
+
+# CORS Middleware, added last so it is outermost: responses the middlewares above
+# answer on their own (idempotent replays, conflicts) still carry the CORS headers
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["https://risk-score-fe.vercel.app",
+                   "http://localhost:3000"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
 # Routers
 app.include_router(api_router)
 
-handler = Mangum(app)
+asgi_handler = Mangum(app)
+
+
+def handler(event, context):
+    # EventBridge schedules invoke the same function with {"job": "<name>"} (see services/scheduled)
+    if isinstance(event, dict) and "job" in event:
+        return ScheduledJobService.run(event["job"], context)
+    return asgi_handler(event, context)
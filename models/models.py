@@ -2,9 +2,9 @@ from enum import Enum
 
 from sqlalchemy import (
     Column, String, Integer,
-    Float, DateTime, ForeignKey, Text, Table, Boolean)
+    Float, DateTime, ForeignKey, Text, Table, Boolean, UniqueConstraint, Index, text)
 from sqlalchemy.dialects.postgresql import TEXT
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from connections.db_connection import Base
 from datetime import datetime
 from uuid import uuid4
@@ -18,6 +18,22 @@ class Role(Enum):
 
 class MerchantDB(Base):
     __tablename__ = "merchants"
+    __table_args__ = (
+        # unique among live merchants only, so a soft-deleted merchant can be onboarded again
+        Index("uq_merchants_business_name_industry", "business_name", "industry", unique=True,
+              postgresql_where=text("deleted_at IS NULL"), sqlite_where=text("deleted_at IS NULL")),
+        Index("ix_merchants_deleted_at", "deleted_at", postgresql_where=text("deleted_at IS NOT NULL")),
+        Index("ix_merchants_created_at_id", "created_at", "id"),
+        Index("ix_merchants_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_merchants_industry_created_at", "industry", "created_at"),
+        Index("ix_merchants_type_of_merchant_created_at", "type_of_merchant", "created_at"),
+        Index("ix_merchants_latest_score_id", "latest_score_id"),
+        # pg_trgm indexes behind the ILIKE '%q%' portfolio search
+        Index("ix_merchants_business_name_trgm", "business_name", postgresql_using="gin",
+              postgresql_ops={"business_name": "gin_trgm_ops"}),
+        Index("ix_merchants_legal_entity_trgm", "legal_entity", postgresql_using="gin",
+              postgresql_ops={"legal_entity": "gin_trgm_ops"}),
+    )
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
     legal_entity = Column(String)
     type_of_merchant = Column(String, server_default="moderate", nullable=False)
@@ -32,28 +48,48 @@ class MerchantDB(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     update_at = Column(DateTime, default=datetime.utcnow)
     user_id = Column(String, ForeignKey("users.id"), index=True, nullable=False)
+    # soft delete: set on delete, rows (and their children) are removed later by services.purge
+    deleted_at = Column(DateTime, nullable=True)
+    # denormalised pointer to the newest ScoreEntry, kept current by every score writer
+    latest_score_id = Column(String, ForeignKey("scores.id", name="fk_merchants_latest_score_id", use_alter=True,
+                                                ondelete="SET NULL"), nullable=True)
 
     # Relationships
-    scores = relationship("ScoreEntry", back_populates="merchant", cascade="all, delete-orphan")
+    # passive_deletes: the database cascades the DELETE, the ORM never loads the children to remove them
+    scores = relationship("ScoreEntry", back_populates="merchant", cascade="all, delete-orphan",
+                          passive_deletes=True, foreign_keys="ScoreEntry.merchant_id")
+    latest_score = relationship("ScoreEntry", foreign_keys=[latest_score_id], post_update=True)
     user = relationship("User", back_populates="merchant")
-    webhooks = relationship("WebhookLog", back_populates="merchant", cascade="all, delete-orphan")
-    chargebacks = relationship("Chargeback", back_populates="merchant", cascade="all, delete-orphan")
+    webhooks = relationship("WebhookLog", back_populates="merchant", cascade="all, delete-orphan",
+                            passive_deletes=True)
+    chargebacks = relationship("Chargeback", back_populates="merchant", cascade="all, delete-orphan",
+                               passive_deletes=True)
+    scoring_inputs = relationship("ScoringInput", back_populates="merchant", cascade="all, delete-orphan",
+                                  passive_deletes=True, order_by="ScoringInput.version")
     # bank_connections = relationship("BankConnection", back_populates="merchant", cascade="all, delete-orphan")
 
     # Onboarding form (one-to-one sections)
-    profile = relationship("MerchantProfile", back_populates="merchant", uselist=False, cascade="all, delete-orphan")
+    profile = relationship("MerchantProfile", back_populates="merchant", uselist=False, cascade="all, delete-orphan",
+                           passive_deletes=True)
     processor_info = relationship("ProcessorInfo", back_populates="merchant", uselist=False,
-                                  cascade="all, delete-orphan")
-    pricing_plan = relationship("PricingPlan", back_populates="merchant", uselist=False, cascade="all, delete-orphan")
+                                  cascade="all, delete-orphan", passive_deletes=True)
+    pricing_plan = relationship("PricingPlan", back_populates="merchant", uselist=False, cascade="all, delete-orphan",
+                                passive_deletes=True)
     ach_authorization = relationship("AchAuthorization", back_populates="merchant", uselist=False,
-                                     cascade="all, delete-orphan")
-    signatures = relationship("Signature", back_populates="merchant", uselist=False, cascade="all, delete-orphan")
+                                     cascade="all, delete-orphan", passive_deletes=True)
+    signatures = relationship("Signature", back_populates="merchant", uselist=False, cascade="all, delete-orphan",
+                              passive_deletes=True)
 
 
 class ScoreEntry(Base):
     __tablename__ = "scores"
+    __table_args__ = (
+        Index("ix_scores_merchant_id_created_at", "merchant_id", text("created_at DESC")),
+        Index("ix_scores_tier_score", "tier", "score"),
+        Index("ix_scores_score", "score"),
+    )
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    merchant_id = Column(String, ForeignKey("merchants.id"), index=True, nullable=False)
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
     score = Column(Integer, nullable=False)
     tier = Column(String, nullable=False)
     decision = Column(String, nullable=False)
@@ -61,16 +97,123 @@ class ScoreEntry(Base):
     risk_tags = Column(Text, nullable=True)  # JSON string list
     explanation = Column(Text, nullable=True)
     heat_score = Column(Integer, nullable=True)
+    scoring_input_id = Column(String, ForeignKey("scoring_inputs.id", name="fk_scores_scoring_input_id"), nullable=True)
+    ruleset_version = Column(String, nullable=True)
+    input_hash = Column(String(64), nullable=True)  # services.calculation.cache.fingerprint of the inputs
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationship back to Merchant
-    merchant = relationship("MerchantDB", back_populates="scores")
+    merchant = relationship("MerchantDB", back_populates="scores", foreign_keys=[merchant_id])
+    scoring_input = relationship("ScoringInput")
+
+
+class ScoringInput(Base):
+    """Raw gate inputs for a merchant; a new version is written whenever they change."""
+    __tablename__ = "scoring_inputs"
+    __table_args__ = (UniqueConstraint("merchant_id", "version", name="uq_scoring_inputs_merchant_version"),)
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    self_employed = Column(Boolean, nullable=False, default=False)
+    annual_income = Column(Float, nullable=False, default=0.0)
+    verified_income = Column(Float, nullable=True)
+    fico_score = Column(Integer, nullable=True)
+    overdrafts_6mo = Column(Integer, nullable=False, default=0)
+    avg_balance = Column(Float, nullable=False, default=0.0)
+    nsf_fees = Column(Integer, nullable=False, default=0)
+    device_risk_score = Column(Float, nullable=False, default=0.0)
+    fraud_score = Column(Float, nullable=False, default=0.0)
+    industry = Column(String, nullable=True)
+    keywords = Column(Text, nullable=True)  # JSON string list
+    business_name = Column(String, nullable=True)
+    dba = Column(String, nullable=True)
+    website = Column(String, nullable=True)
+    gate_outputs = Column(Text, nullable=True)  # JSON of Calculation.evaluate()["gates"] for these inputs
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    merchant = relationship("MerchantDB", back_populates="scoring_inputs")
+
+
+class ScoringRuleset(Base):
+    """Published scoring rulesets; the one with is_active is what every process scores with."""
+    __tablename__ = "scoring_rulesets"
+    version = Column(String, primary_key=True)
+    body = Column(Text, nullable=False)  # JSON document, see services/calculation/rulesets/default.json
+    is_active = Column(Boolean, nullable=False, default=False, index=True)
+    created_by = Column(String, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    activated_at = Column(DateTime, nullable=True)
+
+
+class StripeOutbox(Base):
+    """Stripe customers still to be created; written in the onboarding transaction, drained by
+    services.stripe_outbox."""
+    __tablename__ = "stripe_outbox"
+    __table_args__ = (Index("ix_stripe_outbox_status_next_attempt_at", "status", "next_attempt_at"),)
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
+    email = Column(String, nullable=False)
+    name = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    stripe_customer_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime, nullable=True)
+
+
+class IdempotencyKey(Base):
+    """Stored outcome of a mutating request sent with an ``Idempotency-Key`` header."""
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String, primary_key=True)  # caller identity the key belongs to
+    key = Column(String, primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String, nullable=False, default="in_progress")  # in_progress | completed
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    response_content_type = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class UsedRefreshToken(Base):
+    """``jti`` of every refresh token already exchanged; a second exchange means the token leaked."""
+    __tablename__ = "used_refresh_tokens"
+
+    jti = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    used_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)  # the token's exp; the row is useless after it
+
+
+class RescoringJob(Base):
+    """Progress/checkpoint of a portfolio rescoring run (see services.rescoring)."""
+    __tablename__ = "rescoring_jobs"
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
+    status = Column(String, nullable=False, default="running")
+    chunk_size = Column(Integer, nullable=False)
+    ruleset_version = Column(String, nullable=True)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    last_merchant_id = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    started_by = Column(String, ForeignKey("users.id"), nullable=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    # the run currently working the job; it renews heartbeat_at every chunk and may be taken over once it is stale
+    lease_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
 
 
 class WebhookLog(Base):
     __tablename__ = "webhook_logs"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    merchant_id = Column(String, ForeignKey("merchants.id"), index=True, nullable=False)
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
     source = Column(String)
     content = Column(String)
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -92,8 +235,9 @@ class User(Base):
     phone = Column(String)
     bio = Column(String, nullable=True)
     location = Column(String, nullable=True)
-    profile_image = Column(String, nullable=True)
+    profile_image = deferred(Column(String, nullable=True))  # base64 image, only loaded when read
     role = Column(String, nullable=False, default=Role.USER.value)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped to revoke tokens
     created_by = Column(String, ForeignKey("users.id"), nullable=True)  # <-- NEW FIELD
     created_at = Column(DateTime, default=datetime.utcnow)
     update_at = Column(DateTime, default=datetime.utcnow)
@@ -104,7 +248,7 @@ class User(Base):
 class Chargeback(Base):
     __tablename__ = "chargebacks"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    merchant_id = Column(String, ForeignKey("merchants.id"), index=True, nullable=False)
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
     chargeback_code = Column(String)
 
     reason = Column(String)
@@ -117,7 +261,7 @@ class Chargeback(Base):
 class MerchantProfile(Base):
     __tablename__ = "merchant_profiles"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    merchant_id = Column(String, ForeignKey("merchants.id"), index=True, nullable=False)
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
     type_of_merchant = Column(String, server_default="moderate", nullable=False)
     dba = Column(String)
     business_address = Column(String)
@@ -135,7 +279,7 @@ class MerchantProfile(Base):
 class ProcessorInfo(Base):
     __tablename__ = "processor_info"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    merchant_id = Column(String, ForeignKey("merchants.id"), index=True, nullable=False)
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
     processor_acquirer = Column(String)
     avg_ticket = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -147,7 +291,7 @@ class ProcessorInfo(Base):
 class PricingPlan(Base):
     __tablename__ = "pricing_plans"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    merchant_id = Column(String, ForeignKey("merchants.id"), index=True, nullable=False)
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
     initial_setup_fee = Column(Float)
     module1_name = Column(String)
     module1_fee = Column(Float)
@@ -164,7 +308,7 @@ class PricingPlan(Base):
 class AchAuthorization(Base):
     __tablename__ = "ach_authorizations"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    merchant_id = Column(String, ForeignKey("merchants.id"), index=True, nullable=False)
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
     bank_name = Column(String)
     routing = Column(String)
     account = Column(String)
@@ -179,7 +323,7 @@ class AchAuthorization(Base):
 class Signature(Base):
     __tablename__ = "signatures"
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
-    merchant_id = Column(String, ForeignKey("merchants.id"), index=True, nullable=False)
+    merchant_id = Column(String, ForeignKey("merchants.id", ondelete="CASCADE"), index=True, nullable=False)
     merchant_signature = Column(String)
     merchant_signed_at = Column(DateTime)
     company_signature = Column(String)
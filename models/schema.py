@@ -1,7 +1,7 @@
 from dataclasses import field
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Any
-from datetime import datetime
+from pydantic import BaseModel, Field, validator, model_validator
+from typing import List, Literal, Optional, Any
+from datetime import date, datetime
 
 
 class APIResponse(BaseModel):
@@ -68,6 +68,13 @@ class SignInRequest(BaseModel):
 class SignInResponse(BaseModel):
     message: str
     token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+class TokenRefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class ForgotPasswordRequest(BaseModel):
@@ -157,12 +164,91 @@ class MerchantOnboardRequest(BaseModel):
     business_profile: Optional[MerchantProfileRequest] = None
 
 
+class BatchScoreRequest(BaseModel):
+    """Column-oriented scoring input: element ``i`` of every list is merchant ``i``."""
+    merchant_id: Optional[List[str]] = None
+    industry: List[str] = Field(..., max_length=50000)
+    annual_income: List[Optional[float]]
+    verified_income: Optional[List[Optional[float]]] = None
+    fico_score: Optional[List[Optional[int]]] = None
+    utilization: Optional[List[Optional[float]]] = None
+    avg_balance: Optional[List[Optional[float]]] = None
+    overdrafts_6mo: Optional[List[Optional[int]]] = None
+    nsf_fees: Optional[List[Optional[int]]] = None
+    device_risk_score: Optional[List[Optional[float]]] = None
+    fraud_score: Optional[List[Optional[float]]] = None
+    keywords: Optional[List[List[str]]] = None
+    business_name: Optional[List[Optional[str]]] = None
+    dba: Optional[List[Optional[str]]] = None
+    website: Optional[List[Optional[str]]] = None
+
+    @model_validator(mode="after")
+    def columns_have_same_length(self):
+        n = len(self.industry)
+        for name, column in self:
+            if isinstance(column, list) and len(column) != n:
+                raise ValueError(f"'{name}' has {len(column)} values, expected {n}")
+        return self
+
+
+class BatchScoreResponse(BaseModel):
+    count: int
+    merchant_id: Optional[List[str]] = None
+    score: List[int]
+    tier: List[str]
+    decision: List[str]
+    limit_suggestion: List[str]
+    heat_score: List[int]
+    risk_tags: List[List[str]]
+    ruleset_version: str
+
+
+class RescoringJobRequest(BaseModel):
+    chunk_size: int = Field(5000, ge=100, le=50000)
+    resume_job_id: Optional[str] = None
+
+
+class RescoringJobResponse(BaseModel):
+    id: str
+    status: str
+    chunk_size: int
+    ruleset_version: Optional[str] = None
+    total: int
+    processed: int
+    last_merchant_id: Optional[str] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
 class MerchantResponse(BaseModel):
     message: str
     merchant_id: str
     merchant_profile: str
 
 
+class MerchantImportRow(BaseModel):
+    row: int  # 1-based line/record number in the upload
+    status: Literal["created", "exists", "invalid", "failed"]
+    merchant_id: Optional[str] = None
+    score: Optional[int] = None
+    tier: Optional[str] = None
+    errors: List[str] = Field(default_factory=list)
+
+
+class MerchantImportResponse(BaseModel):
+    total: int
+    created: int
+    exists: int
+    invalid: int
+    failed: int
+    ruleset_version: Optional[str] = None
+    rows: List[MerchantImportRow]
+
+
 class ExperianWebhook(BaseModel):
     merchant_id: str
     alert_type: str
@@ -254,6 +340,27 @@ class MerchantListResponse(BaseModel):
         from_attributes = True
 
 
+class MerchantListFilters(BaseModel):
+    tier: Optional[List[str]] = None
+    min_score: Optional[int] = None
+    max_score: Optional[int] = None
+    industry: Optional[List[str]] = None
+    type_of_merchant: Optional[List[str]] = None
+    joined_from: Optional[date] = None
+    joined_to: Optional[date] = None
+    q: Optional[str] = Field(None, min_length=2, description="Case-insensitive search in business_name/legal_entity")
+    sort: Literal["-created_at", "created_at", "-risk_score", "risk_score"] = "-created_at"
+
+
+class MerchantBulkDeleteRequest(BaseModel):
+    merchant_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class MerchantListPage(BaseModel):
+    items: List[MerchantListResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page; None on the last page
+
+
 ###########################################
 # Product
 ###########################################
@@ -9,6 +9,13 @@ from routers.plans.routers import router as plans_routers
 from routers.products.routers import router as products_routers
 from routers.gatways.routers import router as gateways_routers
 from routers.offers.routers import router as offers_routers
+from routers.score.routers import router as score_routers
+from routers.rescoring.routers import router as rescoring_routers
+from routers.ruleset.routers import router as ruleset_routers
+from routers.webhooks.routers import router as webhooks_routers
+from routers.export.routers import router as export_routers
+from routers.imports.routers import router as imports_routers
+from routers.diagnostics.routers import router as diagnostics_routers
 
 api_router = APIRouter()
 api_router.include_router(signup_router)
@@ -20,6 +27,13 @@ api_router.include_router(plans_routers)
 api_router.include_router(products_routers)
 api_router.include_router(gateways_routers)
 api_router.include_router(offers_routers)
+api_router.include_router(score_routers)
+api_router.include_router(rescoring_routers)
+api_router.include_router(ruleset_routers)
+api_router.include_router(webhooks_routers)
+api_router.include_router(export_routers)
+api_router.include_router(imports_routers)
+api_router.include_router(diagnostics_routers)
 
 # merchants
 api_router.include_router(merchant_router)
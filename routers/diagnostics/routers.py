@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from services.diagnostics.services import DiagnosticsService
+from utils.authentication import Principal, current_principal
+
+router = APIRouter(prefix="/api/v1", tags=["Diagnostics API"])
+
+
+@router.get("/diagnostics/event-loop")
+async def event_loop_stalls(limit: int = Query(20, ge=1, le=100),
+                            user: Principal = Depends(current_principal)):
+    return DiagnosticsService.event_loop(user, limit)
+
+
+@router.delete("/diagnostics/event-loop")
+async def reset_event_loop_stalls(user: Principal = Depends(current_principal)):
+    return DiagnosticsService.reset_event_loop(user)
+
+
+@router.get("/diagnostics/db-pool")
+async def db_pool_stats(user: Principal = Depends(current_principal)):
+    return DiagnosticsService.db_pools(user)
+
+
+@router.get("/diagnostics/sql")
+async def sql_stats(user: Principal = Depends(current_principal)):
+    return DiagnosticsService.sql(user)
+
+
+@router.delete("/diagnostics/sql")
+async def reset_sql_stats(user: Principal = Depends(current_principal)):
+    return DiagnosticsService.reset_sql(user)
@@ -0,0 +1,28 @@
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from models.models import User
+from models.schema import MerchantListFilters
+from services.export.services import ExportService
+from utils.authentication import current_user
+
+router = APIRouter(prefix="/api/v1", tags=["Export API"])
+
+
+@router.get("/export/merchants")
+async def export_merchants(
+        format: Literal["ndjson", "csv"] = Query("ndjson"),
+        tier: Optional[List[str]] = Query(None),
+        min_score: Optional[int] = Query(None, ge=0),
+        max_score: Optional[int] = Query(None, ge=0),
+        industry: Optional[List[str]] = Query(None),
+        type_of_merchant: Optional[List[str]] = Query(None),
+        joined_from: Optional[date] = Query(None),
+        joined_to: Optional[date] = Query(None),
+        q: Optional[str] = Query(None, min_length=2, description="Search business name / legal entity"),
+        user: User = Depends(current_user),
+):
+    filters = MerchantListFilters(tier=tier, min_score=min_score, max_score=max_score, industry=industry,
+                                  type_of_merchant=type_of_merchant, joined_from=joined_from,
+                                  joined_to=joined_to, q=q)
+    return ExportService.export_merchants(user, filters, fmt=format)
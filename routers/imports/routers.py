@@ -0,0 +1,23 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from sqlalchemy.orm import Session
+from connections.db_connection import get_db
+from models.models import User
+from models.schema import MerchantImportResponse
+from services.imports.services import ImportService
+from utils.authentication import current_user
+
+router = APIRouter(prefix="/api/v1", tags=["Import API"])
+
+
+@router.post("/import/merchants", response_model=MerchantImportResponse)
+def import_merchants(
+        file: UploadFile = File(...),
+        format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to the file extension"),
+        db_session: Session = Depends(get_db),
+        user: User = Depends(current_user),
+):
+    fmt = format or (file.filename or "").rsplit(".", 1)[-1].lower()
+    if fmt == "jsonl":
+        fmt = "ndjson"
+    return ImportService.import_merchants(file.file, fmt, user, db_session)
@@ -1,36 +1,51 @@
+from datetime import date
+from typing import List, Literal, Optional
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from connections.db_connection import get_db
-from models.models import User
-from models.schema import MerchantOnboardRequest, APIResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from connections.db_connection import get_async_db, get_read_async_db
+from connections.instrumentation import query_budget
+from models.schema import (MerchantOnboardRequest, APIResponse, MerchantListPage, MerchantListFilters,
+                           MerchantBulkDeleteRequest)
 from services.merchants.services import MerchantService
 from services.sign_up.services import SignUpService
-from utils.authentication import current_user
+from utils.authentication import Principal, current_principal
 
 router = APIRouter(prefix="/api/v1", tags=["Merchant API"])
 
 
-@router.get("/get/merchant")
-async def get_merchant(merchant_id: str, db_session: Session = Depends(get_db),
-                       user: User = Depends(current_user)):
-    return MerchantService.get_merchant_by_id(merchant_id, user, db_session)
+@router.get("/get/merchant", dependencies=[Depends(query_budget(3))])
+async def get_merchant(merchant_id: str, db_session: AsyncSession = Depends(get_read_async_db),
+                       user: Principal = Depends(current_principal)):
+    return await MerchantService.get_merchant_by_id(merchant_id, user, db_session)
 
 
 @router.post("/add/merchant")
-async def add_merchant(payload: MerchantOnboardRequest, db_session: Session = Depends(get_db),
-                       user: User = Depends(current_user)):
-    return SignUpService.add_merchant(payload, user, db_session)
+async def add_merchant(payload: MerchantOnboardRequest, db_session: AsyncSession = Depends(get_async_db),
+                       user: Principal = Depends(current_principal)):
+    return await SignUpService.add_merchant(payload, user, db_session)
 
 
-@router.get("/get/merchants")
+@router.get("/get/merchants", response_model=MerchantListPage, dependencies=[Depends(query_budget(3))])
 async def get_merchants(
         limit: int = Query(100, ge=1, le=500),
-        offset: int = Query(0, ge=0),
-        user: User = Depends(current_user),
-        db=Depends(get_db),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        tier: Optional[List[str]] = Query(None),
+        min_score: Optional[int] = Query(None, ge=0),
+        max_score: Optional[int] = Query(None, ge=0),
+        industry: Optional[List[str]] = Query(None),
+        type_of_merchant: Optional[List[str]] = Query(None),
+        joined_from: Optional[date] = Query(None),
+        joined_to: Optional[date] = Query(None),
+        q: Optional[str] = Query(None, min_length=2, description="Search business name / legal entity"),
+        sort: Literal["-created_at", "created_at", "-risk_score", "risk_score"] = Query("-created_at"),
+        user: Principal = Depends(current_principal),
+        db: AsyncSession = Depends(get_read_async_db),
 ):
-    return MerchantService.list_merchants_response(
-        db, user, limit=limit, offset=offset
+    filters = MerchantListFilters(tier=tier, min_score=min_score, max_score=max_score, industry=industry,
+                                  type_of_merchant=type_of_merchant, joined_from=joined_from,
+                                  joined_to=joined_to, q=q, sort=sort)
+    return await MerchantService.list_merchants_response(
+        db, user, limit=limit, cursor=cursor, filters=filters
     )
 
 
@@ -38,16 +53,26 @@ async def get_merchants(
 async def edit_merchant(
     merchant_id: str,
     payload: MerchantOnboardRequest,
-    db_session: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    db_session: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(current_principal),
 ):
-    return MerchantService.update_merchant(merchant_id, payload, user, db_session)
+    return await MerchantService.update_merchant(merchant_id, payload, user, db_session)
 
 
 @router.delete("/delete/merchant/{merchant_id}", response_model=APIResponse)
 async def delete_merchant(
     merchant_id: str,
-    db_session: Session = Depends(get_db),
-    user: User = Depends(current_user),
+    db_session: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(current_principal),
 ):
-    return MerchantService.delete_merchant(merchant_id, user, db_session)
+    # soft delete only; the scheduled "purge" job (see services/scheduled) removes the rows later
+    return await MerchantService.delete_merchant(merchant_id, user, db_session)
+
+
+@router.post("/delete/merchants", response_model=APIResponse)
+async def bulk_delete_merchants(
+    payload: MerchantBulkDeleteRequest,
+    db_session: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(current_principal),
+):
+    return await MerchantService.bulk_delete_merchants(payload, user, db_session)
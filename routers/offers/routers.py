@@ -1,20 +1,19 @@
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from connections.db_connection import get_db
-from models.models import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from connections.db_connection import get_async_db, get_read_async_db
 from models.schema import OfferRequestDAO
 from services.offers.service import OfferService
-from utils.authentication import current_user
+from utils.authentication import Principal, current_principal
 
 router = APIRouter(prefix="/api/v1", tags=["Offers API"])
 
 
 @router.post("/add/offers", status_code=status.HTTP_201_CREATED)
 async def add_offers(payload: OfferRequestDAO,
-                     user: User = Depends(current_user), db_session: Session = Depends(get_db)):
+                     user: Principal = Depends(current_principal), db_session: AsyncSession = Depends(get_async_db)):
     return await OfferService.build_and_create(payload, user, db_session)
 
 
 @router.get("/get/offer", status_code=status.HTTP_200_OK)
-async def get_offers(db_session: Session = Depends(get_db)):
+async def get_offers(db_session: AsyncSession = Depends(get_read_async_db)):
     return await OfferService.get(db_session)
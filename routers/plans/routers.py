@@ -1,23 +1,22 @@
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
-from connections.db_connection import get_db
-from models.models import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from connections.db_connection import get_async_db, get_read_async_db
 from models.schema import PlanRequestDAO
 from services.plans.service import PlanService
 # from services.plans.webhook import PlanWebhook
-from utils.authentication import current_user
+from utils.authentication import Principal, current_principal
 
 router = APIRouter(prefix="/api/v1", tags=["Plans API"])
 
 
 @router.get("/get/plans")
-async def get_plans(db_session: Session = Depends(get_db)):
+async def get_plans(db_session: AsyncSession = Depends(get_read_async_db)):
     return await PlanService.get(db_session)
 
 
 @router.post("/add/plans")
-async def add_plans(payload: PlanRequestDAO, db_session: Session = Depends(get_db),
-                    user: User = Depends(current_user)):
+async def add_plans(payload: PlanRequestDAO, db_session: AsyncSession = Depends(get_async_db),
+                    user: Principal = Depends(current_principal)):
     return await PlanService.build_and_create(payload, user, db_session)
 
 
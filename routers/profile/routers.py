@@ -1,18 +1,20 @@
 from fastapi import APIRouter, Depends, Form, File, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models.models import User
 from models.schema import UserResponse
 from services.profile.service import ProfileService
-from utils.authentication import current_user
-from connections.db_connection import get_db  # <-- make sure you already have this in your project
+from utils.authentication import Principal, current_principal, current_user
+from connections.instrumentation import query_budget
+from connections.db_connection import get_db, get_read_async_db  # <-- make sure you already have this in your project
 
 router = APIRouter(prefix="/api/v1", tags=["Profile API"])
 
 
-@router.get("/user/me", response_model=UserResponse)
-async def me(user: User = Depends(current_user)):
-    return ProfileService.me(user)
+@router.get("/user/me", response_model=UserResponse, dependencies=[Depends(query_budget(3))])
+async def me(principal: Principal = Depends(current_principal), db: AsyncSession = Depends(get_read_async_db)):
+    return ProfileService.me(await ProfileService.get_user(principal.id, db))
 
 
 @router.put("/user/edit", response_model=UserResponse)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from connections.db_connection import get_db
+from models.schema import RescoringJobRequest, RescoringJobResponse
+from services.rescoring.services import RescoringService
+from utils.authentication import Principal, current_principal
+
+router = APIRouter(prefix="/api/v1", tags=["Rescoring API"])
+
+
+# plain def: the sync session's queries (a COUNT over the whole portfolio on start) run in the threadpool
+@router.post("/rescore/jobs", response_model=RescoringJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def start_rescoring(payload: RescoringJobRequest, db_session: Session = Depends(get_db),
+                    user: Principal = Depends(current_principal)):
+    # queued only: the scheduled "rescoring" job (see services/scheduled) runs it, the request returns now
+    return RescoringService.start_or_resume(user, db_session, chunk_size=payload.chunk_size,
+                                            resume_job_id=payload.resume_job_id)
+
+
+@router.get("/rescore/jobs/{job_id}", response_model=RescoringJobResponse)
+def get_rescoring_job(job_id: str, db_session: Session = Depends(get_db),
+                      user: Principal = Depends(current_principal)):
+    return RescoringService.get(job_id, user, db_session)
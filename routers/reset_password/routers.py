@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, status, HTTPException
-from sqlalchemy.orm import Session
-from connections.db_connection import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from connections.db_connection import get_async_db
 from models.schema import ResetPasswordResponse, ResetPasswordRequest
 from services.reset_password.services import ResetPasswordService
 
@@ -8,5 +8,5 @@ router = APIRouter(prefix="/api/v1", tags=["User API"])
 
 
 @router.post("/reset-password", response_model=ResetPasswordResponse)
-def forgot_password(payload: ResetPasswordRequest, db_session: Session = Depends(get_db)):
-    return ResetPasswordService.reset_password(payload, db_session)
+async def forgot_password(payload: ResetPasswordRequest, db_session: AsyncSession = Depends(get_async_db)):
+    return await ResetPasswordService.reset_password(payload, db_session)
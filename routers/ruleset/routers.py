@@ -0,0 +1,28 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Body, Depends, Query
+from sqlalchemy.orm import Session
+from connections.db_connection import get_db
+from services.ruleset.services import RulesetService
+from utils.authentication import Principal, current_principal
+
+router = APIRouter(prefix="/api/v1", tags=["Ruleset API"])
+
+
+# plain def: RulesetService reads and commits on the sync session, so these run in the threadpool
+@router.get("/ruleset")
+def get_ruleset(db_session: Session = Depends(get_db), user: Principal = Depends(current_principal)):
+    RulesetService.sync(db_session)
+    return RulesetService.current(user)
+
+
+@router.post("/ruleset")
+def publish_ruleset(spec: Dict[str, Any] = Body(...), activate: bool = Query(True),
+                    db_session: Session = Depends(get_db), user: Principal = Depends(current_principal)):
+    return RulesetService.publish(spec, user, db_session, activate=activate)
+
+
+@router.patch("/ruleset/{version}/activate")
+def activate_ruleset(version: str, db_session: Session = Depends(get_db),
+                     user: Principal = Depends(current_principal)):
+    return RulesetService.activate(version, user, db_session)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from connections.db_connection import get_db
+from models.models import User
+from models.schema import BatchScoreRequest, BatchScoreResponse
+from services.score.services import ScoreService
+from utils.authentication import current_user
+
+router = APIRouter(prefix="/api/v1", tags=["Score API"])
+
+
+@router.post("/score/batch", response_model=BatchScoreResponse)
+def score_batch(payload: BatchScoreRequest, db_session: Session = Depends(get_db),
+                user: User = Depends(current_user)):
+    return ScoreService.score_batch(payload, user, db_session)
+
+
+@router.get("/score/cache")
+async def score_cache_stats(user: User = Depends(current_user)):
+    return ScoreService.cache_stats(user)
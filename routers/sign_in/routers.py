@@ -1,12 +1,24 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models.schema import SignInRequest, SignInResponse
-from connections.db_connection import get_db
+from models.schema import SignInRequest, SignInResponse, TokenRefreshRequest
+from connections.db_connection import get_async_db, get_db
 from services.sign_in.services import SignInService
+from utils.authentication import Principal, current_principal
 
 router = APIRouter(prefix="/api/v1", tags=["User API"])
 
 
 @router.post("/signin", response_model=SignInResponse)
-def signin(payload: SignInRequest, db: Session = Depends(get_db)):
-    return SignInService.login_user(payload, db)
+async def signin(payload: SignInRequest, db: AsyncSession = Depends(get_async_db)):
+    return await SignInService.login_user(payload, db)
+
+
+@router.post("/token/refresh", response_model=SignInResponse)
+def refresh_token(payload: TokenRefreshRequest, db: Session = Depends(get_db)):
+    return SignInService.refresh_token(payload, db)
+
+
+@router.get("/auth/hashing")
+async def password_hashing_stats(user: Principal = Depends(current_principal)):
+    return SignInService.hashing_stats(user)
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, status, Depends, HTTPException
-from sqlalchemy.orm import Session
-from connections.db_connection import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from connections.db_connection import get_async_db
 from models.schema import SignUpRequest, SignUpResponse
 from services.sign_up.services import SignUpService
 from models.models import User
-from utils.authentication import current_user
+from utils.authentication import Principal, current_principal
 from typing import List
 from models.schema import UserResponse
 
@@ -12,25 +14,27 @@ router = APIRouter(prefix="/api/v1", tags=["User API"])
 
 
 @router.post("/signup", response_model=SignUpResponse, status_code=status.HTTP_201_CREATED)
-async def signup(payload: SignUpRequest, db_session: Session = Depends(get_db)):
-    return SignUpService.register_user(payload, db_session)
+async def signup(payload: SignUpRequest, db_session: AsyncSession = Depends(get_async_db)):
+    return await SignUpService.register_user(payload, db_session)
 
 @router.post("/signup/admin", response_model=SignUpResponse, status_code=status.HTTP_201_CREATED)
-async def signup(payload: SignUpRequest, db_session: Session = Depends(get_db),
-                user: User = Depends(current_user)):
+async def signup(payload: SignUpRequest, db_session: AsyncSession = Depends(get_async_db),
+                user: Principal = Depends(current_principal)):
 
-    return SignUpService.register_admin(payload, user, db_session)
+    return await SignUpService.register_admin(payload, user, db_session)
 
 @router.post("/signup/root", response_model=SignUpResponse, status_code=status.HTTP_201_CREATED
 )
-async def signup_root(payload: SignUpRequest, db_session: Session = Depends(get_db)):
-    return SignUpService.register_root(payload, db_session)
+async def signup_root(payload: SignUpRequest, db_session: AsyncSession = Depends(get_async_db)):
+    return await SignUpService.register_root(payload, db_session)
 
 
 @router.get("/super-admin/admins", response_model=List[UserResponse])
-async def list_admins(db_session: Session = Depends(get_db), user: User = Depends(current_user)):
+async def list_admins(db_session: AsyncSession = Depends(get_async_db), user: Principal = Depends(current_principal)):
     if user.role != "super_admin":
         raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
-    admins = db_session.query(User).filter(User.created_by == user.id).all()
+    admins = (await db_session.scalars(
+        select(User).options(undefer(User.profile_image)).where(User.created_by == user.id)
+    )).all()
 
     return admins
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from connections.db_connection import get_db
+from models.schema import APIResponse, ExperianWebhook, FinicityWebhook
+from services.webhooks.services import WebhookService
+from utils.authentication import verify_webhook
+
+router = APIRouter(prefix="/api/v1", tags=["Webhooks API"], dependencies=[Depends(verify_webhook)])
+
+
+@router.post("/webhook/experian", response_model=APIResponse)
+def experian_webhook(payload: ExperianWebhook, db_session: Session = Depends(get_db)):
+    return WebhookService.experian(payload, db_session)
+
+
+@router.post("/webhook/finicity", response_model=APIResponse)
+def finicity_webhook(payload: FinicityWebhook, db_session: Session = Depends(get_db)):
+    return WebhookService.finicity(payload, db_session)
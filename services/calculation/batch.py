@@ -0,0 +1,243 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from services.calculation.ruleset import HIGH_RISK_CATEGORY, Bands, Ruleset, get_ruleset
+from services.calculation.services import ScoringInputs
+
+
+@dataclass
+class GateColumns:
+    points: np.ndarray
+    tags: Dict[str, np.ndarray]
+
+
+@dataclass
+class BatchResult:
+    score: np.ndarray
+    tier: np.ndarray
+    decision: np.ndarray
+    limit_suggestion: np.ndarray
+    heat_score: np.ndarray
+    risk_tags: List[List[str]]
+    explanation: Dict[str, np.ndarray]
+    ruleset_version: str
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def row(self, i: int) -> dict:
+        """Row ``i`` in the same shape as ``Calculation.combine_gates`` plus limit/heat."""
+        return {
+            "score": int(self.score[i]),
+            "tier": str(self.tier[i]),
+            "decision": str(self.decision[i]),
+            "limit_suggestion": str(self.limit_suggestion[i]),
+            "risk_tags": list(self.risk_tags[i]),
+            "explanation": {k: int(v[i]) for k, v in self.explanation.items()},
+            "heat_score": int(self.heat_score[i]),
+            "ruleset_version": self.ruleset_version,
+        }
+
+
+def _band_tags(bands: Bands, index: np.ndarray) -> Dict[str, np.ndarray]:
+    return {label: index == band for band, label in enumerate(bands.labels) if label}
+
+
+def _floats(values: Optional[Sequence], n: int, fill: float = np.nan) -> np.ndarray:
+    # None -> fill, so "missing" keeps the same meaning it has in the scalar gates
+    if values is None:
+        return np.full(n, fill, dtype=np.float64)
+    return np.array([fill if v is None else v for v in values], dtype=np.float64)
+
+
+class BatchCalculation:
+    """Column-wise twin of ``Calculation``.
+
+    Every gate takes NumPy arrays (one element per merchant) and returns the
+    same points/tags the scalar gate would for each row. Band lookups use
+    ``np.searchsorted`` over the ruleset's breakpoints. Missing optional
+    inputs are ``NaN``.
+    """
+
+    @staticmethod
+    def gate_age_income(annual_income: np.ndarray, verified_income: np.ndarray, rules: Ruleset) -> GateColumns:
+        rules = rules.age_income
+        has_verified = ~np.isnan(verified_income)
+        base = np.where(has_verified, verified_income, annual_income)
+        band = rules.income_bands.index_array(base)
+        points = rules.income_bands.points_array(band)
+        mismatch = has_verified & (np.nan_to_num(verified_income) < rules.mismatch_ratio * annual_income)
+        points -= rules.mismatch_penalty * mismatch
+        return GateColumns(points, {**_band_tags(rules.income_bands, band), "income_mismatch": mismatch})
+
+    @staticmethod
+    def gate_identity_fraud(device_risk_score: np.ndarray, fraud_score: np.ndarray, rules: Ruleset) -> GateColumns:
+        rules = rules.identity_fraud
+        dr = np.clip(device_risk_score, 0.0, 1.0)
+        fr = np.clip(fraud_score, 0.0, 1.0)
+        # int() in the scalar gate truncates; both terms are >= 0 so trunc == floor
+        points = (np.trunc((1 - dr) * rules.device_weight).astype(np.int64)
+                  + np.trunc((1 - fr) * rules.fraud_weight).astype(np.int64))
+        band = rules.fraud_bands.index_array(fr)
+        points += rules.fraud_bands.points_array(band)
+        tags = _band_tags(rules.fraud_bands, band)
+        tags.setdefault("high_fraud_signal", np.zeros(len(points), dtype=bool))
+        return GateColumns(points, tags)
+
+    @staticmethod
+    def gate_creditworthiness(fico_score: np.ndarray, utilization: np.ndarray,
+                              chargeoffs: np.ndarray, dti: np.ndarray, rules: Ruleset) -> GateColumns:
+        rules = rules.creditworthiness
+        thin_file = np.isnan(fico_score)
+        fico = np.nan_to_num(fico_score, nan=0.0)
+        knockout = ~thin_file & (fico < rules.knockout_below)
+        points = np.where(thin_file, rules.thin_file_points,
+                          rules.fico_bands.points_array(rules.fico_bands.index_array(fico))).astype(np.int64)
+
+        high_util = ~knockout & (utilization > rules.utilization_above)
+        has_chargeoffs = ~knockout & (chargeoffs > 0)
+        high_dti = ~knockout & (dti > rules.dti_above)
+        points -= (rules.utilization_penalty * high_util + rules.chargeoffs_penalty * has_chargeoffs
+                   + rules.dti_penalty * high_dti)
+        # knockout short-circuits every other rule in the scalar gate
+        points = np.where(knockout, rules.knockout_points, points)
+        return GateColumns(points, {
+            "thin_file": thin_file,
+            "fico_below_min": knockout,
+            "high_utilization": high_util,
+            "chargeoffs_present": has_chargeoffs,
+            "high_dti": high_dti,
+        })
+
+    @staticmethod
+    def gate_bank_behaviour(avg_balance: np.ndarray, overdrafts_6mo: np.ndarray, nsf_fees: np.ndarray,
+                            rules: Ruleset) -> GateColumns:
+        rules = rules.bank_behaviour
+        balance_band = rules.balance_bands.index_array(avg_balance)
+        overdraft_band = rules.overdraft_bands.index_array(overdrafts_6mo)
+        points = rules.balance_bands.points_array(balance_band) + rules.overdraft_bands.points_array(overdraft_band)
+        nsf = nsf_fees >= rules.nsf_at
+        points -= rules.nsf_penalty * nsf
+        return GateColumns(points, {
+            **_band_tags(rules.balance_bands, balance_band),
+            **_band_tags(rules.overdraft_bands, overdraft_band),
+            "nsf_events": nsf,
+        })
+
+    @staticmethod
+    def industry_rules(industries: Sequence[str], keywords: Optional[Sequence[Sequence[str]]], rules: Ruleset,
+                       texts: Optional[Sequence[Sequence[str]]] = None):
+        # Returns (industry_points, per-row industry tags, heat_penalty)
+        rules = rules.industry
+        n = len(industries)
+        normalized = np.array([(i or "").lower().strip().replace(" ", "_") for i in industries], dtype=object)
+        uniques, inverse = np.unique(normalized, return_inverse=True) if n else (np.array([]), np.array([], int))
+        industry_hit = np.array([u in rules.high_risk for u in uniques], dtype=bool)[inverse]
+
+        keywords = keywords if keywords is not None else [()] * n
+        texts = texts if texts is not None else [()] * n
+        matches = [rules.screening.scan([*(kw or []), *(tx or [])]) for kw, tx in zip(keywords, texts)]
+        base_score = np.fromiter((rules.points_for(m) for m in matches), dtype=np.int64, count=n)
+        base_score = np.where(industry_hit, rules.risky_points, base_score).astype(np.int64)
+
+        tags: List[List[str]] = []
+        for i, m in enumerate(matches):
+            if industry_hit[i]:
+                m.pop(HIGH_RISK_CATEGORY, None)
+                tags.append([normalized[i], *sorted(m)])
+            else:
+                tags.append(sorted(m))
+        return base_score, tags, (rules.safe_points - base_score) * rules.heat_multiplier
+
+    @staticmethod
+    def combine_gates(g1: GateColumns, g2: GateColumns, g3: GateColumns, g4: GateColumns,
+                      industry_pts: np.ndarray, industry_tags: List[List[str]], rules: Ruleset):
+        credit_weight = g3.points
+        fraud_penalty = g2.points - rules.identity_fraud.combined_fraud_penalty * g2.tags["high_fraud_signal"]
+        bank_score = g4.points
+
+        raw = credit_weight + fraud_penalty + bank_score + industry_pts + g1.points
+        final_score = np.clip(raw, *rules.score_range)
+        tier = np.array(rules.tiers.bands.labels, dtype=object)[rules.tiers.bands.index_array(final_score)]
+        decision = np.array([rules.tiers.decisions[t] for t in tier], dtype=object)
+
+        risk_tags: List[List[str]] = [[] for _ in range(len(final_score))]
+        for gate in (g1, g2, g3, g4):
+            for name, mask in gate.tags.items():
+                for i in np.flatnonzero(mask):
+                    risk_tags[i].append(name)
+        for i, tags in enumerate(industry_tags):
+            risk_tags[i].extend(t for t in tags if t not in risk_tags[i])
+
+        explanation = {
+            "credit_weight": credit_weight,
+            "fraud_penalty": fraud_penalty,
+            "bank_score": bank_score,
+            "industry_risk_penalty": industry_pts,
+        }
+        return final_score, tier, decision, risk_tags, explanation
+
+    @staticmethod
+    def score(annual_income: Sequence, industry: Sequence[str], *,
+              verified_income: Optional[Sequence] = None,
+              fico_score: Optional[Sequence] = None,
+              utilization: Optional[Sequence] = None,
+              chargeoffs: Optional[Sequence] = None,
+              dti: Optional[Sequence] = None,
+              avg_balance: Optional[Sequence] = None,
+              overdrafts_6mo: Optional[Sequence] = None,
+              nsf_fees: Optional[Sequence] = None,
+              device_risk_score: Optional[Sequence] = None,
+              fraud_score: Optional[Sequence] = None,
+              keywords: Optional[Sequence[Sequence[str]]] = None,
+              business_name: Optional[Sequence[Optional[str]]] = None,
+              dba: Optional[Sequence[Optional[str]]] = None,
+              website: Optional[Sequence[Optional[str]]] = None,
+              rules: Optional[Ruleset] = None) -> BatchResult:
+        """Score ``len(industry)`` merchants in one pass with a single ruleset snapshot.
+
+        Column defaults mirror ``SignUpService.add_merchant``: missing income,
+        balances and risk scores count as 0, missing verified income / FICO /
+        utilization as "not provided".
+        """
+        rules = rules or get_ruleset()
+        n = len(industry)
+        g1 = BatchCalculation.gate_age_income(_floats(annual_income, n, 0.0), _floats(verified_income, n), rules)
+        g2 = BatchCalculation.gate_identity_fraud(_floats(device_risk_score, n, 0.0), _floats(fraud_score, n, 0.0),
+                                                  rules)
+        g3 = BatchCalculation.gate_creditworthiness(_floats(fico_score, n), _floats(utilization, n),
+                                                    _floats(chargeoffs, n), _floats(dti, n), rules)
+        g4 = BatchCalculation.gate_bank_behaviour(_floats(avg_balance, n, 0.0), _floats(overdrafts_6mo, n, 0.0),
+                                                  _floats(nsf_fees, n, 0.0), rules)
+        texts = None
+        if business_name is not None or dba is not None or website is not None:
+            blank = [None] * n
+            texts = [[t for t in row if t] for row in zip(business_name or blank, dba or blank, website or blank)]
+        ind_pts, ind_tags, heat = BatchCalculation.industry_rules(industry, keywords, rules, texts)
+
+        score, tier, decision, risk_tags, explanation = BatchCalculation.combine_gates(
+            g1, g2, g3, g4, ind_pts, ind_tags, rules)
+        limit_suggestion = np.array([rules.tiers.limits.get(t, "$0") for t in tier], dtype=object)
+        return BatchResult(score, tier, decision, limit_suggestion, heat, risk_tags, explanation, rules.version)
+
+    @staticmethod
+    def score_inputs(inputs: Sequence[ScoringInputs], rules: Optional[Ruleset] = None) -> BatchResult:
+        """``score`` over a list of ``ScoringInputs``; row ``i`` matches ``Calculation.evaluate(inputs[i])``."""
+        return BatchCalculation.score(
+            [i.annual_income for i in inputs],
+            [i.industry for i in inputs],
+            verified_income=[i.verified_income for i in inputs],
+            fico_score=[i.fico_score for i in inputs],
+            avg_balance=[i.avg_balance for i in inputs],
+            overdrafts_6mo=[i.overdrafts_6mo for i in inputs],
+            nsf_fees=[i.nsf_fees for i in inputs],
+            device_risk_score=[i.device_risk_score for i in inputs],
+            fraud_score=[i.fraud_score for i in inputs],
+            keywords=[i.keywords for i in inputs],
+            business_name=[i.business_name for i in inputs],
+            dba=[i.dba for i in inputs],
+            website=[i.website for i in inputs],
+            rules=rules,
+        )
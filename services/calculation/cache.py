@@ -0,0 +1,100 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+
+from services.calculation.ruleset import Ruleset, get_ruleset
+from services.calculation.services import Calculation, ScoringInputs
+
+SCORE_CACHE_SIZE = int(os.getenv("SCORE_CACHE_SIZE", "10000"))
+SCORE_CACHE_TTL_SECONDS = float(os.getenv("SCORE_CACHE_TTL_SECONDS", "3600"))
+
+
+def fingerprint(inputs: ScoringInputs) -> str:
+    """Content address of ``inputs``: equal for any two inputs the gates cannot tell apart."""
+    canonical = asdict(inputs)
+    # industry_rules only sees a normalised industry and the lower-cased keyword set
+    canonical["industry"] = (inputs.industry or "").lower().strip().replace(" ", "_")
+    canonical["keywords"] = sorted({k.lower() for k in (inputs.keywords or [])})
+    raw = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _copy(result: dict) -> dict:
+    return copy.deepcopy(result)
+
+
+class ScoreCache:
+    """Bounded LRU of ``Calculation.evaluate`` results with a per-entry TTL.
+
+    Keys are ``<ruleset version>:<input fingerprint>`` so publishing a new
+    ruleset never serves a stale score.
+    """
+
+    def __init__(self, maxsize: int = SCORE_CACHE_SIZE, ttl: float = SCORE_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def evaluate(self, inputs: ScoringInputs, rules: Ruleset | None = None) -> dict:
+        """``Calculation.evaluate`` served from the cache when the same inputs were scored before.
+
+        The returned dict carries ``input_hash`` so callers can store it with the score.
+        """
+        rules = rules or get_ruleset()
+        input_hash = fingerprint(inputs)
+        key = f"{rules.version}:{input_hash}"
+        cached = self.get(key)
+        if cached is None:
+            cached = Calculation.evaluate(inputs, rules)
+            cached["input_hash"] = input_hash
+            self.put(key, cached)
+        return _copy(cached)
+
+
+score_cache = ScoreCache()
@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import numpy as np
+
+from services.calculation.screening import KeywordMatcher, load_terms
+
+DEFAULT_RULESET_PATH = os.path.join(os.path.dirname(__file__), "rulesets", "default.json")
+RULESET_PATH = os.getenv("SCORING_RULESET_PATH", DEFAULT_RULESET_PATH)
+
+# screening category the ruleset's own high_risk terms are reported under
+HIGH_RISK_CATEGORY = "high_risk_keyword"
+
+
+@dataclass(frozen=True)
+class Bands:
+    """Sorted breakpoints splitting a value range into ``len(breakpoints) + 1`` bands.
+
+    ``side="right"`` means a value equal to a breakpoint falls in the upper band
+    (``value >= breakpoint``); ``side="left"`` keeps it in the lower one
+    (``value > breakpoint``).
+    """
+    breakpoints: Tuple[float, ...]
+    points: Tuple[int, ...]
+    labels: Tuple[Optional[str], ...]
+    side: str = "right"
+    _array: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if list(self.breakpoints) != sorted(set(self.breakpoints)):
+            raise ValueError(f"breakpoints must be strictly increasing: {self.breakpoints}")
+        if len(self.points) != len(self.breakpoints) + 1 or len(self.labels) != len(self.points):
+            raise ValueError("bands need exactly one point/label value more than breakpoints")
+        if self.side not in ("left", "right"):
+            raise ValueError(f"side must be 'left' or 'right', got {self.side!r}")
+        object.__setattr__(self, "_array", np.asarray(self.breakpoints, dtype=np.float64))
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "Bands":
+        breakpoints = tuple(spec["breakpoints"])
+        points = tuple(spec.get("points") or [0] * (len(breakpoints) + 1))
+        labels = tuple(spec.get("labels") or [None] * len(points))
+        return cls(breakpoints, points, labels, spec.get("side", "right"))
+
+    def index(self, value: float) -> int:
+        search = bisect_right if self.side == "right" else bisect_left
+        return search(self.breakpoints, value)
+
+    def index_array(self, values: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self._array, values, side=self.side)
+
+    def points_array(self, index: np.ndarray) -> np.ndarray:
+        return np.asarray(self.points, dtype=np.int64)[index]
+
+
+@dataclass(frozen=True)
+class AgeIncomeRules:
+    income_bands: Bands
+    mismatch_ratio: float
+    mismatch_penalty: int
+
+
+@dataclass(frozen=True)
+class IdentityFraudRules:
+    device_weight: int
+    fraud_weight: int
+    fraud_bands: Bands
+    combined_fraud_penalty: int
+
+
+@dataclass(frozen=True)
+class CreditRules:
+    thin_file_points: int
+    knockout_below: float
+    knockout_points: int
+    fico_bands: Bands
+    utilization_above: float
+    utilization_penalty: int
+    chargeoffs_penalty: int
+    dti_above: float
+    dti_penalty: int
+
+
+@dataclass(frozen=True)
+class BankRules:
+    balance_bands: Bands
+    overdraft_bands: Bands
+    nsf_at: int
+    nsf_penalty: int
+
+
+@dataclass(frozen=True)
+class IndustryRules:
+    high_risk: FrozenSet[str]
+    safe_points: int
+    risky_points: int
+    heat_multiplier: int
+    screening: KeywordMatcher = field(repr=False, compare=False)
+
+    def points_for(self, matches: Dict[str, int]) -> int:
+        return max(self.risky_points, self.safe_points - sum(matches.values()))
+
+
+@dataclass(frozen=True)
+class TierRules:
+    bands: Bands
+    decisions: Dict[str, str]
+    limits: Dict[str, str]
+
+
+@dataclass(frozen=True)
+class Ruleset:
+    version: str
+    age_income: AgeIncomeRules
+    identity_fraud: IdentityFraudRules
+    creditworthiness: CreditRules
+    bank_behaviour: BankRules
+    industry: IndustryRules
+    tiers: TierRules
+    score_range: Tuple[int, int]
+    spec: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "Ruleset":
+        """Validate a ruleset document and compile its bands. Raises ValueError/KeyError if malformed."""
+        ai, idf, cr, bb, ind, tiers = (spec["age_income"], spec["identity_fraud"], spec["creditworthiness"],
+                                       spec["bank_behaviour"], spec["industry"], spec["tiers"])
+        tier_bands = Bands.from_dict({"breakpoints": tiers["breakpoints"], "labels": tiers["labels"]})
+        if set(tier_bands.labels) - set(tiers["decisions"]) or set(tier_bands.labels) - set(tiers["limits"]):
+            raise ValueError("every tier needs a decision and a limit")
+        return cls(
+            version=str(spec["version"]),
+            age_income=AgeIncomeRules(Bands.from_dict(ai["income_bands"]), ai["mismatch_ratio"],
+                                      ai["mismatch_penalty"]),
+            identity_fraud=IdentityFraudRules(idf["device_weight"], idf["fraud_weight"],
+                                              Bands.from_dict(idf["fraud_bands"]), idf["combined_fraud_penalty"]),
+            creditworthiness=CreditRules(
+                cr["thin_file_points"], cr["knockout_below"], cr["knockout_points"], Bands.from_dict(cr["fico_bands"]),
+                cr["utilization_above"], cr["utilization_penalty"], cr["chargeoffs_penalty"], cr["dti_above"],
+                cr["dti_penalty"]),
+            bank_behaviour=BankRules(Bands.from_dict(bb["balance_bands"]), Bands.from_dict(bb["overdraft_bands"]),
+                                     bb["nsf_at"], bb["nsf_penalty"]),
+            industry=IndustryRules(
+                frozenset(k.lower() for k in ind["high_risk"]), ind["safe_points"], ind["risky_points"],
+                ind["heat_multiplier"],
+                KeywordMatcher([*((k, HIGH_RISK_CATEGORY, ind["safe_points"] - ind["risky_points"])
+                                  for k in ind["high_risk"]), *load_terms()])),
+            tiers=TierRules(tier_bands, dict(tiers["decisions"]), dict(tiers["limits"])),
+            score_range=tuple(spec.get("score_range", (0, 100))),
+            spec=spec,
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "Ruleset":
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def from_file(cls, path: str) -> "Ruleset":
+        with open(path) as fh:
+            return cls.from_json(fh.read())
+
+    def tier(self, score: int) -> str:
+        return self.tiers.bands.labels[self.tiers.bands.index(score)]
+
+
+_lock = threading.Lock()
+# the ruleset shipped with the code; it has no scoring_rulesets row until it is (re-)activated
+_bundled: Ruleset = Ruleset.from_file(RULESET_PATH)
+_active: Ruleset = _bundled
+
+
+def get_ruleset() -> Ruleset:
+    """The ruleset scoring should use right now.
+
+    Callers should read it once per score so every gate of one evaluation sees
+    the same version even if it is swapped mid-flight.
+    """
+    return _active
+
+
+def get_bundled_ruleset() -> Ruleset:
+    return _bundled
+
+
+def swap_ruleset(ruleset: Ruleset) -> Ruleset:
+    """Atomically make ``ruleset`` the active one; returns the previous ruleset."""
+    global _active
+    with _lock:
+        previous, _active = _active, ruleset
+    return previous
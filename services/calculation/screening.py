@@ -0,0 +1,89 @@
+import csv
+import os
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_TERMS_PATH = os.path.join(os.path.dirname(__file__), "rulesets", "screening_terms.csv")
+SCREENING_TERMS_PATH = os.getenv("SCREENING_TERMS_PATH", DEFAULT_TERMS_PATH)
+
+# Separates fields in one scan; normalize() never produces it, so no term can match across two fields
+_FIELD_SEPARATOR = "\n"
+
+Term = Tuple[str, str, int]  # (term, category, weight)
+
+
+def normalize(text: str) -> str:
+    return " ".join((text or "").lower().replace("_", " ").replace("-", " ").split())
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a compliance term list.
+
+    Built once from ``(term, category, weight)`` triples; ``scan`` walks all
+    of a merchant's text in a single pass, so the cost depends on the length
+    of the text and not on how many terms are screened.
+    """
+
+    def __init__(self, terms: Iterable[Term]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, int]]] = [[]]
+        self.size = 0
+        for term, category, weight in terms:
+            self._add(normalize(term), category, int(weight))
+        self._link()
+
+    def _add(self, term: str, category: str, weight: int) -> None:
+        if not term:
+            return
+        node = 0
+        for ch in term:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((category, weight))
+        self.size += 1
+
+    def _link(self) -> None:
+        # breadth-first so every node's fail target is final before its children are linked
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, texts: Iterable[str]) -> Dict[str, int]:
+        """Matched categories mapped to the highest weight seen for each."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Dict[str, int] = {}
+        node = 0
+        for ch in _FIELD_SEPARATOR.join(normalize(t) for t in texts if t):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for category, weight in out[node]:
+                if weight > found.get(category, -1):
+                    found[category] = weight
+        return found
+
+
+@lru_cache(maxsize=None)
+def load_terms(path: str = SCREENING_TERMS_PATH) -> Tuple[Term, ...]:
+    """Read ``term,category,weight`` rows; blank lines and lines starting with ``#`` are skipped."""
+    if not os.path.exists(path):
+        return ()
+    with open(path, newline="") as fh:
+        rows = csv.DictReader(line for line in fh if line.strip() and not line.lstrip().startswith("#"))
+        return tuple((r["term"], r["category"], int(r["weight"])) for r in rows)
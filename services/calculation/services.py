@@ -1,7 +1,7 @@
-from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from dataclasses import dataclass, field
+from typing import Iterable, List, Dict, Optional, Tuple
 
-HIGH_RISK = {"peptides", "cannabis", "psilocybin", "subscription_ecommerce"}
+from services.calculation.ruleset import HIGH_RISK_CATEGORY, Ruleset, get_ruleset
 
 
 @dataclass
@@ -11,6 +11,44 @@ class BankBehavior:
     nsf_fees: int = 0
 
 
+@dataclass
+class ScoringInputs:
+    # Everything the gates read, flattened; one of these is stored per ScoringInput version
+    self_employed: bool = False
+    annual_income: float = 0.0
+    verified_income: Optional[float] = None
+    fico_score: Optional[int] = None
+    overdrafts_6mo: int = 0
+    avg_balance: float = 0.0
+    nsf_fees: int = 0
+    device_risk_score: float = 0.0
+    fraud_score: float = 0.0
+    industry: str = ""
+    keywords: List[str] = field(default_factory=list)
+    business_name: Optional[str] = None
+    dba: Optional[str] = None
+    website: Optional[str] = None
+
+    @property
+    def bank_behaviour(self) -> BankBehavior:
+        return BankBehavior(self.overdrafts_6mo, self.avg_balance, self.nsf_fees)
+
+    @property
+    def screening_texts(self) -> List[str]:
+        # free-text fields screened alongside keywords by industry_rules
+        return [t for t in (self.business_name, self.dba, self.website) if t]
+
+
+# ScoringInputs fields each gate reads, in evaluation order
+GATE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "age_income": ("self_employed", "annual_income", "verified_income"),
+    "identity_fraud": ("device_risk_score", "fraud_score"),
+    "creditworthiness": ("fico_score",),
+    "bank_behaviour": ("overdrafts_6mo", "avg_balance", "nsf_fees"),
+    "industry": ("industry", "keywords", "business_name", "dba", "website"),
+}
+
+
 @dataclass
 class GateOutput:
     points: int
@@ -19,132 +57,122 @@ class GateOutput:
 
 
 class Calculation:
+    # Every threshold comes from the active Ruleset (services/calculation/rulesets/*.json).
+    # Pass ``rules`` explicitly to pin one ruleset across all gates of a single evaluation.
 
     @staticmethod
-    def gate_age_income(self_employed: bool, annual_income: float, verified_income: float | None) -> GateOutput:
+    def gate_age_income(self_employed: bool, annual_income: float, verified_income: float | None,
+                        rules: Ruleset | None = None) -> GateOutput:
         # Gate 1: Age & Income (brief: model income suitability)
         # Simplified: use income sufficiency + delta to verified
+        rules = (rules or get_ruleset()).age_income
         points = 0
         tags: List[str] = []
         details = {}
         base = verified_income if verified_income is not None else annual_income
-        if base >= 90000:
-            points += 20
-        elif base >= 60000:
-            points += 12
-        elif base >= 30000:
-            points += 5
-        else:
-            points -= 10
-            tags.append("low_income")
-        if verified_income is not None and verified_income < 0.8 * annual_income:
-            points -= 5
+        band = rules.income_bands.index(base)
+        points += rules.income_bands.points[band]
+        if rules.income_bands.labels[band]:
+            tags.append(rules.income_bands.labels[band])
+        if verified_income is not None and verified_income < rules.mismatch_ratio * annual_income:
+            points -= rules.mismatch_penalty
             tags.append("income_mismatch")
         details.update({"income_used": base})
         return GateOutput(points, tags, details)
 
     @staticmethod
-    def gate_identity_fraud(device_risk_score: float, fraud_score: float) -> GateOutput:
+    def gate_identity_fraud(device_risk_score: float, fraud_score: float,
+                            rules: Ruleset | None = None) -> GateOutput:
         # Gate 2: Identity & Fraud (simulate Socure + SentiLink style scores)
+        rules = (rules or get_ruleset()).identity_fraud
         points = 0
         tags: List[str] = []
         details = {"device_risk_score": device_risk_score, "fraud_score": fraud_score}
         # Lower is better; clamp 0..1
         dr = max(0.0, min(1.0, device_risk_score))
         fr = max(0.0, min(1.0, fraud_score))
-        points += int((1 - dr) * 10)  # good device hygiene adds points
-        points += int((1 - fr) * 15)  # lower fraud_score adds points
-        if fr > 0.6:
-            points -= 25;
-            tags.append("high_fraud_signal")
-        elif fr > 0.3:
-            tags.append("moderate_device_risk")
+        points += int((1 - dr) * rules.device_weight)  # good device hygiene adds points
+        points += int((1 - fr) * rules.fraud_weight)  # lower fraud_score adds points
+        band = rules.fraud_bands.index(fr)
+        points += rules.fraud_bands.points[band]
+        if rules.fraud_bands.labels[band]:
+            tags.append(rules.fraud_bands.labels[band])
         return GateOutput(points, tags, details)
 
     @staticmethod
     def gate_creditworthiness(fico_score: int | None, tradelines: int | None = None,
                               utilization: float | None = None, chargeoffs: int | None = None,
-                              dti: float | None = None) -> GateOutput:
+                              dti: float | None = None, rules: Ruleset | None = None) -> GateOutput:
         # Gate 3: Creditworthiness (simulate Experian logic per brief)
+        rules = (rules or get_ruleset()).creditworthiness
         points = 0
         tags: List[str] = []
         details = {"fico": fico_score, "tradelines": tradelines, "utilization": utilization, "chargeoffs": chargeoffs,
                    "dti": dti}
         if fico_score is None:
-            points -= 10
+            points += rules.thin_file_points
             tags.append("thin_file")
         else:
-            if fico_score < 580:
-                return GateOutput(points - 999, tags + ["fico_below_min"], details)  # knockout
-            elif fico_score < 620:
-                points -= 15
-            elif fico_score < 680:
-                points += 5
-            else:
-                points += 18
-        if utilization is not None and utilization > 0.75: points -= 10; tags.append("high_utilization")
-        if chargeoffs and chargeoffs > 0: points -= 20; tags.append("chargeoffs_present")
-        if dti is not None and dti > 0.45: points -= 8; tags.append("high_dti")
+            if fico_score < rules.knockout_below:
+                return GateOutput(points + rules.knockout_points, tags + ["fico_below_min"], details)  # knockout
+            points += rules.fico_bands.points[rules.fico_bands.index(fico_score)]
+        if utilization is not None and utilization > rules.utilization_above:
+            points -= rules.utilization_penalty; tags.append("high_utilization")
+        if chargeoffs and chargeoffs > 0: points -= rules.chargeoffs_penalty; tags.append("chargeoffs_present")
+        if dti is not None and dti > rules.dti_above: points -= rules.dti_penalty; tags.append("high_dti")
         return GateOutput(points, tags, details)
 
     @staticmethod
-    def gate_bank_behaviour(bb: BankBehavior) -> GateOutput:
+    def gate_bank_behaviour(bb: BankBehavior, rules: Ruleset | None = None) -> GateOutput:
         # Gate 4: Bank Behavior (simulate Plaid/Open Banking)
+        rules = (rules or get_ruleset()).bank_behaviour
         points = 0
         tags: List[str] = []
         details = {"overdrafts_6mo": bb.overdrafts_6mo, "avg_balance": bb.avg_balance, "nsf_fees": bb.nsf_fees}
-        if bb.avg_balance >= 5000:
-            points += 20
-        elif bb.avg_balance >= 2000:
-            points += 12
-        elif bb.avg_balance >= 500:
-            points += 5
-        else:
-            points -= 10;
-            tags.append("low_avg_balance")
-
-        if bb.overdrafts_6mo >= 3:
-            points -= 15;
-            tags.append("frequent_overdrafts")
-        elif bb.overdrafts_6mo == 2:
-            points -= 8
-        elif bb.overdrafts_6mo == 1:
-            points -= 4
-
-        if bb.nsf_fees >= 2: points -= 10; tags.append("nsf_events")
+        for bands, value in ((rules.balance_bands, bb.avg_balance), (rules.overdraft_bands, bb.overdrafts_6mo)):
+            band = bands.index(value)
+            points += bands.points[band]
+            if bands.labels[band]:
+                tags.append(bands.labels[band])
+
+        if bb.nsf_fees >= rules.nsf_at: points -= rules.nsf_penalty; tags.append("nsf_events")
         return GateOutput(points, tags, details)
 
-    def industry_rules(industry: str, keywords: list[str]) -> Tuple[int, list[str], int]:
+    def industry_rules(industry: str, keywords: list[str], rules: Ruleset | None = None,
+                       texts: Iterable[str] = ()) -> Tuple[int, list[str], int]:
         # Returns (industry_points, tags, heat_penalty)
+        rules = (rules or get_ruleset()).industry
         tags: List[str] = []
-        base_score = 10   # start with high score = safe
         ind = (industry or "").lower().strip().replace(" ", "_")
-        kw = {k.lower() for k in (keywords or [])}
+        # one pass over keywords + free text; each matched category takes its weight off the safe score
+        matches = rules.screening.scan([*(keywords or []), *texts])
+        base_score = rules.points_for(matches)   # safe_points when nothing matched
 
-        if ind in HIGH_RISK or len(HIGH_RISK & kw) > 0:
-            tags.append(ind if ind in HIGH_RISK else "high_risk_keyword")
-            base_score = 1   # lower score = more risk
+        if ind in rules.high_risk:
+            tags.append(ind)
+            base_score = rules.risky_points   # lower score = more risk
+            matches.pop(HIGH_RISK_CATEGORY, None)
+        tags.extend(sorted(matches))
 
         # heat_penalty now directly proportional to risk
-        return (base_score, tags, (10 - base_score) * 10)
+        return (base_score, tags, (rules.safe_points - base_score) * rules.heat_multiplier)
 
     @staticmethod
     def combine_gates(g1: GateOutput, g2: GateOutput, g3: GateOutput, g4: GateOutput,
-                      industry_pts: int, industry_tags: List[str]) -> dict:
+                      industry_pts: int, industry_tags: List[str], rules: Ruleset | None = None) -> dict:
+        rules = rules or get_ruleset()
         credit_weight = g3.points
-        fraud_penalty = g2.points - 10 if "high_fraud_signal" in g2.tags else g2.points
+        fraud_penalty = (g2.points - rules.identity_fraud.combined_fraud_penalty
+                         if "high_fraud_signal" in g2.tags else g2.points)
         bank_score = g4.points
         industry_penalty = industry_pts
 
         raw = credit_weight + fraud_penalty + bank_score + industry_penalty + g1.points
         # Normalize 0..100
-        final_score = max(0, min(100, raw))
-        if final_score >= 71:
-            tier, decision = "Hot", "Approve"
-        elif final_score >= 51:
-            tier, decision = "Warm", "Manual Review"
-        else:
-            tier, decision = "Cold", "Reject"
+        low, high = rules.score_range
+        final_score = max(low, min(high, raw))
+        tier = rules.tier(final_score)
+        decision = rules.tiers.decisions[tier]
 
         risk_tags = list({*g1.tags, *g2.tags, *g3.tags, *g4.tags, *industry_tags})
         explanation = {
@@ -155,3 +183,59 @@ class Calculation:
         }
         return {"score": final_score, "tier": tier, "decision": decision,
                 "risk_tags": risk_tags, "explanation": explanation}
+
+    @staticmethod
+    def gates_for(fields: Iterable[str]) -> set:
+        """Names of the gates that read any of ``fields`` (ScoringInputs attribute names)."""
+        fields = set(fields)
+        return {gate for gate, reads in GATE_FIELDS.items() if fields & set(reads)}
+
+    @staticmethod
+    def run_gate(name: str, inputs: ScoringInputs, rules: Ruleset) -> GateOutput:
+        if name == "age_income":
+            return Calculation.gate_age_income(inputs.self_employed, inputs.annual_income, inputs.verified_income,
+                                               rules)
+        if name == "identity_fraud":
+            return Calculation.gate_identity_fraud(inputs.device_risk_score, inputs.fraud_score, rules)
+        if name == "creditworthiness":
+            return Calculation.gate_creditworthiness(inputs.fico_score, rules=rules)
+        if name == "bank_behaviour":
+            return Calculation.gate_bank_behaviour(inputs.bank_behaviour, rules)
+        if name == "industry":
+            ind_pts, ind_tags, heat = Calculation.industry_rules(inputs.industry, inputs.keywords, rules,
+                                                                 inputs.screening_texts)
+            return GateOutput(ind_pts, ind_tags, {"heat_score": heat})
+        raise ValueError(f"Unknown gate {name!r}")
+
+    @staticmethod
+    def evaluate(inputs: ScoringInputs, rules: Ruleset | None = None, previous: dict | None = None,
+                 only: Iterable[str] | None = None) -> dict:
+        """Run the gates over ``inputs``; returns combine_gates output plus limit_suggestion, heat_score,
+        the ruleset_version that produced it and the per-gate outputs (``gates``).
+
+        With ``previous`` (an earlier result's ``gates``) and ``only``, just the named gates are
+        re-run and the others are reused, provided ``previous`` came from the same ruleset.
+        """
+        rules = rules or get_ruleset()
+        reusable = previous if previous and previous.get("ruleset_version") == rules.version else {}
+        gates: Dict[str, GateOutput] = {}
+        for name in GATE_FIELDS:
+            if only is not None and name not in only and name in reusable:
+                gates[name] = GateOutput(**reusable[name])
+            else:
+                gates[name] = Calculation.run_gate(name, inputs, rules)
+
+        industry = gates["industry"]
+        result = Calculation.combine_gates(gates["age_income"], gates["identity_fraud"], gates["creditworthiness"],
+                                           gates["bank_behaviour"], industry.points, industry.tags, rules)
+        result["limit_suggestion"] = Calculation.limit_suggestion(result["tier"], rules)
+        result["heat_score"] = industry.details["heat_score"]
+        result["ruleset_version"] = rules.version
+        result["gates"] = {"ruleset_version": rules.version,
+                           **{name: {"points": g.points, "tags": list(g.tags), "details": g.details}
+                              for name, g in gates.items()}}
+        return result
+
+    @staticmethod
+    def limit_suggestion(tier: str, rules: Ruleset | None = None) -> str:
+        return (rules or get_ruleset()).tiers.limits.get(tier, "$0")
@@ -0,0 +1,43 @@
+from fastapi import HTTPException
+
+from connections.db_connection import async_engine, engine
+from connections.instrumentation import sql_metrics
+from connections.pool import pool_status
+from connections.replicas import replica_router
+from utils.authentication import Principal
+from utils.watchdog import loop_watchdog
+
+
+class DiagnosticsService:
+
+    @staticmethod
+    def event_loop(user: Principal, limit: int = 20) -> dict:
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        return {**loop_watchdog.stats(), "recent": loop_watchdog.recent(limit)}
+
+    @staticmethod
+    def reset_event_loop(user: Principal) -> dict:
+        if user.role != "super_admin":
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        loop_watchdog.reset()
+        return loop_watchdog.stats()
+
+    @staticmethod
+    def db_pools(user: Principal) -> dict:
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        return {"pools": [pool_status(engine), pool_status(async_engine.sync_engine)], **replica_router.status()}
+
+    @staticmethod
+    def sql(user: Principal) -> dict:
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        return {"routes": sql_metrics.snapshot()}
+
+    @staticmethod
+    def reset_sql(user: Principal) -> dict:
+        if user.role != "super_admin":
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        sql_metrics.reset()
+        return {"routes": {}}
@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Iterator, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from connections.db_connection import SessionLocal
+from models.models import MerchantDB, MerchantProfile, ScoreEntry, User
+from models.schema import MerchantListFilters
+from services.merchants.services import MerchantService
+from utils.merchant.common import _as_list
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = (
+    MerchantDB.id.label("merchant_id"),
+    MerchantDB.business_name,
+    MerchantDB.legal_entity,
+    MerchantDB.industry,
+    MerchantDB.type_of_merchant,
+    MerchantDB.website,
+    MerchantDB.created_at.label("join_date"),
+    User.email,
+    MerchantProfile.state,
+    ScoreEntry.score,
+    ScoreEntry.tier,
+    ScoreEntry.decision,
+    ScoreEntry.limit_suggestion,
+    ScoreEntry.heat_score,
+    ScoreEntry.risk_tags,
+    ScoreEntry.ruleset_version,
+    ScoreEntry.created_at.label("scored_at"),
+)
+FIELDNAMES = [c.key for c in EXPORT_COLUMNS]
+
+
+class ExportService:
+    """Stream the merchant portfolio, one row per merchant with its latest score.
+
+    Rows come off a server-side cursor (``yield_per``) as plain tuples and are
+    encoded a chunk at a time, so memory stays flat however large the book is.
+    The stream owns its own session: the request's ``get_db`` session is
+    closed before a StreamingResponse body starts to run.
+    """
+
+    @staticmethod
+    def export_query(user: User, filters: MerchantListFilters):
+        stmt = (
+            select(*EXPORT_COLUMNS)
+            .select_from(MerchantDB)
+            .outerjoin(ScoreEntry, ScoreEntry.id == MerchantDB.latest_score_id)
+            .outerjoin(User, User.id == MerchantDB.user_id)
+            .outerjoin(MerchantProfile, MerchantProfile.merchant_id == MerchantDB.id)
+            .where(MerchantDB.deleted_at.is_(None))
+            .order_by(MerchantDB.created_at.desc(), MerchantDB.id.desc())
+        )
+        if user.role == "admin":
+            stmt = stmt.where(MerchantDB.user_id == user.id)
+        return MerchantService.filter_merchants(stmt, filters)
+
+    @staticmethod
+    def _record(row) -> dict:
+        record = row._asdict()
+        record["risk_tags"] = _as_list(record["risk_tags"])
+        for key in ("join_date", "scored_at"):
+            if isinstance(record[key], datetime):
+                record[key] = record[key].isoformat()
+        return record
+
+    @staticmethod
+    def _rows(stmt, chunk_size: int) -> Iterator[list]:
+        db_session: Session = SessionLocal()
+        try:
+            result = db_session.execute(stmt.execution_options(yield_per=chunk_size))
+            for chunk in result.partitions():
+                yield [ExportService._record(row) for row in chunk]
+        except Exception:
+            logger.exception("merchant export failed mid-stream")
+            raise
+        finally:
+            db_session.close()
+
+    @staticmethod
+    def ndjson(stmt, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+        for records in ExportService._rows(stmt, chunk_size):
+            yield "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+
+    @staticmethod
+    def csv(stmt, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        # the header goes out before the query runs so the client sees the first byte straight away
+        yield buffer.getvalue()
+        for records in ExportService._rows(stmt, chunk_size):
+            buffer.seek(0)
+            buffer.truncate()
+            for r in records:
+                r["risk_tags"] = ";".join(r["risk_tags"])
+                writer.writerow(r)
+            yield buffer.getvalue()
+
+    @staticmethod
+    def export_merchants(user: User, filters: Optional[MerchantListFilters] = None,
+                         fmt: str = "ndjson") -> StreamingResponse:
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        stmt = ExportService.export_query(user, filters or MerchantListFilters())
+        filename = f"merchants-{datetime.utcnow():%Y%m%d%H%M%S}.{'csv' if fmt == 'csv' else 'ndjson'}"
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+        if fmt == "csv":
+            return StreamingResponse(ExportService.csv(stmt), media_type="text/csv", headers=headers)
+        return StreamingResponse(ExportService.ndjson(stmt), media_type="application/x-ndjson", headers=headers)
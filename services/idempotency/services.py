@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from connections.db_connection import SessionLocal
+from models.models import IdempotencyKey
+from utils.authentication import AuthService
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+IDEMPOTENCY_POLL_SECONDS = float(os.getenv("IDEMPOTENCY_POLL_SECONDS", "0.2"))
+IDEMPOTENCY_PURGE_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_SECONDS", "300"))
+
+HEADER = "Idempotency-Key"
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+logger = logging.getLogger(__name__)
+
+_last_purge = 0.0
+
+
+class IdempotencyService:
+    """Replay the stored response of a request whose ``Idempotency-Key`` was already seen.
+
+    The first request with a key claims it by inserting an ``in_progress``
+    row (the primary key makes the claim atomic across Lambda instances),
+    runs, and stores its response. Retries with the same key get that
+    response back without reaching the route; retries that arrive while the
+    first request is still running wait for it. Keys are scoped to the
+    caller and expire after ``IDEMPOTENCY_TTL_SECONDS``.
+    """
+
+    @staticmethod
+    def scope(request: Request) -> str:
+        authorization = request.headers.get("authorization")
+        if authorization:
+            try:
+                return AuthService.verify_token(authorization.split()[-1])
+            except Exception:
+                pass
+        return "anonymous"
+
+    @staticmethod
+    def request_hash(request: Request, body: bytes) -> str:
+        digest = hashlib.sha256(f"{request.method} {request.url.path}?{request.url.query}\n".encode())
+        digest.update(body)
+        return digest.hexdigest()
+
+    @staticmethod
+    def purge_expired(db_session: Session) -> int:
+        deleted = (
+            db_session.query(IdempotencyKey)
+            .filter(IdempotencyKey.expires_at < datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        db_session.commit()
+        return deleted
+
+    @staticmethod
+    def claim(scope: str, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+        """Claim ``key``; returns None when claimed, otherwise the existing live row."""
+        global _last_purge
+        db_session: Session = SessionLocal()
+        try:
+            if time.monotonic() - _last_purge > IDEMPOTENCY_PURGE_SECONDS:
+                _last_purge = time.monotonic()
+                IdempotencyService.purge_expired(db_session)
+            now = datetime.utcnow()
+            db_session.add(IdempotencyKey(scope=scope, key=key, request_hash=request_hash, status="in_progress",
+                                          expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)))
+            try:
+                db_session.commit()
+                return None
+            except IntegrityError:
+                db_session.rollback()
+            existing = db_session.get(IdempotencyKey, (scope, key))
+            if existing is not None and existing.expires_at < now:
+                db_session.delete(existing)
+                db_session.commit()
+                return IdempotencyService.claim(scope, key, request_hash)
+            if existing is not None:
+                db_session.expunge(existing)
+            return existing
+        finally:
+            db_session.close()
+
+    @staticmethod
+    def get(scope: str, key: str) -> Optional[IdempotencyKey]:
+        db_session: Session = SessionLocal()
+        try:
+            row = db_session.get(IdempotencyKey, (scope, key))
+            if row is not None:
+                db_session.expunge(row)
+            return row
+        finally:
+            db_session.close()
+
+    @staticmethod
+    def complete(scope: str, key: str, response_status: int, body: bytes, content_type: Optional[str]) -> None:
+        db_session: Session = SessionLocal()
+        try:
+            row = db_session.get(IdempotencyKey, (scope, key))
+            if row is not None:
+                row.status = "completed"
+                row.response_status = response_status
+                row.response_body = body.decode("utf-8", errors="replace")
+                row.response_content_type = content_type
+                db_session.commit()
+        finally:
+            db_session.close()
+
+    @staticmethod
+    def release(scope: str, key: str) -> None:
+        """Forget a claim whose request failed, so the client can retry it."""
+        db_session: Session = SessionLocal()
+        try:
+            db_session.query(IdempotencyKey).filter(IdempotencyKey.scope == scope,
+                                                    IdempotencyKey.key == key).delete()
+            db_session.commit()
+        finally:
+            db_session.close()
+
+    @staticmethod
+    def replay(row: IdempotencyKey) -> Response:
+        return Response(content=row.response_body or "", status_code=row.response_status,
+                        media_type=row.response_content_type, headers={"Idempotent-Replayed": "true"})
+
+    @staticmethod
+    async def middleware(request: Request, call_next):
+        key = request.headers.get(HEADER)
+        if request.method not in MUTATING_METHODS or not key:
+            return await call_next(request)
+        if len(key) > 255:
+            return JSONResponse({"detail": f"{HEADER} must be at most 255 characters"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
+
+        body = await request.body()
+        scope = IdempotencyService.scope(request)
+        request_hash = IdempotencyService.request_hash(request, body)
+        existing = await run_in_threadpool(IdempotencyService.claim, scope, key, request_hash)
+
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        while existing is not None:
+            if existing.request_hash != request_hash:
+                return JSONResponse({"detail": f"{HEADER} was already used for a different request"},
+                                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            if existing.status == "completed":
+                return IdempotencyService.replay(existing)
+            if time.monotonic() > deadline:
+                return JSONResponse({"detail": "A request with this Idempotency-Key is still in progress"},
+                                    status_code=status.HTTP_409_CONFLICT)
+            await asyncio.sleep(IDEMPOTENCY_POLL_SECONDS)
+            existing = await run_in_threadpool(IdempotencyService.get, scope, key)
+            if existing is None:
+                # the first request failed and released the key; take it over
+                existing = await run_in_threadpool(IdempotencyService.claim, scope, key, request_hash)
+
+        try:
+            response = await call_next(request)
+            content = b"".join([chunk async for chunk in response.body_iterator])
+        except Exception:
+            await run_in_threadpool(IdempotencyService.release, scope, key)
+            raise
+        if response.status_code >= 500:
+            await run_in_threadpool(IdempotencyService.release, scope, key)
+        else:
+            await run_in_threadpool(IdempotencyService.complete, scope, key, response.status_code, content,
+                                    response.headers.get("content-type"))
+        headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+        return Response(content=content, status_code=response.status_code, headers=headers)
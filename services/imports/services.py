@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models.models import MerchantDB, MerchantProfile, ScoreEntry, ScoringInput, User
+from models.schema import MerchantImportResponse, MerchantImportRow, MerchantOnboardRequest
+from services.calculation.batch import BatchCalculation
+from services.calculation.cache import fingerprint
+from services.ruleset.services import RulesetService
+from services.score.services import ScoreService
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+logger = logging.getLogger(__name__)
+
+# CSV headers for nested MerchantOnboardRequest fields are dotted, e.g. "business_profile.business_name"
+_NESTED = ("business_profile", "bank_behaviour")
+
+Parsed = Tuple[int, Optional[MerchantOnboardRequest], List[str]]
+
+
+class ImportService:
+    """Bulk merchant onboarding from a CSV or NDJSON upload.
+
+    The upload is parsed and validated record by record and handled a chunk
+    at a time: every chunk is scored with ``BatchCalculation`` and its
+    merchants, profiles, inputs and scores go in as multi-row INSERTs in one
+    transaction. A bad record only fails its own row; a failed chunk is
+    rolled back and reported without stopping the rest of the file.
+    """
+
+    @staticmethod
+    def _csv_record(raw: Dict[str, str]) -> dict:
+        record: dict = {}
+        for key, value in raw.items():
+            if key is None or value is None or value.strip() == "":
+                continue
+            value = value.strip()
+            head, _, tail = key.strip().partition(".")
+            if head in _NESTED and tail:
+                record.setdefault(head, {})[tail] = value
+            elif head == "keywords":
+                record["keywords"] = [k.strip() for k in value.split(";") if k.strip()]
+            else:
+                record[head] = value
+        record.setdefault("keywords", [])
+        return record
+
+    @staticmethod
+    def _records(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, Optional[dict], List[str]]]:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        if fmt == "csv":
+            for n, raw in enumerate(csv.DictReader(text), start=1):
+                yield n, ImportService._csv_record(raw), []
+            return
+        for n, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield n, None, [f"invalid JSON: {e}"]
+                continue
+            if not isinstance(record, dict):
+                yield n, None, ["expected a JSON object"]
+                continue
+            yield n, record, []
+
+    @staticmethod
+    def parse(stream: BinaryIO, fmt: str) -> Iterator[Parsed]:
+        for n, record, errors in ImportService._records(stream, fmt):
+            if record is None:
+                yield n, None, errors
+                continue
+            try:
+                payload = MerchantOnboardRequest.model_validate(record)
+            except ValidationError as e:
+                yield n, None, [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]
+                continue
+            if payload.business_profile is None:
+                yield n, None, ["business_profile: Field required"]
+                continue
+            yield n, payload, []
+
+    @staticmethod
+    def _existing(db_session: Session, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        if not keys:
+            return {}
+        rows = (
+            db_session.query(MerchantDB.business_name, MerchantDB.industry, MerchantDB.id)
+            .filter(tuple_(MerchantDB.business_name, MerchantDB.industry).in_(keys), MerchantDB.deleted_at.is_(None))
+            .all()
+        )
+        return {(r.business_name, r.industry): r.id for r in rows}
+
+    @staticmethod
+    def import_chunk(chunk: List[Parsed], user: User, db_session: Session, rules,
+                     seen: Dict[Tuple[str, str], str]) -> List[MerchantImportRow]:
+        report: Dict[int, MerchantImportRow] = {}
+        fresh: List[Tuple[int, MerchantOnboardRequest]] = []
+        for n, payload, errors in chunk:
+            if payload is None:
+                report[n] = MerchantImportRow(row=n, status="invalid", errors=errors)
+            else:
+                fresh.append((n, payload))
+
+        # same rule as add_merchant: (business_name, industry) identifies a merchant
+        keys = [(p.business_profile.business_name, p.industry) for _, p in fresh]
+        seen.update(ImportService._existing(db_session, [k for k in set(keys) if k not in seen]))
+        to_create: List[Tuple[int, MerchantOnboardRequest]] = []
+        for (n, payload), key in zip(fresh, keys):
+            if key in seen:
+                report[n] = MerchantImportRow(row=n, status="exists", merchant_id=seen[key])
+            else:
+                seen[key] = str(uuid4())
+                to_create.append((n, payload))
+
+        if to_create:
+            inputs = [ScoreService.inputs_from_request(p) for _, p in to_create]
+            result = BatchCalculation.score_inputs(inputs, rules)
+            now = datetime.utcnow()
+            merchants, profiles, input_rows, scores, pointers = [], [], [], [], []
+            for i, (n, p) in enumerate(to_create):
+                bp = p.business_profile
+                merchant_id = seen[(bp.business_name, p.industry)]
+                input_id, score_id = str(uuid4()), str(uuid4())
+                scored = result.row(i)
+                merchants.append({
+                    "id": merchant_id, "user_id": user.id, "business_name": bp.business_name,
+                    "type_of_merchant": p.type_of_merchant, "owner_name": bp.owner_name,
+                    "legal_entity": p.legal_entity, "industry": p.industry, "mid": p.mid, "bin": p.bin,
+                    "mcc": p.mcc, "ein": p.ein, "website": p.website, "created_at": now, "update_at": now,
+                })
+                profiles.append({
+                    "id": str(uuid4()), "merchant_id": merchant_id, "dba": bp.dba,
+                    "type_of_merchant": p.type_of_merchant, "business_address": bp.business_address,
+                    "city": bp.city, "state": bp.state, "zip_code": bp.zip_code,
+                    "contact_name": bp.contact_name, "contact_title": bp.contact_title,
+                })
+                row = ScoreService.build_inputs_row(merchant_id, inputs[i])
+                input_rows.append({c.key: getattr(row, c.key) for c in ScoringInput.__table__.columns
+                                   if c.key not in ("id", "created_at")} | {"id": input_id, "created_at": now})
+                scores.append({
+                    "id": score_id, "merchant_id": merchant_id, "score": scored["score"],
+                    "tier": scored["tier"], "decision": scored["decision"],
+                    "limit_suggestion": scored["limit_suggestion"],
+                    "risk_tags": json.dumps(scored["risk_tags"]),
+                    "explanation": json.dumps(scored["explanation"]),
+                    "heat_score": scored["heat_score"], "scoring_input_id": input_id,
+                    "ruleset_version": result.ruleset_version, "input_hash": fingerprint(inputs[i]),
+                    "created_at": now,
+                })
+                pointers.append({"id": merchant_id, "latest_score_id": score_id})
+            try:
+                db_session.execute(insert(MerchantDB), merchants)
+                db_session.execute(insert(MerchantProfile), profiles)
+                db_session.execute(insert(ScoringInput), input_rows)
+                db_session.execute(insert(ScoreEntry), scores)
+                db_session.execute(update(MerchantDB), pointers)
+                db_session.commit()
+                for (n, _), s in zip(to_create, scores):
+                    report[n] = MerchantImportRow(row=n, status="created", merchant_id=s["merchant_id"],
+                                                  score=s["score"], tier=s["tier"])
+            except SQLAlchemyError as e:
+                db_session.rollback()
+                logger.exception("merchant import chunk failed")
+                for (n, p), m in zip(to_create, merchants):
+                    seen.pop((m["business_name"], m["industry"]), None)
+                    report[n] = MerchantImportRow(row=n, status="failed", errors=[str(getattr(e, "orig", None) or e)])
+        return [report[n] for n, _, _ in chunk]
+
+    @staticmethod
+    def import_merchants(stream: BinaryIO, fmt: str, user: User, db_session: Session,
+                         chunk_size: int = IMPORT_CHUNK_SIZE) -> MerchantImportResponse:
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        if fmt not in ("csv", "ndjson"):
+            raise HTTPException(status_code=400, detail="Upload a .csv or .ndjson file")
+
+        rules = RulesetService.sync(db_session)
+        seen: Dict[Tuple[str, str], str] = {}
+        rows: List[MerchantImportRow] = []
+        records = ImportService.parse(stream, fmt)
+        try:
+            while chunk := list(islice(records, chunk_size)):
+                rows.extend(ImportService.import_chunk(chunk, user, db_session, rules, seen))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Upload must be UTF-8 encoded")
+        except csv.Error as e:
+            raise HTTPException(status_code=400, detail=f"Malformed CSV: {e}")
+
+        counts = {status: 0 for status in ("created", "exists", "invalid", "failed")}
+        for r in rows:
+            counts[r.status] += 1
+        logger.info("merchant import by %s: %s", user.id, counts)
+        return MerchantImportResponse(total=len(rows), ruleset_version=rules.version, rows=rows, **counts)
@@ -1,29 +1,30 @@
 from models.schema import (
     MerchantProfileDAO,
     MerchantResponse,
-    BankBehavior,
-    ScoreSummary, MerchantResponseDAO, UserResponse, UserMerchantResponse, MerchantOnboardRequest, MerchantListResponse, APIResponse
+    ScoreSummary, MerchantResponseDAO, UserResponse, UserMerchantResponse, MerchantOnboardRequest, MerchantListResponse, APIResponse,
+    MerchantListPage, MerchantListFilters, MerchantBulkDeleteRequest
 )
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, time, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models.models import MerchantDB, MerchantProfile, ScoreEntry, User
-from sqlalchemy.orm import joinedload, selectinload
+from models.models import MerchantDB, MerchantProfile, ScoreEntry
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 from fastapi import HTTPException, status
-from utils.merchant.common import _as_list, _to_score_summary_list
-from sqlalchemy import inspect
-from services.calculation.services import Calculation
-import json
+from utils.merchant.common import _as_list, _to_score_summary_list, _encode_cursor, _decode_cursor, _like_pattern
+from sqlalchemy import inspect, or_, select, tuple_, update
+from services.score.services import ScoreService
+from utils.authentication import Principal
 
 class MerchantService:
 
     @staticmethod
-    def get_merchant_by_id(merchant_id: str, user: User, db_session: Session):
-        merchant: MerchantDB | None = (
-            db_session.query(MerchantDB)
-            .options(joinedload(MerchantDB.profile), selectinload(MerchantDB.scores))
-            .filter(MerchantDB.id == merchant_id, MerchantDB.user_id == user.id)
-            .one_or_none()
+    async def get_merchant_by_id(merchant_id: str, user: Principal, db_session: AsyncSession):
+        merchant: MerchantDB | None = await db_session.scalar(
+            select(MerchantDB)
+            .options(joinedload(MerchantDB.profile), joinedload(MerchantDB.latest_score),
+                     joinedload(MerchantDB.user))
+            .where(MerchantDB.id == merchant_id, MerchantDB.user_id == user.id, MerchantDB.deleted_at.is_(None))
         )
 
         if merchant is None:
@@ -31,12 +32,10 @@ class MerchantService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Merchant not found"
             )
 
-        # find latest score by created_at
+        owner = merchant.user
         latest = None
-        if merchant.scores:
-            latest_row = max(
-                merchant.scores, key=lambda s: s.created_at or datetime.min
-            )
+        if merchant.latest_score:
+            latest_row = merchant.latest_score
             latest = ScoreSummary(
                 score=latest_row.score,
                 tier=latest_row.tier,
@@ -60,7 +59,10 @@ class MerchantService:
             mcc=merchant.mcc,
             ein=merchant.ein,
             website=merchant.website,
-            user_details=UserResponse.from_orm(user),
+            # profile_image is a deferred base64 blob; leave it out rather than load it for every merchant read
+            user_details=UserResponse(id=owner.id, email=owner.email, role=owner.role, phone=owner.phone,
+                                      location=owner.location, first_name=owner.first_name,
+                                      last_name=owner.last_name),
             profile=(
                 MerchantProfileDAO.model_validate(merchant.profile)
                 if merchant.profile
@@ -72,28 +74,79 @@ class MerchantService:
 
 
     @staticmethod
-    def list_merchants_response(db_session, user: User, limit: int = 100, offset: int = 0) -> List[MerchantListResponse]:
+    def filter_merchants(query, filters: MerchantListFilters):
+        """Apply portfolio filters to a MerchantDB query or select already joined to its latest ScoreEntry."""
+        if filters.tier:
+            query = query.filter(ScoreEntry.tier.in_(filters.tier))
+        if filters.min_score is not None:
+            query = query.filter(ScoreEntry.score >= filters.min_score)
+        if filters.max_score is not None:
+            query = query.filter(ScoreEntry.score <= filters.max_score)
+        if filters.industry:
+            query = query.filter(MerchantDB.industry.in_(filters.industry))
+        if filters.type_of_merchant:
+            query = query.filter(MerchantDB.type_of_merchant.in_(filters.type_of_merchant))
+        if filters.joined_from:
+            query = query.filter(MerchantDB.created_at >= datetime.combine(filters.joined_from, time.min))
+        if filters.joined_to:
+            query = query.filter(MerchantDB.created_at < datetime.combine(filters.joined_to + timedelta(days=1), time.min))
+        if filters.q:
+            pattern = _like_pattern(filters.q.strip())
+            query = query.filter(or_(MerchantDB.business_name.ilike(pattern, escape="\\"),
+                                     MerchantDB.legal_entity.ilike(pattern, escape="\\")))
+        return query
+
+    @staticmethod
+    async def list_merchants_response(db_session: AsyncSession, user: Principal, limit: int = 100, cursor: Optional[str] = None,
+                                filters: Optional[MerchantListFilters] = None) -> MerchantListPage:
+        """Filtered merchants, keyset-paginated on (sort key, id).
+
+        Sorting by risk score only returns merchants that have been scored.
+        """
         if user.role not in ["admin", "super_admin"]:
             raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        filters = filters or MerchantListFilters()
+        descending = filters.sort.startswith("-")
+        by_score = filters.sort.lstrip("-") == "risk_score"
+        sort_column = ScoreEntry.score if by_score else MerchantDB.created_at
+
         query = (
-            db_session.query(MerchantDB)
+            select(MerchantDB)
+            .outerjoin(MerchantDB.latest_score)
             .options(
                 joinedload(MerchantDB.profile),
-                selectinload(MerchantDB.scores),
+                contains_eager(MerchantDB.latest_score),
                 joinedload(MerchantDB.user),
             )
-            .order_by(MerchantDB.created_at.desc())
         )
+        if descending:
+            query = query.order_by(sort_column.desc(), MerchantDB.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), MerchantDB.id.asc())
 
+        query = query.filter(MerchantDB.deleted_at.is_(None))
         if user.role == "admin":
             query = query.filter(MerchantDB.user_id == user.id)
-        merchants: List[MerchantDB] = query.offset(offset).limit(limit).all()
+        if by_score:
+            query = query.filter(ScoreEntry.score.isnot(None))
+        query = MerchantService.filter_merchants(query, filters)
+        if cursor:
+            key = tuple_(sort_column, MerchantDB.id)
+            after = tuple_(*_decode_cursor(cursor, filters.sort))
+            query = query.filter(key < after if descending else key > after)
+        # one extra row tells us whether there is a next page
+        merchants: List[MerchantDB] = list((await db_session.scalars(query.limit(limit + 1))).all())
+        next_cursor = None
+        if len(merchants) > limit:
+            merchants = merchants[:limit]
+            last = merchants[-1]
+            next_cursor = _encode_cursor(filters.sort, last.latest_score.score if by_score else last.created_at,
+                                         last.id)
         resp: List[MerchantListResponse] = [] 
         for m in merchants:
             risk_score = 0.0
-            if m.scores:
-                latest_row = max(m.scores, key=lambda s: s.created_at or datetime.min)
-                risk_score = latest_row.score or 0.0
+            if m.latest_score:
+                risk_score = m.latest_score.score or 0.0
 
             resp.append(
                 MerchantListResponse(
@@ -110,15 +163,17 @@ class MerchantService:
                     country=m.profile.state if m.profile else None
                 )
             )
-        return resp
+        return MerchantListPage(items=resp, next_cursor=next_cursor)
 
 
     @staticmethod
-    def update_merchant(merchant_id: int, payload: MerchantOnboardRequest, user: User, db_session: Session):
-        merchant = db_session.query(MerchantDB).filter(
+    async def update_merchant(merchant_id: int, payload: MerchantOnboardRequest, user: Principal,
+                              db_session: AsyncSession):
+        merchant = await db_session.scalar(select(MerchantDB).where(
             MerchantDB.id == merchant_id,
-            MerchantDB.user_id == user.id 
-        ).first()
+            MerchantDB.user_id == user.id,
+            MerchantDB.deleted_at.is_(None),
+        ))
         
         if not merchant:
             raise HTTPException(status_code=404, detail="Merchant not found")
@@ -130,11 +185,10 @@ class MerchantService:
         merchant.mcc = payload.mcc or merchant.mcc
         merchant.ein = payload.ein or merchant.ein
         merchant.website = payload.website or merchant.website
-        merchant.keywords = payload.keywords or merchant.keywords
 
-        profile = db_session.query(MerchantProfile).filter(
+        profile = (await db_session.scalars(select(MerchantProfile).where(
             MerchantProfile.merchant_id == merchant_id
-        ).first()
+        ))).first()
         
         if profile and payload.business_profile:
             bp = payload.business_profile
@@ -148,67 +202,74 @@ class MerchantService:
             profile.contact_name = bp.contact_name or profile.contact_name
             profile.contact_title = bp.contact_title or profile.contact_title
 
-        any_field_changed = False
-        
-        if any_field_changed:  # Implement your logic here
-            g1 = Calculation.gate_age_income(bool(payload.self_employed), float(payload.annual_income or 0),
-                                            payload.verified_income)
-            g2 = Calculation.gate_identity_fraud(float(payload.device_risk_score or 0), float(payload.fraud_score or 0))
-            g3 = Calculation.gate_creditworthiness(payload.fico_score)
-            bb = BankBehavior(**(payload.bank_behaviour.dict() if payload.bank_behaviour else {}))
-            g4 = Calculation.gate_bank_behaviour(bb)
-            ind_pts, ind_tags, heat = Calculation.industry_rules(payload.industry, payload.keywords)
-
-            result = Calculation.combine_gates(g1, g2, g3, g4, ind_pts, ind_tags)
-            result["limit_suggestion"] = "$3,000" if result["tier"] == "Warm" else "$5,000" if result["tier"] == "Hot" else "$0"
-
-            # Create new score entry
-            score_entry = ScoreEntry(
-                merchant_id=merchant.id,
-                score=result["score"],
-                tier=result["tier"],
-                decision=result["decision"],
-                limit_suggestion=result["limit_suggestion"],
-                risk_tags=json.dumps(result["risk_tags"]),
-                explanation=json.dumps(result["explanation"]),
-                heat_score=heat,
-            )
-            db_session.add(score_entry)
+        # rescore only if a scoring input moved, re-running just the gates it feeds.
+        # ScoreService is shared with the synchronous jobs, so it runs on this session's sync facade.
+        def rescore(session: Session):
+            ScoreService.lock_merchant(merchant.id, session)
+            row = ScoreService.latest_inputs(merchant.id, session)
+            current = ScoreService.inputs_from_row(row) if row else None
+            inputs = ScoreService.merge_inputs(current, payload)
+            return ScoreService.rescore_changed(merchant, inputs, session, row=row)
 
-        db_session.commit()
-        db_session.refresh(merchant)
+        rescored = await db_session.run_sync(rescore)
+        await db_session.commit()
 
         return APIResponse(
             message="Merchant updated successfully",
             status="success",
-            data={"merchant_id": merchant_id}
+            data={"merchant_id": merchant_id, "rescored": rescored}
         )
 
     @staticmethod
-    def delete_merchant(merchant_id: str, user: User, db_session: Session):
+    async def delete_merchant(merchant_id: str, user: Principal, db_session: AsyncSession):
         if user.role not in ["admin", "super_admin"]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You are not authorised to perform this action"
             )
 
-        merchant: MerchantDB | None = (
-            db_session.query(MerchantDB)
-            .filter(MerchantDB.id == merchant_id)
-            .one_or_none()
-        )
-
-        if merchant is None:
+        # soft delete only; the rows and their history are removed by PurgeService
+        deleted = await MerchantService.soft_delete([merchant_id], user, db_session)
+        if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Merchant not found"
             )
 
-        db_session.delete(merchant)
-        db_session.commit()
-
         return APIResponse(
             message="Merchant deleted successfully",
             status="success",
             data={"merchant_id": merchant_id}
         )
+
+    @staticmethod
+    async def soft_delete(merchant_ids: List[str], user: Principal, db_session: AsyncSession) -> List[str]:
+        """Hide live merchants among ``merchant_ids`` in one UPDATE; returns the ids that were deleted.
+
+        An admin can only delete their own merchants, as in ``list_merchants_response``.
+        """
+        stmt = update(MerchantDB).where(MerchantDB.id.in_(merchant_ids), MerchantDB.deleted_at.is_(None))
+        if user.role == "admin":
+            stmt = stmt.where(MerchantDB.user_id == user.id)
+        deleted = (await db_session.execute(
+            stmt.values(deleted_at=datetime.utcnow()).returning(MerchantDB.id)
+        )).scalars().all()
+        await db_session.commit()
+        return list(deleted)
+
+    @staticmethod
+    async def bulk_delete_merchants(payload: MerchantBulkDeleteRequest, user: Principal, db_session: AsyncSession):
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You are not authorised to perform this action"
+            )
+
+        requested = list(dict.fromkeys(payload.merchant_ids))
+        deleted = await MerchantService.soft_delete(requested, user, db_session)
+        deleted_set = set(deleted)
+        return APIResponse(
+            message=f"Deleted {len(deleted)} merchants",
+            status="success",
+            data={"deleted": deleted, "not_found": [m for m in requested if m not in deleted_set]}
+        )
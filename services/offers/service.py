@@ -1,6 +1,7 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from models.models import User
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.authentication import Principal
 from models.models import Offer
 from models.schema import OfferRequestDAO, OfferRequestModelDAO
 import random
@@ -28,7 +29,7 @@ class OfferService:
         return coupon_id
 
     @staticmethod
-    async def build_and_create(offer: OfferRequestDAO, user: User, db_session: Session):
+    async def build_and_create(offer: OfferRequestDAO, user: Principal, db_session: AsyncSession):
         if user.role != "super_admin":
             raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
 
@@ -45,13 +46,13 @@ class OfferService:
         raise HTTPException(status_code=201, detail="Successfully added new offer.")
 
     @staticmethod
-    async def create(offer: OfferRequestModelDAO, db_session: Session):
+    async def create(offer: OfferRequestModelDAO, db_session: AsyncSession):
         offers = Offer(**offer.model_dump())
         db_session.add(offers)
-        db_session.commit()
+        await db_session.commit()
         return offers
 
     @staticmethod
-    async def get(db_session: Session):
-        all_offers = db_session.query(Offer).all()
+    async def get(db_session: AsyncSession):
+        all_offers = (await db_session.scalars(select(Offer))).all()
         return all_offers
@@ -1,20 +1,21 @@
 from alembic.util import status
 from fastapi import HTTPException, status
-from sqlalchemy import insert
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from models.models import User, Plan, plan_products, Product
+from models.models import Plan, plan_products, Product
+from utils.authentication import Principal
 from models.schema import PlanRequestDAO
 
 
 class PlanService:
 
     @staticmethod
-    async def get(db_session: Session):
+    async def get(db_session: AsyncSession):
 
         products = [
             {"product_name": product.name, "price": {"price_m": product.price_m, "price_y": product.price_y}} for
-            product in db_session.query(Product).all()]
+            product in (await db_session.scalars(select(Product))).all()]
         plans = [{
             "id": plan.id,
             "name": plan.name,
@@ -25,16 +26,16 @@ class PlanService:
             "created_at": plan.created_at,
             "update_at": plan.update_at,
             "products": products
-        } for plan in db_session.query(Plan).all()]
+        } for plan in (await db_session.scalars(select(Plan))).all()]
 
         return plans
 
     @staticmethod
-    async def create(product: PlanRequestDAO, db_session: Session):
+    async def create(product: PlanRequestDAO, db_session: AsyncSession):
         product_data = product.dict()
         products = Plan(**product_data)
         db_session.add(products)
-        db_session.commit()
+        await db_session.commit()
         return products
 
     @staticmethod
@@ -42,7 +43,7 @@ class PlanService:
         return PlanRequestDAO(**payload.dict())
 
     @staticmethod
-    async def build_and_create(payload: PlanRequestDAO, user: User, db_session: Session):
+    async def build_and_create(payload: PlanRequestDAO, user: Principal, db_session: AsyncSession):
         if user.role != "super_admin":
             raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
 
@@ -60,5 +61,5 @@ class PlanService:
                             detail=f"Error while creating Plan with name: {payload.name}.")
 
     @staticmethod
-    async def is_exist(name: str, db_session: Session):
-        return db_session.query(Plan).filter(Plan.name == name).first()
+    async def is_exist(name: str, db_session: AsyncSession):
+        return (await db_session.scalars(select(Plan).where(Plan.name == name))).first()
@@ -1,18 +1,20 @@
 from alembic.util import status
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from models.models import User, Product
+from models.models import Product
+from utils.authentication import Principal
 from models.schema import ProductRequestDAO, ProductResponseDAO
 
 
 class ProductService:
 
     @staticmethod
-    async def create(product: ProductRequestDAO, db_session: Session):
+    async def create(product: ProductRequestDAO, db_session: AsyncSession):
         products = Product(**product.dict())
         db_session.add(products)
-        db_session.commit()
+        await db_session.commit()
         return products
 
     @staticmethod
@@ -20,7 +22,7 @@ class ProductService:
         return ProductRequestDAO(**payload.dict())
 
     @staticmethod
-    async def build_and_create(payload: ProductRequestDAO, user: User, db_session: Session):
+    async def build_and_create(payload: ProductRequestDAO, user: Principal, db_session: AsyncSession):
         if user.role != "super_admin":
             raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
 
@@ -34,23 +36,23 @@ class ProductService:
         return ProductResponseDAO.from_orm(product)
 
     @staticmethod
-    async def is_exist(name: str, db_session: Session):
-        return db_session.query(Product).filter(Product.name == name).first()
+    async def is_exist(name: str, db_session: AsyncSession):
+        return (await db_session.scalars(select(Product).where(Product.name == name))).first()
 
     @staticmethod
-    async def get(db_session: Session):
-        return db_session.query(Product).all()
+    async def get(db_session: AsyncSession):
+        return (await db_session.scalars(select(Product))).all()
 
     @staticmethod
-    async def get_by_id(product_id: str, db_session: Session):
-        products = db_session.query(Product).filter(Product.id == product_id).one_or_none()
+    async def get_by_id(product_id: str, db_session: AsyncSession):
+        products = await db_session.scalar(select(Product).where(Product.id == product_id))
         if not products:
             return {}
         return products
 
     @staticmethod
-    async def delete_by_id(product_id: str, db_session: Session):
-        product = db_session.query(Product).filter(Product.id == product_id).first()
-        db_session.delete(product)
-        db_session.commit()
+    async def delete_by_id(product_id: str, db_session: AsyncSession):
+        product = (await db_session.scalars(select(Product).where(Product.id == product_id))).first()
+        await db_session.delete(product)
+        await db_session.commit()
         raise HTTPException(status_code=200, detail=f"Successfully deleted the prodict: {product.name}")
@@ -1,15 +1,33 @@
 import base64
-from sqlalchemy.orm import Session
-from models.models import User
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, undefer
+from models.models import MerchantDB, User
 from models.schema import UserResponse, ProfessionalDetailsResponse
 from fastapi import UploadFile
+from utils.authentication import principal_cache
 
 
 class ProfileService:
 
+    @staticmethod
+    async def get_user(user_id: str, db: AsyncSession) -> User:
+        """The user with everything ``me`` reads loaded up front, so it needs no further I/O."""
+        user = await db.scalar(
+            select(User)
+            .options(selectinload(User.merchant.and_(MerchantDB.deleted_at.is_(None))),
+                     undefer(User.profile_image))
+            .where(User.id == user_id)
+        )
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+
     @staticmethod
     def me(user: User):
-        merchant = user.merchant[0] if user.merchant else None
+        # update_profile's user loads the relationship lazily, deleted merchants included
+        merchant = next((m for m in user.merchant if m.deleted_at is None), None)
         professional_details = None
         if merchant:
             professional_details = ProfessionalDetailsResponse(
@@ -64,6 +82,7 @@ class ProfileService:
 
         db.add(user)
         db.commit()
+        principal_cache.invalidate(user.email)
         db.refresh(user)
 
         return ProfileService.me(user)
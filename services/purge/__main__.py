@@ -0,0 +1,22 @@
+"""Hard-delete every soft-deleted merchant and its history.
+
+    python -m services.purge [--batch-size 5000]
+"""
+import argparse
+import logging
+
+from services.purge.services import PURGE_BATCH_SIZE, PurgeService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    purged = PurgeService.purge(batch_size=args.batch_size)
+    logging.info("purged %s merchants", purged)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import logging
+import os
+import time
+from typing import List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from connections.db_connection import SessionLocal
+from models.models import Chargeback, MerchantDB, ScoreEntry, ScoringInput, WebhookLog
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "5000"))
+
+logger = logging.getLogger(__name__)
+
+# high-volume children, deleted in bounded batches; scores first since they reference scoring_inputs
+_BATCHED = (ScoreEntry, ScoringInput, WebhookLog, Chargeback)
+
+
+class PurgeService:
+    """Hard-delete soft-deleted merchants and everything that belongs to them.
+
+    The big child tables are emptied ``PURGE_BATCH_SIZE`` rows per statement
+    and commit, so no single transaction holds locks on years of history;
+    the merchant row goes last and ``ON DELETE CASCADE`` takes the
+    one-to-one onboarding sections with it.
+    """
+
+    @staticmethod
+    def purge_merchant(merchant_id: str, db_session: Session, batch_size: int = PURGE_BATCH_SIZE) -> int:
+        db_session.execute(update(MerchantDB).where(MerchantDB.id == merchant_id).values(latest_score_id=None))
+        db_session.commit()
+        removed = 0
+        for model in _BATCHED:
+            while True:
+                batch = select(model.id).where(model.merchant_id == merchant_id).limit(batch_size)
+                deleted = db_session.execute(delete(model).where(model.id.in_(batch.scalar_subquery()))).rowcount
+                db_session.commit()
+                removed += deleted
+                if deleted < batch_size:
+                    break
+        db_session.execute(delete(MerchantDB).where(MerchantDB.id == merchant_id,
+                                                    MerchantDB.deleted_at.is_not(None)))
+        db_session.commit()
+        return removed
+
+    @staticmethod
+    def purge(merchant_ids: Optional[List[str]] = None, batch_size: int = PURGE_BATCH_SIZE,
+              deadline: Optional[float] = None) -> int:
+        """Purge ``merchant_ids`` (or every soft-deleted merchant), stopping between merchants once
+        ``time.monotonic()`` passes ``deadline``; returns how many merchants were purged."""
+        db_session: Session = SessionLocal()
+        try:
+            query = select(MerchantDB.id).where(MerchantDB.deleted_at.is_not(None))
+            if merchant_ids is not None:
+                query = query.where(MerchantDB.id.in_(merchant_ids))
+            pending = db_session.execute(query).scalars().all()
+            purged = 0
+            for merchant_id in pending:
+                if deadline is not None and time.monotonic() >= deadline:
+                    logger.info("purge out of time, %s merchants left for the next run", len(pending) - purged)
+                    break
+                purged += 1
+                try:
+                    removed = PurgeService.purge_merchant(merchant_id, db_session, batch_size)
+                    logger.info("purged merchant %s (%s child rows)", merchant_id, removed)
+                except Exception:
+                    db_session.rollback()
+                    logger.exception("purging merchant %s failed; it stays soft-deleted", merchant_id)
+            return purged
+        finally:
+            db_session.close()
@@ -0,0 +1,42 @@
+"""Rescore the whole portfolio from stored inputs.
+
+    python -m services.rescoring [--chunk-size 5000] [--resume <job_id>]
+    python -m services.rescoring --queued
+"""
+import argparse
+import logging
+
+from connections.db_connection import SessionLocal
+from services.rescoring.services import DEFAULT_CHUNK_SIZE, RescoringJobBusy, RescoringService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--resume", metavar="JOB_ID", help="continue a failed or interrupted job")
+    parser.add_argument("--queued", action="store_true", help="run the jobs queued through the API and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.queued:
+        logging.info("ran %s queued rescoring jobs", RescoringService.run_pending())
+        return
+
+    job_id = args.resume
+    if job_id is None:
+        db_session = SessionLocal()
+        try:
+            job_id = RescoringService.start(db_session, chunk_size=args.chunk_size).id
+        finally:
+            db_session.close()
+        logging.info("started rescoring job %s", job_id)
+
+    try:
+        job = RescoringService.run(job_id)
+    except RescoringJobBusy as e:
+        parser.exit(1, f"{e}\n")
+    logging.info("rescoring job %s %s: %s/%s merchants", job.id, job.status, job.processed, job.total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from connections.db_connection import SessionLocal
+from models.models import MerchantDB, RescoringJob, ScoreEntry, ScoringInput
+from services.calculation.batch import BatchCalculation
+from services.calculation.cache import fingerprint
+from services.calculation.ruleset import Ruleset
+from services.ruleset.services import RulesetService
+from services.score.services import ScoreService
+from utils.authentication import Principal
+
+DEFAULT_CHUNK_SIZE = int(os.getenv("RESCORING_CHUNK_SIZE", "5000"))
+# a running job whose heartbeat is older than this is presumed dead and may be claimed by another run
+RESCORING_LEASE_SECONDS = float(os.getenv("RESCORING_LEASE_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+_INPUT_COLUMNS = (
+    ScoringInput.id,
+    ScoringInput.merchant_id,
+    ScoringInput.self_employed,
+    ScoringInput.annual_income,
+    ScoringInput.verified_income,
+    ScoringInput.fico_score,
+    ScoringInput.overdrafts_6mo,
+    ScoringInput.avg_balance,
+    ScoringInput.nsf_fees,
+    ScoringInput.device_risk_score,
+    ScoringInput.fraud_score,
+    ScoringInput.industry,
+    ScoringInput.keywords,
+    ScoringInput.business_name,
+    ScoringInput.dba,
+    ScoringInput.website,
+)
+
+
+class RescoringJobBusy(RuntimeError):
+    """Another run holds the job's lease."""
+
+
+class RescoringService:
+    """Recompute scores for every merchant from their latest stored inputs.
+
+    Inputs are read through a server-side cursor (``yield_per``) on one
+    session and scored a chunk at a time with ``BatchCalculation``; new
+    ScoreEntry rows, the merchants' latest-score pointers and the job
+    checkpoint are written on a second session, one commit per chunk, so an
+    interrupted run resumes after the last committed merchant. Every chunk of
+    a job is scored with the ruleset that was active when the job started.
+
+    A run first claims the job's lease with a single conditional UPDATE and
+    renews its heartbeat with every checkpoint; a checkpoint that finds the
+    lease taken over rolls its chunk back, so two runs never both write a
+    chunk's ScoreEntry rows.
+
+    The API only queues jobs (status ``pending``); they are run by
+    ``run_pending`` from a scheduled invocation or ``python -m
+    services.rescoring``. A run given a ``deadline`` stops after the chunk that
+    crosses it and puts the job back in the queue for the next invocation.
+    """
+
+    @staticmethod
+    def latest_inputs_query(after_merchant_id: Optional[str] = None):
+        latest = select(ScoringInput.merchant_id, func.max(ScoringInput.version).label("version"))
+        if after_merchant_id:
+            latest = latest.where(ScoringInput.merchant_id > after_merchant_id)
+        latest = latest.group_by(ScoringInput.merchant_id).subquery()
+        return (
+            select(*_INPUT_COLUMNS)
+            .join(latest, and_(ScoringInput.merchant_id == latest.c.merchant_id,
+                               ScoringInput.version == latest.c.version))
+            .join(MerchantDB, and_(MerchantDB.id == ScoringInput.merchant_id, MerchantDB.deleted_at.is_(None)))
+            .order_by(ScoringInput.merchant_id)
+        )
+
+    @staticmethod
+    def score_rows(rows: List[Row], created_at: datetime, rules: Ruleset) -> List[dict]:
+        inputs = [ScoreService.inputs_from_row(r) for r in rows]
+        result = BatchCalculation.score_inputs(inputs, rules)
+        entries = []
+        for i, r in enumerate(rows):
+            scored = result.row(i)
+            entries.append({
+                "id": str(uuid4()),
+                "merchant_id": r.merchant_id,
+                "score": scored["score"],
+                "tier": scored["tier"],
+                "decision": scored["decision"],
+                "limit_suggestion": scored["limit_suggestion"],
+                "risk_tags": json.dumps(scored["risk_tags"]),
+                "explanation": json.dumps(scored["explanation"]),
+                "heat_score": scored["heat_score"],
+                "scoring_input_id": r.id,
+                "ruleset_version": result.ruleset_version,
+                "input_hash": fingerprint(inputs[i]),
+                "created_at": created_at,
+            })
+        return entries
+
+    @staticmethod
+    def start(db_session: Session, chunk_size: int = DEFAULT_CHUNK_SIZE,
+              started_by: Optional[str] = None) -> RescoringJob:
+        rules = RulesetService.sync(db_session, force=True)
+        total = (
+            db_session.query(func.count(func.distinct(ScoringInput.merchant_id)))
+            .join(MerchantDB, MerchantDB.id == ScoringInput.merchant_id)
+            .filter(MerchantDB.deleted_at.is_(None))
+            .scalar()
+        ) or 0
+        job = RescoringJob(chunk_size=chunk_size, total=total, processed=0, status="pending",
+                           ruleset_version=rules.version, started_by=started_by)
+        db_session.add(job)
+        db_session.commit()
+        return job
+
+    @staticmethod
+    def lease_expired_before() -> datetime:
+        return datetime.utcnow() - timedelta(seconds=RESCORING_LEASE_SECONDS)
+
+    @staticmethod
+    def unclaimed():
+        """Jobs no live run is working on: not completed, and not running on a fresh heartbeat."""
+        return and_(RescoringJob.status != "completed",
+                    or_(RescoringJob.status != "running", RescoringJob.heartbeat_at.is_(None),
+                        RescoringJob.heartbeat_at < RescoringService.lease_expired_before()))
+
+    @staticmethod
+    def claim(job_id: str, db_session: Session) -> Optional[str]:
+        """Take the job's lease unless a live run holds it; returns the lease id, or None."""
+        lease_id = str(uuid4())
+        claimed = db_session.execute(
+            update(RescoringJob)
+            .where(RescoringJob.id == job_id, RescoringService.unclaimed())
+            .values(status="running", error=None, lease_id=lease_id, heartbeat_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db_session.commit()
+        return lease_id if claimed else None
+
+    @staticmethod
+    def checkpoint(job_id: str, lease_id: str, db_session: Session, values: dict) -> None:
+        """Update the job and renew its heartbeat, provided ``lease_id`` still holds it."""
+        held = db_session.execute(
+            update(RescoringJob)
+            .where(RescoringJob.id == job_id, RescoringJob.lease_id == lease_id)
+            .values(heartbeat_at=datetime.utcnow(), **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not held:
+            raise RescoringJobBusy(f"Rescoring job {job_id} was taken over by another run")
+
+    @staticmethod
+    def run(job_id: str, deadline: Optional[float] = None) -> RescoringJob:
+        """Run (or resume) ``job_id`` to completion, or until ``time.monotonic()`` passes ``deadline``.
+
+        Raises RescoringJobBusy if another run holds the job.
+        """
+        write_session: Session = SessionLocal()
+        read_session: Session = SessionLocal()
+        lease_id = None
+        try:
+            if write_session.get(RescoringJob, job_id) is None:
+                raise ValueError(f"Rescoring job {job_id} not found")
+            lease_id = RescoringService.claim(job_id, write_session)
+            if lease_id is None:
+                raise RescoringJobBusy(f"Rescoring job {job_id} is already running")
+            job = write_session.get(RescoringJob, job_id, populate_existing=True)
+            # a resumed job keeps scoring with the ruleset it started with
+            rules = RulesetService.load(job.ruleset_version, write_session)
+
+            stmt = RescoringService.latest_inputs_query(job.last_merchant_id)
+            stream = read_session.execute(stmt.execution_options(yield_per=job.chunk_size))
+            processed = job.processed
+            for chunk in stream.partitions():
+                entries = RescoringService.score_rows(chunk, datetime.utcnow(), rules)
+                write_session.execute(insert(ScoreEntry), entries)
+                write_session.execute(update(MerchantDB), [{"id": e["merchant_id"], "latest_score_id": e["id"]}
+                                                           for e in entries])
+                processed += len(chunk)
+                RescoringService.checkpoint(job_id, lease_id, write_session,
+                                            {"processed": processed, "last_merchant_id": chunk[-1].merchant_id})
+                write_session.commit()
+                logger.info("rescoring job %s: %s/%s merchants", job_id, processed, job.total)
+                if deadline is not None and time.monotonic() >= deadline:
+                    RescoringService.checkpoint(job_id, lease_id, write_session, {"status": "pending", "lease_id": None})
+                    write_session.commit()
+                    logger.info("rescoring job %s: out of time, queued to continue", job_id)
+                    return write_session.get(RescoringJob, job_id, populate_existing=True)
+
+            RescoringService.checkpoint(job_id, lease_id, write_session,
+                                        {"status": "completed", "lease_id": None, "finished_at": datetime.utcnow()})
+            write_session.commit()
+            return write_session.get(RescoringJob, job_id, populate_existing=True)
+        except RescoringJobBusy:
+            write_session.rollback()
+            raise
+        except Exception as e:
+            write_session.rollback()
+            if lease_id is not None:
+                try:
+                    RescoringService.checkpoint(job_id, lease_id, write_session,
+                                                {"status": "failed", "error": str(e), "lease_id": None})
+                    write_session.commit()
+                except RescoringJobBusy:
+                    write_session.rollback()
+            logger.exception("rescoring job %s failed; resume it to continue from the last checkpoint", job_id)
+            raise
+        finally:
+            read_session.close()
+            write_session.close()
+
+    @staticmethod
+    def run_pending(deadline: Optional[float] = None) -> int:
+        """Run queued and abandoned jobs, oldest first, until none are left or ``deadline``; returns how many ran."""
+        ran = 0
+        while deadline is None or time.monotonic() < deadline:
+            db_session: Session = SessionLocal()
+            try:
+                job_id = db_session.execute(
+                    select(RescoringJob.id)
+                    .where(RescoringService.unclaimed(), RescoringJob.status != "failed")
+                    .order_by(RescoringJob.started_at)
+                    .limit(1)
+                ).scalar()
+            finally:
+                db_session.close()
+            if job_id is None:
+                break
+            try:
+                job = RescoringService.run(job_id, deadline)
+            except RescoringJobBusy:
+                continue
+            except Exception:
+                # run() has marked it failed (and logged why); it waits for an explicit resume
+                continue
+            ran += 1
+            if job.status != "completed":
+                break
+        return ran
+
+    @staticmethod
+    def get(job_id: str, user: Principal, db_session: Session) -> RescoringJob:
+        if user.role != "super_admin":
+            raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
+        job = db_session.get(RescoringJob, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Rescoring job not found")
+        return job
+
+    @staticmethod
+    def start_or_resume(user: Principal, db_session: Session, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        resume_job_id: Optional[str] = None) -> RescoringJob:
+        if user.role != "super_admin":
+            raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
+        if resume_job_id:
+            job = RescoringService.get(resume_job_id, user, db_session)
+            if job.status == "completed":
+                raise HTTPException(status_code=409, detail="Rescoring job already completed")
+            # queue it again; clearing the lease fences off a stalled run that might still wake up
+            queued = db_session.execute(
+                update(RescoringJob)
+                .where(RescoringJob.id == job.id, RescoringService.unclaimed())
+                .values(status="pending", error=None, lease_id=None)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db_session.commit()
+            if not queued:
+                raise HTTPException(status_code=409, detail="Rescoring job is already running")
+            db_session.refresh(job)
+            return job
+        return RescoringService.start(db_session, chunk_size=chunk_size, started_by=user.id)
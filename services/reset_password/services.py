@@ -1,27 +1,28 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.models import User
 from models.schema import ResetPasswordRequest, ResetPasswordResponse
 from fastapi import HTTPException
-from passlib.hash import bcrypt
 from datetime import datetime
+from utils.passwords import password_hasher
 
 
 class ResetPasswordService:
     @staticmethod
-    def reset_password(payload: ResetPasswordRequest, db_session: Session):
+    async def reset_password(payload: ResetPasswordRequest, db_session: AsyncSession):
         try:
-            user = db_session.query(User).filter(User.reset_token == payload.reset_token).first()
+            user = (await db_session.scalars(select(User).where(User.reset_token == payload.reset_token))).first()
             if not user:
                 raise HTTPException(status_code=404, detail="Invalid reset token")
 
             if not user.reset_token_expiry or user.reset_token_expiry < datetime.utcnow():
                 raise HTTPException(status_code=400, detail="Reset token expired")
-            user.password = bcrypt.hash(payload.new_password)
+            user.password = await password_hasher.hash(payload.new_password)
 
             user.reset_token = None
             user.reset_token_expiry = None
 
-            db_session.commit()
+            await db_session.commit()
             return ResetPasswordResponse(message="Password has been reset successfully")
         except Exception as e:
             raise HTTPException(status_code=400, detail="Something went wrong.")
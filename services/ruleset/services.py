@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from models.models import ScoringRuleset
+from services.calculation.ruleset import Ruleset, get_bundled_ruleset, get_ruleset, swap_ruleset
+from utils.authentication import Principal
+
+RULESET_REFRESH_SECONDS = float(os.getenv("SCORING_RULESET_REFRESH_SECONDS", "60"))
+
+logger = logging.getLogger(__name__)
+
+_last_sync = 0.0
+
+
+class RulesetNotFound(LookupError):
+    pass
+
+
+class RulesetService:
+    """Publishes rulesets to the database and keeps each process on the active one.
+
+    The bundled JSON ruleset is compiled at import time; ``sync`` then looks up
+    the active database version at most every ``SCORING_RULESET_REFRESH_SECONDS``
+    and swaps it in, so a publish reaches every Lambda instance without a
+    redeploy.
+    """
+
+    @staticmethod
+    def sync(db_session: Session, force: bool = False) -> Ruleset:
+        global _last_sync
+        now = time.monotonic()
+        if not force and now - _last_sync < RULESET_REFRESH_SECONDS:
+            return get_ruleset()
+        _last_sync = now
+        try:
+            version = (
+                db_session.query(ScoringRuleset.version)
+                .filter(ScoringRuleset.is_active == True)
+                .scalar()
+            )
+            if version and version != get_ruleset().version:
+                swap_ruleset(RulesetService.load(version, db_session))
+                logger.info("scoring ruleset switched to %s", version)
+        except Exception:
+            # never block scoring on the ruleset table; keep the rules we already have
+            logger.exception("could not refresh the scoring ruleset, keeping %s", get_ruleset().version)
+        return get_ruleset()
+
+    @staticmethod
+    def load(version: str, db_session: Session) -> Ruleset:
+        """The ruleset ``version``, from memory or the database. Raises RulesetNotFound."""
+        for known in (get_ruleset(), get_bundled_ruleset()):
+            if known.version == version:
+                return known
+        row = db_session.get(ScoringRuleset, version)
+        if row is None:
+            raise RulesetNotFound(f"Ruleset {version} not found")
+        return Ruleset.from_json(row.body)
+
+    @staticmethod
+    def current(user: Principal):
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
+        ruleset = get_ruleset()
+        return {"version": ruleset.version, "ruleset": ruleset.spec}
+
+    @staticmethod
+    def publish(spec: dict, user: Principal, db_session: Session, activate: bool = True):
+        if user.role != "super_admin":
+            raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
+        try:
+            ruleset = Ruleset.from_dict(spec)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid ruleset: {e!r}")
+        if ruleset.version == get_bundled_ruleset().version or db_session.get(ScoringRuleset, ruleset.version):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail=f"Ruleset {ruleset.version} already exists, bump the version")
+
+        db_session.add(ScoringRuleset(version=ruleset.version, body=json.dumps(spec), created_by=user.id))
+        db_session.flush()
+        if activate:
+            return RulesetService.activate(ruleset.version, user, db_session, ruleset=ruleset)
+        db_session.commit()
+        return {"version": ruleset.version, "active": False}
+
+    @staticmethod
+    def activate(version: str, user: Principal, db_session: Session, ruleset: Ruleset | None = None):
+        if user.role != "super_admin":
+            raise HTTPException(status_code=403, detail="You are not authorised to perform this action")
+        try:
+            ruleset = ruleset or RulesetService.load(version, db_session)
+        except RulesetNotFound as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        row = db_session.get(ScoringRuleset, version)
+        if row is None:
+            # the bundled ruleset: store it so every instance can load it once it is active
+            row = ScoringRuleset(version=version, body=json.dumps(ruleset.spec), created_by=user.id)
+            db_session.add(row)
+
+        db_session.query(ScoringRuleset).filter(ScoringRuleset.is_active == True).update({"is_active": False})
+        row.is_active = True
+        row.activated_at = datetime.utcnow()
+        db_session.commit()
+        swap_ruleset(ruleset)
+        return {"version": version, "active": True}
@@ -0,0 +1,45 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from services.purge.services import PurgeService
+from services.rescoring.services import RescoringService
+from services.stripe_outbox.services import StripeOutboxService
+
+# stop starting new work this long before the invocation's time limit
+SCHEDULED_JOB_MARGIN_SECONDS = float(os.getenv("SCHEDULED_JOB_MARGIN_SECONDS", "10"))
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJobService:
+    """Background work for the Lambda, run by EventBridge schedules invoking ``main.handler``
+    with ``{"job": "<name>"}`` instead of an API Gateway event.
+
+    Each job gets a ``time.monotonic()`` deadline ``SCHEDULED_JOB_MARGIN_SECONDS``
+    short of the invocation's remaining time and leaves what it did not finish
+    for the next tick.
+    """
+
+    JOBS: Dict[str, Callable[[Optional[float]], int]] = {
+        "rescoring": RescoringService.run_pending,
+        "stripe_outbox": lambda deadline: StripeOutboxService.drain(deadline=deadline),
+        "purge": lambda deadline: PurgeService.purge(deadline=deadline),
+    }
+
+    @staticmethod
+    def deadline(context) -> Optional[float]:
+        if context is None or not hasattr(context, "get_remaining_time_in_millis"):
+            return None
+        remaining = context.get_remaining_time_in_millis() / 1000 - SCHEDULED_JOB_MARGIN_SECONDS
+        return time.monotonic() + max(remaining, 0.0)
+
+    @staticmethod
+    def run(name: str, context=None) -> dict:
+        job = ScheduledJobService.JOBS.get(name)
+        if job is None:
+            raise ValueError(f"Unknown scheduled job {name!r}, expected one of {sorted(ScheduledJobService.JOBS)}")
+        processed = job(ScheduledJobService.deadline(context))
+        logger.info("scheduled job %s processed %s", name, processed)
+        return {"job": name, "processed": processed}
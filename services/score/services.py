@@ -0,0 +1,242 @@
+import json
+import logging
+from dataclasses import fields, replace
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.models import MerchantDB, ScoreEntry, ScoringInput, User
+from models.schema import BatchScoreRequest, BatchScoreResponse, MerchantOnboardRequest
+from services.calculation.batch import BatchCalculation
+from services.calculation.cache import fingerprint, score_cache
+from services.calculation.services import GATE_FIELDS, Calculation, ScoringInputs
+from services.ruleset.services import RulesetService
+from utils.merchant.common import _as_list
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreService:
+
+    @staticmethod
+    def inputs_from_request(payload: MerchantOnboardRequest) -> ScoringInputs:
+        bb = payload.bank_behaviour
+        bp = payload.business_profile
+        return ScoringInputs(
+            self_employed=bool(payload.self_employed),
+            annual_income=float(payload.annual_income or 0),
+            verified_income=payload.verified_income,
+            fico_score=payload.fico_score,
+            overdrafts_6mo=bb.overdrafts_6mo if bb else 0,
+            avg_balance=bb.avg_balance if bb else 0.0,
+            nsf_fees=bb.nsf_fees if bb else 0,
+            device_risk_score=float(payload.device_risk_score or 0),
+            fraud_score=float(payload.fraud_score or 0),
+            industry=payload.industry,
+            keywords=list(payload.keywords or []),
+            business_name=bp.business_name if bp else None,
+            dba=bp.dba if bp else None,
+            website=payload.website,
+        )
+
+    @staticmethod
+    def inputs_from_row(row: ScoringInput) -> ScoringInputs:
+        return ScoringInputs(
+            self_employed=row.self_employed,
+            annual_income=row.annual_income,
+            verified_income=row.verified_income,
+            fico_score=row.fico_score,
+            overdrafts_6mo=row.overdrafts_6mo,
+            avg_balance=row.avg_balance,
+            nsf_fees=row.nsf_fees,
+            device_risk_score=row.device_risk_score,
+            fraud_score=row.fraud_score,
+            industry=row.industry,
+            keywords=_as_list(row.keywords),
+            business_name=row.business_name,
+            dba=row.dba,
+            website=row.website,
+        )
+
+    @staticmethod
+    def merge_inputs(current: Optional[ScoringInputs], payload: MerchantOnboardRequest) -> ScoringInputs:
+        """``current`` with ``payload`` applied as a partial update: anything the client did not send
+        keeps its stored value."""
+        incoming = ScoreService.inputs_from_request(payload)
+        if current is None:
+            return incoming
+        sent = payload.model_fields_set
+        bb, bp = payload.bank_behaviour, payload.business_profile
+        provided = {
+            name for name in ("self_employed", "annual_income", "verified_income", "fico_score",
+                              "device_risk_score", "fraud_score", "website")
+            if name in sent and getattr(payload, name) is not None
+        }
+        if bb is not None:
+            provided |= bb.model_fields_set & {"overdrafts_6mo", "avg_balance", "nsf_fees"}
+        if bp is not None:
+            provided |= {name for name in ("business_name", "dba") if getattr(bp, name)}
+        if payload.industry:
+            provided.add("industry")
+        if payload.keywords:
+            provided.add("keywords")
+        return replace(current, **{name: getattr(incoming, name) for name in provided})
+
+    @staticmethod
+    def build_inputs_row(merchant_id: str, inputs: ScoringInputs, version: int = 1,
+                         gates: Optional[dict] = None) -> ScoringInput:
+        return ScoringInput(
+            merchant_id=merchant_id,
+            version=version,
+            self_employed=inputs.self_employed,
+            annual_income=inputs.annual_income,
+            verified_income=inputs.verified_income,
+            fico_score=inputs.fico_score,
+            overdrafts_6mo=inputs.overdrafts_6mo,
+            avg_balance=inputs.avg_balance,
+            nsf_fees=inputs.nsf_fees,
+            device_risk_score=inputs.device_risk_score,
+            fraud_score=inputs.fraud_score,
+            industry=inputs.industry,
+            keywords=json.dumps(inputs.keywords),
+            business_name=inputs.business_name,
+            dba=inputs.dba,
+            website=inputs.website,
+            gate_outputs=json.dumps(gates) if gates else None,
+        )
+
+    @staticmethod
+    def stored_gates(row: ScoringInput) -> Optional[dict]:
+        if not row.gate_outputs:
+            return None
+        try:
+            return json.loads(row.gate_outputs)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def build_score_entry(merchant_id: str, result: dict,
+                          scoring_input: Optional[ScoringInput] = None) -> ScoreEntry:
+        return ScoreEntry(
+            merchant_id=merchant_id,
+            score=result["score"],
+            tier=result["tier"],
+            decision=result["decision"],
+            limit_suggestion=result["limit_suggestion"],
+            risk_tags=json.dumps(result["risk_tags"]),
+            explanation=json.dumps(result["explanation"]),
+            heat_score=result["heat_score"],
+            ruleset_version=result.get("ruleset_version"),
+            input_hash=result.get("input_hash"),
+            scoring_input=scoring_input,
+        )
+
+    @staticmethod
+    def add_score(merchant: MerchantDB, result: dict, db_session: Session,
+                  scoring_input: Optional[ScoringInput] = None) -> ScoreEntry:
+        """Add a ScoreEntry for ``result`` and make it the merchant's latest score (not committed)."""
+        entry = ScoreService.build_score_entry(merchant.id, result, scoring_input=scoring_input)
+        db_session.add(entry)
+        merchant.latest_score = entry
+        return entry
+
+    @staticmethod
+    def rescore_changed(merchant: MerchantDB, inputs: ScoringInputs, db_session: Session,
+                        row: Optional[ScoringInput] = None) -> Optional[dict]:
+        """Rescore ``merchant`` for ``inputs`` if they differ from its stored inputs ``row``.
+
+        Only the gates fed by changed fields are re-run; the rest come from
+        ``row.gate_outputs``. A new inputs version is recorded, but a
+        ScoreEntry only when the score or tier moves. Returns None when no
+        scoring input changed. Nothing is committed.
+        """
+        if row is None:
+            changed = {f.name for f in fields(ScoringInputs)}
+            previous = None
+        else:
+            current = ScoreService.inputs_from_row(row)
+            if fingerprint(current) == fingerprint(inputs):
+                return None
+            changed = {f.name for f in fields(ScoringInputs) if getattr(current, f.name) != getattr(inputs, f.name)}
+            previous = ScoreService.stored_gates(row)
+        only = Calculation.gates_for(changed) if previous else set(GATE_FIELDS)
+
+        result = Calculation.evaluate(inputs, RulesetService.sync(db_session), previous=previous, only=only)
+        result["input_hash"] = fingerprint(inputs)
+        inputs_row = ScoreService.record_inputs(merchant.id, inputs, db_session, gates=result["gates"])
+        latest = merchant.latest_score
+        written = latest is None or latest.score != result["score"] or latest.tier != result["tier"]
+        if written:
+            ScoreService.add_score(merchant, result, db_session, scoring_input=inputs_row)
+        logger.info("rescored %s: gates=%s score=%s written=%s", merchant.id, sorted(only), result["score"], written)
+        return {"gates": sorted(only), "score": result["score"], "tier": result["tier"], "score_written": written}
+
+    @staticmethod
+    def cache_stats(user: User) -> dict:
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        return score_cache.stats()
+
+    @staticmethod
+    def lock_merchant(merchant_id: str, db_session: Session) -> MerchantDB | None:
+        """Lock the merchant row until commit; take it before reading the latest inputs to derive a new
+        version, so concurrent writers queue instead of colliding on (merchant_id, version)."""
+        return db_session.query(MerchantDB).filter(MerchantDB.id == merchant_id).with_for_update().first()
+
+    @staticmethod
+    def latest_inputs(merchant_id: str, db_session: Session) -> ScoringInput | None:
+        return (
+            db_session.query(ScoringInput)
+            .filter(ScoringInput.merchant_id == merchant_id)
+            .order_by(ScoringInput.version.desc())
+            .first()
+        )
+
+    @staticmethod
+    def record_inputs(merchant_id: str, inputs: ScoringInputs, db_session: Session,
+                      gates: Optional[dict] = None) -> ScoringInput:
+        """Add the next inputs version for ``merchant_id`` to the session (not committed)."""
+        current = (
+            db_session.query(func.max(ScoringInput.version))
+            .filter(ScoringInput.merchant_id == merchant_id)
+            .scalar()
+        )
+        row = ScoreService.build_inputs_row(merchant_id, inputs, version=(current or 0) + 1, gates=gates)
+        db_session.add(row)
+        return row
+
+    @staticmethod
+    def score_batch(payload: BatchScoreRequest, user: User, db_session: Session) -> BatchScoreResponse:
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+
+        result = BatchCalculation.score(
+            payload.annual_income,
+            payload.industry,
+            verified_income=payload.verified_income,
+            fico_score=payload.fico_score,
+            utilization=payload.utilization,
+            avg_balance=payload.avg_balance,
+            overdrafts_6mo=payload.overdrafts_6mo,
+            nsf_fees=payload.nsf_fees,
+            device_risk_score=payload.device_risk_score,
+            fraud_score=payload.fraud_score,
+            keywords=payload.keywords,
+            business_name=payload.business_name,
+            dba=payload.dba,
+            website=payload.website,
+            rules=RulesetService.sync(db_session),
+        )
+        return BatchScoreResponse(
+            count=len(result),
+            merchant_id=payload.merchant_id,
+            score=result.score.tolist(),
+            tier=result.tier.tolist(),
+            decision=result.decision.tolist(),
+            limit_suggestion=result.limit_suggestion.tolist(),
+            heat_score=result.heat_score.tolist(),
+            risk_tags=result.risk_tags,
+            ruleset_version=result.ruleset_version,
+        )
@@ -1,26 +1,35 @@
-import jwt
-import datetime
-import os
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from models.models import User
-from models.schema import SignInRequest, SignInResponse
-from passlib.hash import bcrypt
+from models.schema import SignInRequest, SignInResponse, TokenRefreshRequest
+from utils.authentication import AuthService, Principal
+from utils.passwords import password_hasher
 
 class SignInService:
     @staticmethod
-    def login_user(payload: SignInRequest, db: Session) -> SignInResponse:
-        user = db.query(User).filter(User.email == payload.email).first()
+    async def login_user(payload: SignInRequest, db: AsyncSession) -> SignInResponse:
+        user = (await db.scalars(select(User).where(User.email == payload.email))).first()
 
-        if not user or not bcrypt.verify(payload.password, user.password):
+        if not user or not await password_hasher.verify(payload.password, user.password):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        payload_data = {
-            "user_id": str(user.id),
-            "email": user.email,
-            "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1)
-        }
-        secret_key = os.getenv("JWT_SECRET", "secret")
-        token = jwt.encode(payload_data, secret_key, algorithm="HS256")
+        if password_hasher.needs_rehash(user.password):
+            # same password at the new cost: bypass the attribute events so existing tokens stay valid
+            new_hash = await password_hasher.hash(payload.password)
+            await db.execute(update(User).where(User.id == user.id).values(password=new_hash)
+                             .execution_options(synchronize_session=False))
+            await db.commit()
 
-        return SignInResponse(message="Login successful", token=token)
+        return SignInResponse(message="Login successful", **AuthService.issue_tokens(user))
+
+    @staticmethod
+    def refresh_token(payload: TokenRefreshRequest, db: Session) -> SignInResponse:
+        return SignInResponse(message="Token refreshed", **AuthService.refresh(payload.refresh_token, db))
+
+    @staticmethod
+    def hashing_stats(user: Principal) -> dict:
+        if user.role not in ["admin", "super_admin"]:
+            raise HTTPException(detail="You are not authorised to perform this action", status_code=403)
+        return password_hasher.stats()
@@ -1,47 +1,57 @@
-import json
-import stripe
+from uuid import uuid4
+
 from fastapi import HTTPException
-from passlib.hash import bcrypt
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from models.models import MerchantDB, MerchantProfile, ScoreEntry, User
+from models.models import MerchantDB, MerchantProfile, User
 from models.schema import (
-    BankBehavior,
     MerchantOnboardRequest,
     MerchantResponse,
     SignUpRequest,
     SignUpResponse,
 )
-from services.calculation.services import Calculation
-from services.gateways.services import GatewayService
+from services.calculation.cache import score_cache
+from services.ruleset.services import RulesetService
+from services.score.services import ScoreService
+from services.stripe_outbox.services import StripeOutboxService
+from utils.authentication import Principal
+from utils.passwords import password_hasher
 
 
 class SignUpService:
     @staticmethod
-    def register_user(payload: SignUpRequest, db_session: Session) -> SignUpResponse:
-        isExist = db_session.query(User).filter(User.email == payload.email).one_or_none()
+    async def register_user(payload: SignUpRequest, db_session: AsyncSession) -> SignUpResponse:
+        isExist = await db_session.scalar(select(User.id).where(User.email == payload.email))
         if isExist:
             raise HTTPException(detail="You're already register please try login.", status_code=403)
-        hashed_password = bcrypt.hash(payload.password)
+        hashed_password = await password_hasher.hash(payload.password)
         new_user = User(first_name=payload.first_name, last_name=payload.last_name,
                         email=payload.email, password=hashed_password)
         db_session.add(new_user)
-        db_session.commit()
-        db_session.refresh(new_user)
+        await db_session.commit()
+        await db_session.refresh(new_user)
         return SignUpResponse(message="User registered successfully", user_id=new_user.id)
 
     @staticmethod
-    def add_merchant(payload: MerchantOnboardRequest, user: User,
-                     db_session: Session) -> MerchantResponse | HTTPException:
+    async def add_merchant(payload: MerchantOnboardRequest, user: Principal,
+                           db_session: AsyncSession) -> MerchantResponse | HTTPException:
+        return await db_session.run_sync(SignUpService.onboard_merchant, payload, user)
 
-        merchant = db_session.query(MerchantDB).filter(
-            MerchantDB.business_name == payload.business_profile.business_name,
-            MerchantDB.industry == payload.industry).one_or_none()
-        if merchant:
-            return MerchantResponse(message="Merchant exists",
-                                    merchant_id=merchant.id,
-                                    merchant_profile=merchant.profile.id)
+    @staticmethod
+    def onboard_merchant(db_session: Session, payload: MerchantOnboardRequest,
+                         user: Principal) -> MerchantResponse | HTTPException:
+        """Write the merchant, its profile, scoring inputs and first score in one transaction.
+
+        Ids are generated here so nothing has to be read back; a duplicate
+        (business_name, industry) is caught by the unique constraint. Scoring
+        is shared with the synchronous jobs, so this runs on the sync facade of
+        the request's AsyncSession.
+        """
         merchant = MerchantDB(
+            id=str(uuid4()),
             user_id=user.id,
             business_name=payload.business_profile.business_name,
             type_of_merchant=payload.type_of_merchant,
@@ -55,37 +65,8 @@ class SignUpService:
             website=payload.website,
         )
 
-        # Gates
-        g1 = Calculation.gate_age_income(bool(payload.self_employed), float(payload.annual_income or 0),
-                                         payload.verified_income)
-        g2 = Calculation.gate_identity_fraud(float(payload.device_risk_score or 0), float(payload.fraud_score or 0))
-        g3 = Calculation.gate_creditworthiness(payload.fico_score)
-        bb = BankBehavior(**(payload.bank_behaviour.dict() if payload.bank_behaviour else {}))
-        g4 = Calculation.gate_bank_behaviour(bb)
-        ind_pts, ind_tags, heat = Calculation.industry_rules(payload.industry, payload.keywords)
-
-        result = Calculation.combine_gates(g1, g2, g3, g4, ind_pts, ind_tags)
-
-        result["limit_suggestion"] = "$3,000" if result["tier"] == "Warm" else "$5,000" if result[
-                                                                                               "tier"] == "Hot" else "$0"
-        db_session.add(merchant)
-        db_session.commit()
-        db_session.refresh(merchant)
-
-        snap = ScoreEntry(
-            merchant_id=merchant.id,
-            score=result["score"],
-            tier=result["tier"],
-            decision=result["decision"],
-            limit_suggestion=result["limit_suggestion"],
-            risk_tags=json.dumps(result["risk_tags"]),
-            explanation=json.dumps(result["explanation"]),
-            heat_score=heat,
-        )
-        db_session.add(snap)
-        db_session.commit()
-
         merchant_profile = MerchantProfile(
+            id=str(uuid4()),
             merchant_id=merchant.id,
             dba=payload.business_profile.dba,
             type_of_merchant=payload.type_of_merchant,
@@ -96,40 +77,61 @@ class SignUpService:
             contact_name=payload.business_profile.contact_name,
             contact_title=payload.business_profile.contact_title,
         )
-        db_session.add(merchant_profile)
-        db_session.commit()
-        db_session.refresh(merchant_profile)
+        merchant.profile = merchant_profile
+
+        inputs = ScoreService.inputs_from_request(payload)
+        result = score_cache.evaluate(inputs, RulesetService.sync(db_session))
+        inputs_row = ScoreService.build_inputs_row(merchant.id, inputs, gates=result["gates"])
+        merchant.scoring_inputs.append(inputs_row)
+        ScoreService.add_score(merchant, result, db_session, scoring_input=inputs_row)
 
-        gateway = GatewayService.get(db_session)
-        stripe.api_key = gateway.api_key
-        stripe.Customer.create(email=user.email, name=user.first_name + " " + user.last_name)
+        # the Stripe customer is created by the outbox worker once this transaction commits;
+        # the token carries no name, so read it alongside this write
+        owner = db_session.execute(select(User.first_name, User.last_name).where(User.id == user.id)).one()
+        StripeOutboxService.enqueue(merchant.id, user.email, owner.first_name + " " + owner.last_name, db_session)
+
+        merchant_id, profile_id = merchant.id, merchant_profile.id
+        db_session.add(merchant)
+        try:
+            db_session.commit()
+        except IntegrityError:
+            db_session.rollback()
+            existing = db_session.query(MerchantDB).filter(
+                MerchantDB.business_name == payload.business_profile.business_name,
+                MerchantDB.industry == payload.industry,
+                MerchantDB.deleted_at.is_(None)).one_or_none()
+            if existing is None:
+                raise
+            return MerchantResponse(message="Merchant exists",
+                                    merchant_id=existing.id,
+                                    merchant_profile=existing.profile.id)
 
         return MerchantResponse(message="Successfully Added the merchant details",
-                                merchant_id=merchant.id,
-                                merchant_profile=merchant_profile.id)
+                                merchant_id=merchant_id,
+                                merchant_profile=profile_id)
 
     @staticmethod
-    def register_root(payload: SignUpRequest, db_session: Session) -> SignUpResponse:
-        is_user = db_session.query(User).filter_by(role="super_admin").first()
+    async def register_root(payload: SignUpRequest, db_session: AsyncSession) -> SignUpResponse:
+        is_user = (await db_session.scalars(select(User.id).where(User.role == "super_admin"))).first()
         if is_user:
             raise HTTPException(status_code=403, detail="You are already a super admin")
 
-        hashed_password = bcrypt.hash(payload.password)
+        hashed_password = await password_hasher.hash(payload.password)
         new_user = User(first_name=payload.first_name, last_name=payload.last_name,
                         email=payload.email, password=hashed_password, role="super_admin")
         db_session.add(new_user)
-        db_session.commit()
-        db_session.refresh(new_user)
+        await db_session.commit()
+        await db_session.refresh(new_user)
 
         return SignUpResponse(message="User registered successfully", user_id=new_user.id)
 
     @staticmethod
-    def register_admin(payload: SignUpRequest, user: User, db_session: Session) -> SignUpResponse:
+    async def register_admin(payload: SignUpRequest, user: Principal, db_session: AsyncSession) -> SignUpResponse:
 
         if user.role != "super_admin":
             raise HTTPException(status_code=403, detail="You are not a super admin")
 
-        hashed_password = bcrypt.hash(payload.password)
+        hashed_password = await password_hasher.hash(payload.password)
         new_user = User(
             first_name=payload.first_name,
             last_name=payload.last_name,
@@ -139,7 +141,7 @@ class SignUpService:
             created_by=user.id  # <-- track creator
         )
         db_session.add(new_user)
-        db_session.commit()
-        db_session.refresh(new_user)
+        await db_session.commit()
+        await db_session.refresh(new_user)
 
         return SignUpResponse(message="User registered successfully", user_id=new_user.id)
@@ -0,0 +1,32 @@
+"""Create pending Stripe customers from the outbox.
+
+    python -m services.stripe_outbox [--once] [--interval 5] [--batch-size 50]
+
+In production the Lambda drains it from the scheduled "stripe_outbox" job (see services/scheduled).
+"""
+import argparse
+import logging
+import time
+
+from services.stripe_outbox.services import OUTBOX_BATCH_SIZE, StripeOutboxService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="drain what is due and exit (cron)")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds to sleep when the outbox is empty")
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    while True:
+        processed = StripeOutboxService.drain(batch_size=args.batch_size)
+        if processed:
+            logging.info("stripe outbox: processed %s entries", processed)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import itertools
+import os
+import random
+import threading
+from typing import List, Optional, Protocol
+
+import stripe
+
+# "live" talks to Stripe with the active gateway's key; "fake" never leaves the process
+STRIPE_CLIENT = os.getenv("STRIPE_CLIENT", "live")
+FAKE_STRIPE_FAILURE_RATE = float(os.getenv("FAKE_STRIPE_FAILURE_RATE", "0"))
+
+
+class CustomerClient(Protocol):
+    def create_customer(self, email: str, name: Optional[str], idempotency_key: str) -> str:
+        """Create a customer and return its Stripe id."""
+
+
+class LiveStripeClient:
+    """Per-instance ``stripe.StripeClient``: the key is never written to the global ``stripe.api_key``."""
+
+    def __init__(self, api_key: str):
+        self._client = stripe.StripeClient(api_key)
+
+    def create_customer(self, email: str, name: Optional[str], idempotency_key: str) -> str:
+        customer = self._client.customers.create(
+            params={"email": email, "name": name},
+            options={"idempotency_key": idempotency_key},
+        )
+        return customer.id
+
+
+class FakeStripeClient:
+    """In-memory stand-in for local runs and tests; honours idempotency keys like Stripe does."""
+
+    def __init__(self, failure_rate: float = FAKE_STRIPE_FAILURE_RATE):
+        self.failure_rate = failure_rate
+        self.customers: dict = {}
+        self.errors: dict = {}
+        self.calls: List[str] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_customer(self, email: str, name: Optional[str], idempotency_key: str) -> str:
+        with self._lock:
+            self.calls.append(idempotency_key)
+            if email in self.errors:
+                raise self.errors[email]
+            if self.failure_rate and random.random() < self.failure_rate:
+                raise stripe.APIConnectionError("fake stripe: simulated network error")
+            if idempotency_key not in self.customers:
+                self.customers[idempotency_key] = {"id": f"cus_fake_{next(self._ids)}", "email": email, "name": name}
+            return self.customers[idempotency_key]["id"]
+
+    def fail(self, email: str, error: Exception) -> None:
+        """Make every call for ``email`` raise ``error``."""
+        self.errors[email] = error
+
+
+def get_client(api_key: Optional[str]) -> CustomerClient:
+    if STRIPE_CLIENT == "fake":
+        return FakeStripeClient()
+    if not api_key:
+        raise RuntimeError("No active payment gateway with a Stripe API key")
+    return LiveStripeClient(api_key)
@@ -0,0 +1,115 @@
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import stripe
+from sqlalchemy.orm import Session
+
+from connections.db_connection import SessionLocal
+from models.models import StripeOutbox
+from services.gateways.services import GatewayService
+from services.stripe_outbox.client import CustomerClient, get_client
+
+OUTBOX_BATCH_SIZE = int(os.getenv("STRIPE_OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_CONCURRENCY = int(os.getenv("STRIPE_OUTBOX_CONCURRENCY", "8"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("STRIPE_OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("STRIPE_OUTBOX_BACKOFF_SECONDS", "5"))
+OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("STRIPE_OUTBOX_MAX_BACKOFF_SECONDS", "3600"))
+
+logger = logging.getLogger(__name__)
+
+# errors worth retrying; anything else (bad request, auth) fails the entry straight away
+_RETRYABLE = (stripe.APIConnectionError, stripe.RateLimitError, stripe.APIError)
+
+
+class StripeOutboxService:
+    """Transactional outbox for Stripe customer creation.
+
+    Onboarding only inserts a ``StripeOutbox`` row next to the merchant, so the
+    request never waits on Stripe. ``drain`` claims due rows in batches with
+    ``FOR UPDATE SKIP LOCKED`` (several workers can run side by side), calls
+    Stripe concurrently using the outbox id as the idempotency key, and
+    reschedules retryable failures with capped exponential backoff and jitter.
+    """
+
+    @staticmethod
+    def enqueue(merchant_id: str, email: str, name: Optional[str], db_session: Session) -> StripeOutbox:
+        entry = StripeOutbox(merchant_id=merchant_id, email=email, name=name)
+        db_session.add(entry)
+        return entry
+
+    @staticmethod
+    def backoff(attempts: int) -> timedelta:
+        delay = min(OUTBOX_MAX_BACKOFF_SECONDS, OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1))
+        return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+    @staticmethod
+    def claim(db_session: Session, batch_size: int) -> List[StripeOutbox]:
+        return (
+            db_session.query(StripeOutbox)
+            .filter(StripeOutbox.status == "pending", StripeOutbox.next_attempt_at <= datetime.utcnow())
+            .order_by(StripeOutbox.next_attempt_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    @staticmethod
+    def _send(client: CustomerClient, entry: StripeOutbox):
+        try:
+            return client.create_customer(entry.email, entry.name, idempotency_key=entry.id), None
+        except Exception as e:
+            return None, e
+
+    @staticmethod
+    def drain_batch(db_session: Session, client: Optional[CustomerClient] = None,
+                    batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+        """Process one batch of due entries; returns how many were claimed."""
+        entries = StripeOutboxService.claim(db_session, batch_size)
+        if not entries:
+            db_session.commit()
+            return 0
+        if client is None:
+            gateway = GatewayService.get(db_session)
+            client = get_client(gateway.api_key if gateway else None)
+
+        with ThreadPoolExecutor(max_workers=min(OUTBOX_CONCURRENCY, len(entries))) as pool:
+            outcomes = list(pool.map(lambda e: StripeOutboxService._send(client, e), entries))
+
+        now = datetime.utcnow()
+        for entry, (customer_id, error) in zip(entries, outcomes):
+            entry.attempts += 1
+            if error is None:
+                entry.status, entry.stripe_customer_id, entry.processed_at = "done", customer_id, now
+                entry.last_error = None
+            elif isinstance(error, _RETRYABLE) and entry.attempts < OUTBOX_MAX_ATTEMPTS:
+                entry.last_error = str(error)
+                entry.next_attempt_at = now + StripeOutboxService.backoff(entry.attempts)
+            else:
+                entry.status, entry.last_error, entry.processed_at = "failed", str(error), now
+                logger.error("stripe customer for merchant %s failed permanently: %s", entry.merchant_id, error)
+        db_session.commit()
+        return len(entries)
+
+    @staticmethod
+    def drain(client: Optional[CustomerClient] = None, batch_size: int = OUTBOX_BATCH_SIZE,
+              max_batches: Optional[int] = None, deadline: Optional[float] = None) -> int:
+        """Drain due entries until none are left, ``max_batches`` or ``time.monotonic()`` passes ``deadline``;
+        returns how many were processed."""
+        db_session: Session = SessionLocal()
+        processed = batches = 0
+        try:
+            while ((max_batches is None or batches < max_batches)
+                   and (deadline is None or time.monotonic() < deadline)):
+                claimed = StripeOutboxService.drain_batch(db_session, client, batch_size)
+                if not claimed:
+                    break
+                processed += claimed
+                batches += 1
+            return processed
+        finally:
+            db_session.close()
@@ -0,0 +1,71 @@
+from dataclasses import replace
+from typing import Callable
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from models.models import MerchantDB, WebhookLog
+from models.schema import APIResponse, ExperianWebhook, FinicityWebhook
+from services.calculation.services import ScoringInputs
+from services.score.services import ScoreService
+
+
+class WebhookService:
+    """Ingest bureau/bank webhooks and rescore only the gates they touch.
+
+    Each event is logged, applied to the merchant's latest ScoringInput as a
+    new inputs version, and scored with ``Calculation.evaluate`` reusing the
+    stored outputs of every gate whose inputs did not change. A ScoreEntry is
+    only written when the score or the tier moves.
+    """
+
+    @staticmethod
+    def _log(merchant_id: str, source: str, payload, db_session: Session) -> MerchantDB:
+        # held until _rescore commits: a burst of events for one merchant applies one after another
+        merchant = ScoreService.lock_merchant(merchant_id, db_session)
+        if not merchant or merchant.deleted_at is not None:
+            raise HTTPException(status_code=404, detail="Merchant not found")
+        db_session.add(WebhookLog(merchant_id=merchant_id, source=source,
+                                  content=payload.model_dump_json()))
+        return merchant
+
+    @staticmethod
+    def _rescore(merchant: MerchantDB, changes_for: Callable[[ScoringInputs], dict],
+                 db_session: Session) -> APIResponse:
+        row = ScoreService.latest_inputs(merchant.id, db_session)
+        if row is None:
+            # nothing to rescore until the merchant has been scored from stored inputs
+            db_session.commit()
+            return APIResponse(message="Webhook recorded", status="success",
+                               data={"gates": [], "score_written": False})
+
+        current = ScoreService.inputs_from_row(row)
+        inputs: ScoringInputs = replace(current, **changes_for(current))
+        rescored = ScoreService.rescore_changed(merchant, inputs, db_session, row=row)
+        db_session.commit()
+        if rescored is None:
+            return APIResponse(message="Webhook recorded", status="success",
+                               data={"gates": [], "score_written": False})
+        return APIResponse(message="Webhook processed", status="success", data=rescored)
+
+    @staticmethod
+    def experian(payload: ExperianWebhook, db_session: Session) -> APIResponse:
+        merchant = WebhookService._log(payload.merchant_id, "experian", payload, db_session)
+        return WebhookService._rescore(merchant, lambda current: {"fraud_score": payload.fraud_score},
+                                       db_session)
+
+    @staticmethod
+    def finicity(payload: FinicityWebhook, db_session: Session) -> APIResponse:
+        merchant = WebhookService._log(payload.merchant_id, "finicity", payload, db_session)
+
+        def changes_for(current: ScoringInputs) -> dict:
+            changes = {}
+            if payload.avg_balance is not None:
+                changes["avg_balance"] = payload.avg_balance
+            if payload.verified_income is not None:
+                changes["verified_income"] = payload.verified_income
+            if payload.overdraft_alert:
+                changes["overdrafts_6mo"] = (current.overdrafts_6mo or 0) + 1
+            return changes
+
+        return WebhookService._rescore(merchant, changes_for, db_session)
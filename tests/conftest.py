@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import models.models as models
+from connections.db_connection import Base
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "risk_score.db"
+
+
+@pytest.fixture
+def session_factory(db_path):
+    """A sessionmaker on a fresh SQLite file with every table created."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def merchant(db_session):
+    user = models.User(first_name="Ada", last_name="Lovelace", email="ada@example.com", password="x",
+                       role="super_admin")
+    db_session.add(user)
+    db_session.flush()
+    merchant = models.MerchantDB(business_name="Analytical Engines", user_id=user.id, industry="retail")
+    db_session.add(merchant)
+    db_session.commit()
+    return merchant
+
+
+@pytest.fixture
+def client(monkeypatch, db_path, session_factory):
+    """TestClient for the app, with every session (sync, async and read replica) on the test database."""
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    import services.idempotency.services as idempotency
+    from connections.db_connection import get_async_db, get_db, get_read_async_db
+    from main import app
+
+    async_session_factory = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{db_path}"),
+                                               autoflush=False, expire_on_commit=False)
+
+    def get_test_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async def get_test_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    monkeypatch.setattr(idempotency, "SessionLocal", session_factory)
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    app.dependency_overrides[get_read_async_db] = get_test_async_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
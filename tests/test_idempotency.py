@@ -0,0 +1,62 @@
+import pytest
+
+import utils.authentication as authentication
+from models.models import IdempotencyKey, ScoringInput
+from services.calculation.services import ScoringInputs
+from services.score.services import ScoreService
+
+ORIGIN = "https://risk-score-fe.vercel.app"
+SECRET = "test-webhook-secret"
+
+
+@pytest.fixture
+def post_webhook(monkeypatch, client, db_session, merchant):
+    monkeypatch.setattr(authentication, "WEBHOOK_SECRET", SECRET)
+    db_session.add(ScoreService.build_inputs_row(merchant.id, ScoringInputs(annual_income=50000, overdrafts_6mo=1), 1))
+    db_session.commit()
+
+    def _post(key, **payload):
+        return client.post("/api/v1/webhook/finicity",
+                           json={"merchant_id": merchant.id, "overdraft_alert": True, **payload},
+                           headers={"Origin": ORIGIN, "X-Webhook-Secret": SECRET, "Idempotency-Key": key})
+    return _post
+
+
+def test_replayed_response_carries_cors_headers(post_webhook, db_session, merchant):
+    first = post_webhook("event-1")
+    replayed = post_webhook("event-1")
+
+    assert first.status_code == replayed.status_code == 200
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+    assert replayed.json() == first.json()
+    for response in (first, replayed):
+        assert response.headers["access-control-allow-origin"] == ORIGIN
+        assert response.headers["access-control-allow-credentials"] == "true"
+    # the event was applied once
+    latest = ScoreService.latest_inputs(merchant.id, db_session)
+    assert (latest.version, latest.overdrafts_6mo) == (2, 2)
+
+
+def test_rejected_keys_carry_cors_headers(post_webhook, db_session):
+    post_webhook("event-1")
+    mismatch = post_webhook("event-1", avg_balance=100.0)
+    too_long = post_webhook("k" * 256)
+
+    assert mismatch.status_code == 422
+    assert too_long.status_code == 400
+    for response in (mismatch, too_long):
+        assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+def test_in_progress_conflict_carries_cors_headers(monkeypatch, post_webhook, db_session):
+    import services.idempotency.services as idempotency
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_WAIT_SECONDS", 0)
+    post_webhook("event-1")
+    db_session.query(IdempotencyKey).update({"status": "in_progress"})
+    db_session.commit()
+
+    response = post_webhook("event-1")
+
+    assert response.status_code == 409
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert db_session.query(ScoringInput).count() == 2
@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from connections import instrumentation
+from connections.instrumentation import QueryBudgetExceeded, assert_queries, sql_metrics
+from models.models import MerchantDB, User
+from utils.authentication import AuthService
+
+
+@pytest.fixture
+def engine(db_path):
+    instrumentation.install()
+    engine = create_engine(f"sqlite:///{db_path}")
+    yield engine
+    engine.dispose()
+
+
+def run(engine, *statements):
+    with engine.connect() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def test_assert_queries_within_budget(engine):
+    with assert_queries(2) as stats:
+        run(engine, "select 1", "select 2")
+
+    assert stats.statements == 2
+
+
+def test_assert_queries_over_budget(engine):
+    with pytest.raises(QueryBudgetExceeded, match="3 statements, budget is 2"):
+        with assert_queries(2):
+            run(engine, "select 1", "select 2", "select 3")
+
+
+def test_assert_queries_reports_repeated_shapes(engine):
+    with pytest.raises(QueryBudgetExceeded, match=r"3x select \?"):
+        with assert_queries(10, max_repeats=3):
+            with engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text("select :id"), {"id": i})
+
+
+def test_rows_fetched_by_a_select_are_counted(db_session, merchant):
+    instrumentation.install()
+    db_session.add(MerchantDB(business_name="Difference Engines", user_id=merchant.user_id, industry="retail"))
+    db_session.commit()
+
+    with instrumentation.track() as stats:
+        merchants = db_session.scalars(select(MerchantDB)).all()
+
+    assert len(merchants) == 2
+    assert stats.rows == 2
+
+
+def test_streamed_selects_are_not_buffered(db_session, merchant):
+    instrumentation.install()
+
+    with instrumentation.track() as stats:
+        result = db_session.execute(select(MerchantDB.id).execution_options(yield_per=1))
+        assert type(result).__name__ == "ChunkedIteratorResult"
+        assert len(result.all()) == 1
+
+    assert stats.rows == 0
+
+
+def test_set_local_is_not_a_statement():
+    stats = instrumentation.SqlStats(budget=1, max_repeats=2)
+    for _ in range(3):
+        stats.record("SET LOCAL statement_timeout = 5000", 0.001, -1)
+        stats.record(" set local  statement_timeout = 5000", 0.001, -1)
+    stats.record("SELECT users.id FROM users", 0.001, 1)
+
+    assert stats.statements == 1
+    assert list(stats.shapes) == ["SELECT users.id FROM users"]
+    assert stats.violations() == []
+    assert stats.seconds == pytest.approx(0.007)
+
+
+def get_merchant(client, db_session, merchant):
+    token = AuthService.issue_tokens(db_session.query(User).one())["token"]
+    return client.get("/api/v1/get/merchant", params={"merchant_id": merchant.id},
+                      headers={"Authorization": f"Bearer {token}"})
+
+
+def test_middleware_reports_statements(client, db_session, merchant):
+    sql_metrics.reset()
+
+    response = get_merchant(client, db_session, merchant)
+
+    assert response.status_code == 200
+    assert 1 <= int(response.headers["X-DB-Statements"]) <= 3
+    assert "X-DB-Time-Ms" in response.headers
+    assert int(response.headers["X-DB-Rows"]) >= 1
+    assert sql_metrics.snapshot()["GET /api/v1/get/merchant"]["over_budget"] == 0
+
+
+def test_middleware_flags_a_request_over_budget(monkeypatch, client, db_session, merchant):
+    # every statement shape counts as repeated, so the request is over budget
+    monkeypatch.setattr(instrumentation, "SQL_MAX_REPEATS", 1)
+    sql_metrics.reset()
+
+    response = get_merchant(client, db_session, merchant)
+
+    assert response.status_code == 200
+    assert sql_metrics.snapshot()["GET /api/v1/get/merchant"]["over_budget"] == 1
+
+
+def test_middleware_raises_over_budget_in_assert_mode(monkeypatch, client, db_session, merchant):
+    monkeypatch.setattr(instrumentation, "SQL_MAX_REPEATS", 1)
+    monkeypatch.setattr(instrumentation, "SQL_ASSERT_BUDGETS", True)
+
+    with pytest.raises(QueryBudgetExceeded, match="GET /api/v1/get/merchant"):
+        get_merchant(client, db_session, merchant)
+
+
+def test_unmatched_paths_share_one_route_key(client):
+    sql_metrics.reset()
+
+    for path in ("/wp-admin", "/.env", "/api/v1/nope"):
+        assert client.get(path).status_code == 404
+
+    assert list(sql_metrics.snapshot()) == ["GET <unmatched>"]
+    assert sql_metrics.snapshot()["GET <unmatched>"]["requests"] == 3
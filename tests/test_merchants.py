@@ -0,0 +1,62 @@
+import pytest
+
+from models.models import MerchantDB, User
+from utils.authentication import AuthService
+
+
+@pytest.fixture
+def admin(db_session):
+    user = User(first_name="Grace", last_name="Hopper", email="grace@example.com", password="x", role="admin")
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(MerchantDB(business_name="Compilers", user_id=user.id, industry="software"))
+    db_session.commit()
+    return user
+
+
+def auth(user):
+    return {"Authorization": f"Bearer {AuthService.issue_tokens(user)['token']}"}
+
+
+def own_merchant_id(db_session, user):
+    return db_session.query(MerchantDB.id).filter(MerchantDB.user_id == user.id).scalar()
+
+
+def test_admin_cannot_delete_another_owners_merchant(client, db_session, merchant, admin):
+    response = client.delete(f"/api/v1/delete/merchant/{merchant.id}", headers=auth(admin))
+
+    assert response.status_code == 404
+    db_session.refresh(merchant)
+    assert merchant.deleted_at is None
+
+
+def test_admin_bulk_delete_reports_other_owners_merchants_as_not_found(client, db_session, merchant, admin):
+    own = own_merchant_id(db_session, admin)
+
+    response = client.post("/api/v1/delete/merchants", json={"merchant_ids": [own, merchant.id]},
+                           headers=auth(admin))
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {"deleted": [own], "not_found": [merchant.id]}
+    db_session.refresh(merchant)
+    assert merchant.deleted_at is None
+
+
+def test_super_admin_can_delete_any_merchant(client, db_session, merchant, admin):
+    owner = db_session.get(User, merchant.user_id)
+    other = own_merchant_id(db_session, admin)
+
+    response = client.post("/api/v1/delete/merchants", json={"merchant_ids": [other]}, headers=auth(owner))
+
+    assert response.json()["data"] == {"deleted": [other], "not_found": []}
+
+
+def test_profile_skips_a_soft_deleted_merchant(client, db_session, merchant):
+    owner = db_session.get(User, merchant.user_id)
+    before = client.get("/api/v1/user/me", headers=auth(owner)).json()
+    assert before["professional_details"]["company"] == "Analytical Engines"
+
+    client.delete(f"/api/v1/delete/merchant/{merchant.id}", headers=auth(owner))
+
+    after = client.get("/api/v1/user/me", headers=auth(owner)).json()
+    assert after["professional_details"] is None
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+from passlib.hash import bcrypt
+
+import services.reset_password.services as reset_password
+import services.sign_in.services as sign_in
+from models.models import User
+from utils.passwords import PasswordHasher
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    hasher = PasswordHasher(rounds=5, workers=2, max_pending=4)
+    monkeypatch.setattr(sign_in, "password_hasher", hasher)
+    monkeypatch.setattr(reset_password, "password_hasher", hasher)
+    return hasher
+
+
+@pytest.fixture
+def user(db_session, hasher):
+    user = User(first_name="Ada", last_name="Lovelace", email="ada@example.com",
+                password=bcrypt.using(rounds=4).hash("correct horse"), role="admin")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_signin_checks_the_password(client, user, hasher):
+    assert client.post("/api/v1/signin", json={"email": user.email, "password": "wrong"}).status_code == 401
+    response = client.post("/api/v1/signin", json={"email": user.email, "password": "correct horse"})
+    assert response.status_code == 200
+    assert response.json()["token"]
+    assert hasher.stats()["completed"] >= 2
+
+
+def test_signin_rehashes_at_the_configured_cost_without_revoking(client, db_session, user, hasher):
+    assert hasher.needs_rehash(user.password)
+
+    assert client.post("/api/v1/signin", json={"email": user.email, "password": "correct horse"}).status_code == 200
+
+    db_session.refresh(user)
+    assert not hasher.needs_rehash(user.password)
+    assert bcrypt.verify("correct horse", user.password)
+    assert user.token_version == 0
+
+
+def test_reset_password_revokes_existing_tokens(client, db_session, user):
+    user.reset_token, user.reset_token_expiry = "reset-me", datetime.utcnow() + timedelta(minutes=5)
+    db_session.commit()
+
+    response = client.post("/api/v1/reset-password", json={"reset_token": "reset-me", "new_password": "battery staple"})
+
+    assert response.status_code == 200
+    db_session.refresh(user)
+    assert bcrypt.verify("battery staple", user.password)
+    assert user.reset_token is None
+    assert user.token_version == 1
@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from connections import pool
+
+
+def test_single_pool_serves_a_second_session(monkeypatch, db_path):
+    monkeypatch.setattr(pool, "DB_POOL", "single")
+    monkeypatch.setattr(pool, "DB_POOL_TIMEOUT", 0.1)
+    engine = create_engine(f"sqlite:///{db_path}", **pool.engine_options())
+    pool.instrument(engine, "test")
+
+    # RescoringService.run holds a read and a write connection at the same time
+    read, write = engine.connect(), engine.connect()
+    write.close()
+    read.close()
+
+    assert engine.pool.checkedin() == 1
+
+
+def test_single_pool_overflow_is_bounded(monkeypatch, db_path):
+    monkeypatch.setattr(pool, "DB_POOL", "single")
+    monkeypatch.setattr(pool, "DB_POOL_TIMEOUT", 0.1)
+    engine = create_engine(f"sqlite:///{db_path}", **pool.engine_options())
+    stats = pool.instrument(engine, "test")
+
+    held = [engine.connect() for _ in range(1 + pool.DB_SINGLE_MAX_OVERFLOW)]
+    try:
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    finally:
+        for conn in held:
+            conn.close()
+    assert stats.timeouts == 1
@@ -0,0 +1,40 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import connections.db_connection as db_connection
+from connections.replicas import replica_router
+
+
+def test_exhausted_replica_pool_fails_over_to_primary(monkeypatch, db_path):
+    replica_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=AsyncAdaptedQueuePool,
+                                         pool_size=1, max_overflow=0, pool_timeout=0.05)
+    replica = SimpleNamespace(name="replica-0", session=async_sessionmaker(replica_engine),
+                              failures=0, down_until=0.0)
+    primary_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    primary = async_sessionmaker(primary_engine)
+    monkeypatch.setattr(replica_router, "pick", lambda request: replica)
+    monkeypatch.setattr(db_connection, "AsyncSessionLocal", primary)
+    failovers = replica_router.reads["failover"]
+
+    async def read():
+        try:
+            async with replica_engine.connect():
+                # the replica's only connection is busy, so the checkout times out
+                sessions = db_connection.get_read_async_db(request=None)
+                db = await anext(sessions)
+                assert (await db.execute(text("select 1"))).scalar() == 1
+                await sessions.aclose()
+                return db
+        finally:
+            await replica_engine.dispose()
+            await primary_engine.dispose()
+
+    db = asyncio.run(read())
+
+    assert db.bind is not replica_engine
+    assert replica.failures == 1
+    assert replica_router.reads["failover"] == failovers + 1
@@ -0,0 +1,29 @@
+from models.models import RescoringJob, User
+from utils.authentication import AuthService
+
+
+def auth(db_session):
+    token = AuthService.issue_tokens(db_session.query(User).one())["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_start_rescoring_only_queues_the_job(client, db_session, merchant):
+    response = client.post("/api/v1/rescore/jobs", json={}, headers=auth(db_session))
+
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pending"
+    assert db_session.get(RescoringJob, job["id"]).started_by == merchant.user_id
+
+    fetched = client.get(f"/api/v1/rescore/jobs/{job['id']}", headers=auth(db_session))
+    assert fetched.status_code == 200
+    assert fetched.json()["id"] == job["id"]
+
+
+def test_rescoring_requires_a_super_admin(client, db_session, merchant):
+    db_session.query(User).update({"role": "admin"})
+    db_session.commit()
+
+    response = client.post("/api/v1/rescore/jobs", json={}, headers=auth(db_session))
+
+    assert response.status_code == 403
@@ -0,0 +1,33 @@
+from models.models import ScoringRuleset, User
+from services.calculation.ruleset import get_bundled_ruleset
+from utils.authentication import AuthService
+
+
+def auth(db_session):
+    token = AuthService.issue_tokens(db_session.query(User).one())["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_get_ruleset(client, db_session, merchant):
+    response = client.get("/api/v1/ruleset", headers=auth(db_session))
+
+    assert response.status_code == 200
+    assert response.json()["version"]
+
+
+def test_publish_ruleset_without_activating(client, db_session, merchant):
+    spec = {**get_bundled_ruleset().spec, "version": "test-2"}
+
+    response = client.post("/api/v1/ruleset", params={"activate": False}, json=spec, headers=auth(db_session))
+
+    assert response.status_code == 200
+    assert response.json() == {"version": "test-2", "active": False}
+    row = db_session.get(ScoringRuleset, "test-2")
+    assert row.created_by == merchant.user_id
+    assert not row.is_active
+
+
+def test_activate_unknown_ruleset(client, db_session, merchant):
+    response = client.patch("/api/v1/ruleset/missing/activate", headers=auth(db_session))
+
+    assert response.status_code == 404
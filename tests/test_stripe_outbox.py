@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+import pytest
+import stripe
+
+import services.stripe_outbox.client as stripe_client
+import services.stripe_outbox.services as outbox
+from models.models import StripeOutbox
+from services.scheduled.services import ScheduledJobService
+from services.stripe_outbox.client import FakeStripeClient
+from services.stripe_outbox.services import StripeOutboxService
+
+
+@pytest.fixture
+def enqueue(db_session, merchant):
+    def _enqueue(email, **values):
+        entry = StripeOutboxService.enqueue(merchant.id, email, "Analytical Engines", db_session)
+        for key, value in values.items():
+            setattr(entry, key, value)
+        db_session.commit()
+        return entry
+    return _enqueue
+
+
+def test_drain_batch_creates_customers_keyed_by_outbox_id(db_session, enqueue):
+    entries = [enqueue(f"owner{i}@example.com") for i in range(3)]
+    client = FakeStripeClient()
+
+    assert StripeOutboxService.drain_batch(db_session, client) == 3
+
+    assert sorted(client.calls) == sorted(e.id for e in entries)
+    for entry in entries:
+        db_session.refresh(entry)
+        assert entry.status == "done"
+        assert entry.attempts == 1
+        assert entry.stripe_customer_id == client.customers[entry.id]["id"]
+        assert entry.processed_at is not None
+
+
+def test_retryable_failure_is_rescheduled_with_backoff(db_session, enqueue):
+    entry = enqueue("flaky@example.com")
+    client = FakeStripeClient()
+    client.fail("flaky@example.com", stripe.APIConnectionError("connection reset"))
+
+    StripeOutboxService.drain_batch(db_session, client)
+
+    db_session.refresh(entry)
+    assert entry.status == "pending"
+    assert entry.attempts == 1
+    assert "connection reset" in entry.last_error
+    assert entry.next_attempt_at > datetime.utcnow()
+    # not due yet, so the next batch leaves it alone
+    assert StripeOutboxService.drain_batch(db_session, client) == 0
+
+
+def test_retry_succeeds_with_the_same_idempotency_key(db_session, enqueue):
+    entry = enqueue("flaky@example.com")
+    client = FakeStripeClient()
+    client.fail("flaky@example.com", stripe.RateLimitError("slow down"))
+    StripeOutboxService.drain_batch(db_session, client)
+
+    del client.errors["flaky@example.com"]
+    entry.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db_session.commit()
+    StripeOutboxService.drain_batch(db_session, client)
+
+    db_session.refresh(entry)
+    assert entry.status == "done"
+    assert entry.attempts == 2
+    assert client.calls == [entry.id, entry.id]
+    assert len(client.customers) == 1
+
+
+def test_retryable_failure_gives_up_after_max_attempts(db_session, enqueue):
+    entry = enqueue("flaky@example.com", attempts=outbox.OUTBOX_MAX_ATTEMPTS - 1)
+    client = FakeStripeClient()
+    client.fail("flaky@example.com", stripe.APIError("stripe is down"))
+
+    StripeOutboxService.drain_batch(db_session, client)
+
+    db_session.refresh(entry)
+    assert entry.status == "failed"
+    assert entry.attempts == outbox.OUTBOX_MAX_ATTEMPTS
+    assert entry.processed_at is not None
+
+
+def test_permanent_failure_fails_straight_away(db_session, enqueue):
+    bad = enqueue("not-an-email")
+    good = enqueue("owner@example.com")
+    client = FakeStripeClient()
+    client.fail("not-an-email", stripe.InvalidRequestError("Invalid email address", "email"))
+
+    assert StripeOutboxService.drain_batch(db_session, client) == 2
+
+    db_session.refresh(bad)
+    db_session.refresh(good)
+    assert (bad.status, bad.attempts) == ("failed", 1)
+    assert "Invalid email address" in bad.last_error
+    assert good.status == "done"
+
+
+def test_scheduled_job_drains_the_outbox(monkeypatch, session_factory, db_session, enqueue):
+    monkeypatch.setattr(outbox, "SessionLocal", session_factory)
+    monkeypatch.setattr(stripe_client, "STRIPE_CLIENT", "fake")
+    entries = [enqueue(f"owner{i}@example.com") for i in range(3)]
+
+    assert ScheduledJobService.run("stripe_outbox") == {"job": "stripe_outbox", "processed": 3}
+
+    db_session.expire_all()
+    assert {db_session.get(StripeOutbox, e.id).status for e in entries} == {"done"}
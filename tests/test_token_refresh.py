@@ -0,0 +1,33 @@
+from models.models import User
+from utils.authentication import AuthService
+
+
+def refresh(client, token):
+    return client.post("/api/v1/token/refresh", json={"refresh_token": token})
+
+
+def test_refresh_token_rotates(client, db_session, merchant):
+    user = db_session.query(User).one()
+    first = AuthService.issue_tokens(user)["refresh_token"]
+
+    response = refresh(client, first)
+
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+    assert second != first
+    assert refresh(client, second).status_code == 200
+
+
+def test_reused_refresh_token_revokes_the_user(client, db_session, merchant):
+    user = db_session.query(User).one()
+    stolen = AuthService.issue_tokens(user)["refresh_token"]
+    rotated = refresh(client, stolen).json()["refresh_token"]
+
+    replay = refresh(client, stolen)
+
+    assert replay.status_code == 401
+    assert replay.json()["detail"] == "Refresh token was already used, please login again"
+    db_session.refresh(user)
+    assert user.token_version == 1
+    # the copy the legitimate client holds is revoked with it
+    assert refresh(client, rotated).status_code == 401
@@ -1,37 +1,200 @@
+import datetime
+import hmac
 import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import uuid4
 import jwt
 from jwt import PyJWTError
-from fastapi import status, HTTPException, Security, Depends
+from fastapi import status, HTTPException, Security, Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import event, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from models.models import User
-from connections.db_connection import get_db 
+from models.models import UsedRefreshToken, User
+from connections.db_connection import get_async_db, get_db
 
 SECRET_KEY = os.getenv("JWT_SECRET", "secret")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 1440
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# how long a verified token_version is trusted before role-only checks look it up again
+TOKEN_VERSION_TTL_SECONDS = float(os.getenv("TOKEN_VERSION_TTL_SECONDS", "30"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "5000"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+# how often a refresh deletes the used_refresh_tokens rows whose tokens have expired anyway
+USED_REFRESH_TOKENS_PURGE_SECONDS = float(os.getenv("USED_REFRESH_TOKENS_PURGE_SECONDS", "300"))
 
 ERROR_EMAIL_PASSWORD_IS_INCORRECT = "Please login with the correct email and password."
 
 security = HTTPBearer(auto_error=False)
 
+_last_used_refresh_purge = 0.0
+
+# columns copied into a cached principal; deferred ones (profile_image) load on first access
+_PRINCIPAL_COLUMNS = [c.key for c in inspect(User).column_attrs if not c.deferred]
+
+
+class PrincipalCache:
+    """Bounded LRU of authenticated users with a per-entry TTL, keyed by email.
+
+    Entries are detached ``User`` copies stamped with the ``token_version``
+    they were loaded with; ``current_user`` merges a hit into the request
+    session with ``load=False``, so a cached principal costs no query. Any
+    change to a user's role, password or profile evicts them here, and the
+    TTL bounds how long other processes can serve the old copy.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email: str, version: int):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            expires, cached_version, user = entry
+            if expires < time.monotonic() or cached_version != version:
+                del self._entries[email]
+                return None
+            self._entries.move_to_end(email)
+            return user
+
+    def put(self, user: User) -> None:
+        snapshot = User(**{key: getattr(user, key) for key in _PRINCIPAL_COLUMNS})
+        make_transient_to_detached(snapshot)
+        with self._lock:
+            self._entries[user.email] = (time.monotonic() + self.ttl, user.token_version, snapshot)
+            self._entries.move_to_end(user.email)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: str) -> None:
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Caller identity read from a verified access token, without loading the User."""
+    id: str
+    email: str
+    role: str
+    token_version: int
+
+
+class TokenVersionCache:
+    """user_id -> current ``token_version``, each entry trusted for ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = TOKEN_VERSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(user_id, None)
+                return None
+            return entry[1]
+
+    def put(self, user_id: str, version: int) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, version)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_versions = TokenVersionCache()
+
+
+def _revoke_on_change(target: User, value, oldvalue, initiator):
+    # a new password or role invalidates every token issued before it
+    if inspect(target).persistent and value != oldvalue:
+        target.token_version = (target.token_version or 0) + 1
+        principal_cache.invalidate(target.email)
+        token_versions.invalidate(str(target.id))
+
+
+event.listen(User.password, "set", _revoke_on_change)
+event.listen(User.role, "set", _revoke_on_change)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
 
 class AuthService:
 
     @staticmethod
-    def verify_token(token: str) -> str:
-        """Decode JWT and return email."""
+    def issue_tokens(user: User) -> dict:
+        """A short-lived access token carrying role and token_version, plus a refresh token."""
+        now = datetime.datetime.utcnow()
+        access = {
+            "typ": "access",
+            "user_id": str(user.id),
+            "email": user.email,
+            "role": user.role,
+            "ver": user.token_version,
+            "exp": now + datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        }
+        refresh = {
+            "typ": "refresh",
+            "user_id": str(user.id),
+            "email": user.email,
+            "ver": user.token_version,
+            "jti": str(uuid4()),
+            "exp": now + datetime.timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        }
+        return {
+            "token": jwt.encode(access, SECRET_KEY, algorithm=ALGORITHM),
+            "refresh_token": jwt.encode(refresh, SECRET_KEY, algorithm=ALGORITHM),
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
+
+    @staticmethod
+    def decode(token: str, typ: str = "access") -> dict:
+        """Decode JWT and return its claims; they always include email.
+
+        Tokens issued before ``typ`` existed are access tokens.
+        """
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             email: str = payload.get("email")
-            if not email:
+            if not email or payload.get("typ", "access") != typ:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail=ERROR_EMAIL_PASSWORD_IS_INCORRECT,
                     headers={"WWW-Authenticate": "Bearer"},
                 )
-            return email
+            return payload
         except PyJWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,19 +202,24 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+    @staticmethod
+    def verify_token(token: str) -> str:
+        """Decode JWT and return email."""
+        return AuthService.decode(token)["email"]
+
     @staticmethod
     async def verify(token: str, db: Session) -> User:
-        """Verify JWT and fetch User with relationships."""
+        """Verify JWT and resolve its User, from the principal cache when possible."""
         token = token.split()[-1]  # strip "Bearer "
-        email = AuthService.verify_token(token)
-
-        # Eager load merchant (avoid DetachedInstanceError)
-        user_instance = (
-            db.query(User)
-            .options(selectinload(User.merchant))
-            .filter(User.email == email)
-            .one_or_none()
-        )
+        claims = AuthService.decode(token)
+        email, version = claims["email"], claims.get("ver", 0)
+
+        cached = principal_cache.get(email, version)
+        if cached is not None:
+            # attach a copy to this session without a SELECT; relationships lazy-load if used
+            return db.merge(cached, load=False)
+
+        user_instance = db.query(User).filter(User.email == email).one_or_none()
 
         if not user_instance:
             raise HTTPException(
@@ -59,9 +227,83 @@ class AuthService:
                 detail="User not found or token invalid",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        if user_instance.token_version != version:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked, please login again",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
+        principal_cache.put(user_instance)
+        token_versions.put(str(user_instance.id), user_instance.token_version)
         return user_instance
 
+    @staticmethod
+    async def check_version(user_id: str, version: int, db: AsyncSession) -> None:
+        """Raise 401 if the token's ``ver`` is stale; reads only ``users.token_version`` on a cache miss."""
+        current = token_versions.get(user_id)
+        if current is None:
+            current = await db.scalar(select(User.token_version).where(User.id == user_id))
+            if current is None:
+                raise _unauthorized("User not found or token invalid")
+            token_versions.put(user_id, current)
+        if current != version:
+            raise _unauthorized("Token has been revoked, please login again")
+
+    @staticmethod
+    async def principal(token: str, db: AsyncSession) -> Principal:
+        """Verify JWT and authorize from its claims; only tokens without a role claim load the User."""
+        token = token.split()[-1]  # strip "Bearer "
+        claims = AuthService.decode(token)
+        version = claims.get("ver", 0)
+        if "role" not in claims or "user_id" not in claims:
+            row = (await db.execute(
+                select(User.id, User.role, User.token_version).where(User.email == claims["email"])
+            )).one_or_none()
+            if row is None:
+                raise _unauthorized("User not found or token invalid")
+            if row.token_version != version:
+                raise _unauthorized("Token has been revoked, please login again")
+            return Principal(str(row.id), claims["email"], row.role, version)
+        await AuthService.check_version(claims["user_id"], version, db)
+        return Principal(claims["user_id"], claims["email"], claims["role"], version)
+
+    @staticmethod
+    def refresh(refresh_token: str, db: Session) -> dict:
+        """Exchange a refresh token for a new token pair with the user's current role.
+
+        Refresh tokens rotate: each ``jti`` can be exchanged once. Presenting
+        one again means it was copied, so every token of that user is revoked.
+        """
+        global _last_used_refresh_purge
+        claims = AuthService.decode(refresh_token, typ="refresh")
+        user = db.query(User).filter(User.id == claims.get("user_id")).one_or_none()
+        if not user:
+            raise _unauthorized("User not found or token invalid")
+        if user.token_version != claims.get("ver", 0):
+            raise _unauthorized("Token has been revoked, please login again")
+        if not claims.get("jti"):
+            raise _unauthorized(ERROR_EMAIL_PASSWORD_IS_INCORRECT)
+
+        if time.monotonic() - _last_used_refresh_purge > USED_REFRESH_TOKENS_PURGE_SECONDS:
+            _last_used_refresh_purge = time.monotonic()
+            db.query(UsedRefreshToken).filter(UsedRefreshToken.expires_at < datetime.datetime.utcnow()).delete(
+                synchronize_session=False)
+        db.add(UsedRefreshToken(jti=claims["jti"], user_id=user.id,
+                                expires_at=datetime.datetime.utcfromtimestamp(claims["exp"])))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            # bypass the attribute events: bump the version in SQL so concurrent refreshes cannot undo it
+            db.query(User).filter(User.id == user.id).update({User.token_version: User.token_version + 1},
+                                                              synchronize_session=False)
+            db.commit()
+            principal_cache.invalidate(user.email)
+            token_versions.invalidate(str(user.id))
+            raise _unauthorized("Refresh token was already used, please login again")
+        return AuthService.issue_tokens(user)
+
 
 async def current_user(
     credentials: HTTPAuthorizationCredentials = Security(security),
@@ -78,3 +320,22 @@ async def current_user(
     token = credentials.credentials
     user = await AuthService.verify(token=token, db=db)
     return user
+
+
+async def current_principal(
+    credentials: HTTPAuthorizationCredentials = Security(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """Return the caller's id, email and role from the access token, for role-gated endpoints."""
+    if credentials is None or credentials.scheme.lower() != "bearer":
+        raise _unauthorized("Missing Bearer token")
+    return await AuthService.principal(token=credentials.credentials, db=db)
+
+
+async def verify_webhook(x_webhook_secret: str | None = Header(default=None)) -> None:
+    """Reject webhook calls that do not carry the shared ``X-Webhook-Secret``."""
+    if not WEBHOOK_SECRET or not x_webhook_secret or not hmac.compare_digest(x_webhook_secret, WEBHOOK_SECRET):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook secret",
+        )
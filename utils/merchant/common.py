@@ -1,6 +1,11 @@
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
+from datetime import datetime
+import base64
+import binascii
 import json
 
+from fastapi import HTTPException
+
 from models.schema import ScoreSummary
 
 
@@ -25,3 +30,30 @@ def _to_score_summary_list(latest_row) -> ScoreSummary:
         heat_score=latest_row.heat_score,
         created_at=latest_row.created_at,
     )
+
+
+def _encode_cursor(sort: str, value: Any, merchant_id: str) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, merchant_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """Inverse of ``_encode_cursor``; a cursor only continues the sort order it was issued for."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, merchant_id = json.loads(raw)
+        if cursor_sort != sort:
+            raise ValueError(f"cursor was issued for sort={cursor_sort}")
+        if sort.lstrip("-") == "created_at":
+            value = datetime.fromisoformat(value)
+        return value, str(merchant_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _like_pattern(text: str) -> str:
+    """``%text%`` with LIKE wildcards in ``text`` escaped (use with ``escape="\\"``)."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from passlib.hash import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+# hashes allowed to wait for a worker before new logins are turned away with 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification on a dedicated, size-limited thread pool.
+
+    Hashes run off the event loop so a login storm only queues other logins;
+    once ``max_pending`` calls are waiting, further ones fail fast with 503
+    instead of growing the queue. ``needs_rehash`` reports hashes made with a
+    cost other than ``BCRYPT_ROUNDS`` so login can upgrade them.
+    """
+
+    def __init__(self, rounds: int = BCRYPT_ROUNDS, workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._scheme = bcrypt.using(rounds=rounds)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+
+    def _timed(self, fn, queued_at: float, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                wait, took = started - queued_at, finished - started
+                self.completed += 1
+                self.wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+                self.hash_seconds += took
+                self.max_hash_seconds = max(self.max_hash_seconds, took)
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending + self.workers:
+                self.rejected += 1
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                    detail="Too many sign-in attempts, please try again shortly")
+            self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, fn, time.perf_counter(), *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self._scheme.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(self._scheme.verify, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return self._scheme.needs_update(hashed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+                "avg_hash_ms": round(self.hash_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+                "max_hash_ms": round(self.max_hash_seconds * 1000, 2),
+            }
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+LOOP_WATCHDOG_INTERVAL_MS = float(os.getenv("LOOP_WATCHDOG_INTERVAL_MS", "20"))
+LOOP_STALL_THRESHOLD_MS = float(os.getenv("LOOP_STALL_THRESHOLD_MS", "100"))
+LOOP_STALL_HISTORY = int(os.getenv("LOOP_STALL_HISTORY", "100"))
+LOOP_STALL_STACK_DEPTH = int(os.getenv("LOOP_STALL_STACK_DEPTH", "30"))
+
+logger = logging.getLogger(__name__)
+
+
+def _route_of(frame) -> tuple:
+    """(method, route) of the ASGI request whose coroutine chain ``frame`` belongs to."""
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and scope.get("type") == "http":
+            route = scope.get("route")
+            return scope.get("method"), getattr(route, "path", None) or scope.get("path")
+        frame = frame.f_back
+    return None, None
+
+
+def _idle(frame) -> bool:
+    # a loop parked in its selector is waiting for I/O, e.g. thawing after a Lambda freeze
+    return frame is not None and os.path.basename(frame.f_code.co_filename) == "selectors.py"
+
+
+class LoopWatchdog:
+    """Measures event-loop lag and records what blocked the loop when it stalls.
+
+    A heartbeat coroutine stamps the time every ``interval``; a daemon thread
+    watches the stamp and, once it is older than ``threshold``, snapshots the
+    loop thread's stack with ``sys._current_frames`` while the blocking code is
+    still running. The request is found by walking that stack for the ASGI
+    ``scope``, so each stall is attributed to the route template that caused it.
+    """
+
+    def __init__(self, interval_ms: float = LOOP_WATCHDOG_INTERVAL_MS,
+                 threshold_ms: float = LOOP_STALL_THRESHOLD_MS, history: int = LOOP_STALL_HISTORY):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.stalls: deque = deque(maxlen=history)
+        self.routes: dict = {}
+        self._lock = threading.Lock()
+        self._beat = time.monotonic()
+        self._loop_thread_id = None
+        self._pending = None  # stall captured for the current beat, finished when the loop beats again
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+        self.samples = 0
+        self.unattributed = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self._lock:
+                self._beat = now
+                pending, self._pending = self._pending, None
+                if pending is None and lag >= self.threshold:
+                    # the loop was idle (a frozen Lambda) or the stall ended before it could be captured
+                    self.unattributed += 1
+                else:
+                    self.samples += 1
+                    self.lag_total += lag
+                    self.lag_max = max(self.lag_max, lag)
+            if pending is not None:
+                self._finish(pending, lag)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval / 2):
+            with self._lock:
+                beat, pending = self._beat, self._pending
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or (pending is not None and pending["beat"] == beat):
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None or _idle(frame):
+                continue
+            method, route = _route_of(frame)
+            stall = {
+                "beat": beat,
+                "at": datetime.utcnow().isoformat(),
+                "method": method,
+                "route": route,
+                "stack": traceback.format_list(traceback.extract_stack(frame, limit=LOOP_STALL_STACK_DEPTH)),
+            }
+            with self._lock:
+                if self._beat == beat:
+                    self._pending = stall
+
+    def _finish(self, stall: dict, lag: float) -> None:
+        stall.pop("beat")
+        stall["duration_ms"] = round(lag * 1000, 1)
+        key = f"{stall['method'] or '-'} {stall['route'] or '<no request>'}"
+        with self._lock:
+            self.stalls.append(stall)
+            agg = self.routes.setdefault(key, {"stalls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            agg["stalls"] += 1
+            agg["total_ms"] = round(agg["total_ms"] + stall["duration_ms"], 1)
+            agg["max_ms"] = max(agg["max_ms"], stall["duration_ms"])
+        logger.warning("event loop blocked for %.0fms by %s\n%s", stall["duration_ms"], key,
+                       "".join(stall["stack"][-5:]))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._task is not None,
+                "interval_ms": self.interval * 1000,
+                "threshold_ms": self.threshold * 1000,
+                "samples": self.samples,
+                "avg_lag_ms": round(self.lag_total / self.samples * 1000, 2) if self.samples else 0.0,
+                "max_lag_ms": round(self.lag_max * 1000, 2),
+                "stalls": sum(r["stalls"] for r in self.routes.values()),
+                "unattributed": self.unattributed,
+                "routes": {k: dict(v) for k, v in sorted(self.routes.items(), key=lambda kv: -kv[1]["total_ms"])},
+            }
+
+    def recent(self, limit: int = 20) -> list:
+        with self._lock:
+            return list(self.stalls)[-limit:][::-1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stalls.clear()
+            self.routes.clear()
+            self.samples, self.unattributed, self.lag_total, self.lag_max = 0, 0, 0.0, 0.0
+
+
+loop_watchdog = LoopWatchdog()